@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark - dingod activation to first reply
+Starts dingod through D-Bus activation on a private bus, times the first
+GetStatus call from the client's side, stops the daemon and repeats. The
+first run starts without saved state (cold), the others reuse what the
+previous instance persisted (warm).
+
+Usage: python3 benchmarks/bench_activation.py [--runs N] [--budget MS] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_dbus import (
+    BUS_NAME, OBJECT_PATH, SYSTEMD_NAME, percentile, wait_for_names,
+    write_kernel_tree, write_stubs,
+)
+
+BENCH_DBUS = Path(__file__).resolve().parent / 'bench_dbus.py'
+
+BUS_CONFIG = """<!DOCTYPE busconfig PUBLIC "-//freedesktop//DTD D-Bus Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <type>session</type>
+  <listen>unix:tmpdir={tmp}</listen>
+  <servicedir>{services}</servicedir>
+  <policy context="default">
+    <allow send_destination="*"/>
+    <allow own="*"/>
+  </policy>
+</busconfig>
+"""
+
+ACTIVATION_FILE = """[D-BUS Service]
+Name={name}
+Exec={python} {script} --role daemon --work-dir {work_dir}
+"""
+
+
+def first_reply(bus):
+    """Time one GetStatus call that has to activate the daemon; returns (seconds, pid)"""
+    start = time.perf_counter()
+    bus.call_blocking(BUS_NAME, OBJECT_PATH, BUS_NAME, 'GetStatus', '', (), timeout=30)
+    elapsed = time.perf_counter() - start
+
+    pid = int(bus.call_blocking(
+        'org.freedesktop.DBus', '/org/freedesktop/DBus', 'org.freedesktop.DBus',
+        'GetConnectionUnixProcessID', 's', (BUS_NAME,)
+    ))
+    return elapsed, pid
+
+
+def stop_daemon(bus, pid, timeout=10):
+    """SIGTERM the daemon and wait until its name is gone"""
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while bus.name_has_owner(BUS_NAME):
+        if time.monotonic() > deadline:
+            raise RuntimeError("dingod did not exit")
+        time.sleep(0.01)
+
+
+def run_benchmark(args):
+    """Activate, call, stop; runs times"""
+    if not shutil.which('dbus-daemon'):
+        sys.exit("dbus-daemon is required")
+
+    processes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        write_stubs(work_dir / 'bin', 0, 0)
+        write_kernel_tree(work_dir)
+        (work_dir / 'auth.log').write_text('')
+
+        services = work_dir / 'services'
+        services.mkdir()
+        (services / f'{BUS_NAME}.service').write_text(ACTIVATION_FILE.format(
+            name=BUS_NAME, python=sys.executable, script=BENCH_DBUS, work_dir=tmp
+        ))
+        (work_dir / 'bus.conf').write_text(BUS_CONFIG.format(tmp=tmp, services=services))
+
+        # Activated services inherit the bus daemon's environment
+        env = dict(os.environ, PATH=f"{work_dir / 'bin'}:{os.environ['PATH']}")
+
+        try:
+            bus_proc = subprocess.Popen(
+                ['dbus-daemon', f'--config-file={work_dir / "bus.conf"}', '--nofork',
+                 '--print-address=1'],
+                stdout=subprocess.PIPE, text=True, env=env
+            )
+            processes.append(bus_proc)
+            address = bus_proc.stdout.readline().strip()
+
+            processes.append(subprocess.Popen(
+                [sys.executable, str(BENCH_DBUS), '--role', 'systemd', '--address', address]
+            ))
+            bus = wait_for_names(address, (SYSTEMD_NAME,))
+
+            times = []
+            for _ in range(args.runs):
+                elapsed, pid = first_reply(bus)
+                times.append(elapsed)
+                stop_daemon(bus, pid)
+        finally:
+            for proc in reversed(processes):
+                proc.terminate()
+                proc.wait()
+
+    warm = sorted(times[1:])
+    return {
+        'runs': args.runs,
+        'budget_ms': args.budget,
+        'cold_ms': round(times[0] * 1000, 1),
+        'warm_p50_ms': round(percentile(warm, 0.50) * 1000, 1),
+        'warm_max_ms': round(max(warm, default=0) * 1000, 1),
+        'within_budget': max(times) * 1000 <= args.budget,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget', type=float, default=300, help='Activation to first reply (ms)')
+    parser.add_argument('--json', action='store_true', help='Print JSON only')
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    for key, value in results.items():
+        print(f"  {key:14} {value}")
+    if not results['within_budget']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Benchmark - dingod over D-Bus
+Runs DingoDaemon on a private dbus-daemon against stub apt-get, systemctl
+and audit tools plus a fake systemd manager, drives it from concurrent
+client processes and reports calls/sec and latency percentiles per method.
+
+Usage: python3 benchmarks/bench_dbus.py [--clients N] [--duration S]
+                                        [--methods GetStatus,SetProfile,...]
+                                        [--tool-delay MS] [--apt-delay MS]
+                                        [--systemd-delay MS] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import count
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / 'services'))
+sys.path.insert(0, str(REPO / 'common'))
+
+BUS_NAME = 'org.dingoos.Daemon'
+OBJECT_PATH = '/org/dingoos/Daemon'
+SYSTEMD_NAME = 'org.freedesktop.systemd1'
+SYSTEMD_PATH = '/org/freedesktop/systemd1'
+MANAGER_IFACE = 'org.freedesktop.systemd1.Manager'
+UNIT_IFACE = 'org.freedesktop.systemd1.Unit'
+PROPERTIES_IFACE = 'org.freedesktop.DBus.Properties'
+
+METHODS = ('GetStatus', 'SetProfile', 'RunSecurityAudit')
+
+# Stub tools: name -> (delay option, stdout)
+STUBS = {
+    'apt-get': ('apt', '0 upgraded, 0 newly installed, 0 to remove and 0 not upgraded.'),
+    'apt-cache': ('apt', ''),
+    'systemctl': ('tool', ''),
+    'ufw': ('tool', 'Status: active'),
+    'fail2ban-client': ('tool', 'Status\n`- Jail list:\tsshd'),
+    'aa-status': ('tool', 'apparmor module is loaded.\n42 profiles are loaded.'),
+    'ss': ('tool', 'LISTEN 0 128 0.0.0.0:22 0.0.0.0:*'),
+}
+
+
+def write_stubs(bin_dir, tool_delay, apt_delay):
+    """Shell scripts that sleep for the configured delay and print canned output"""
+    delays = {'tool': tool_delay / 1000, 'apt': apt_delay / 1000}
+    bin_dir.mkdir()
+    for name, (kind, output) in STUBS.items():
+        path = bin_dir / name
+        path.write_text(f"#!/bin/sh\nsleep {delays[kind]:.3f}\ncat <<'EOF'\n{output}\nEOF\n")
+        path.chmod(0o755)
+
+
+def write_kernel_tree(root, cpus=4):
+    """Minimal sysfs/procfs with the tunables profiles touch"""
+    files = {
+        'sys/devices/system/cpu/cpufreq/boost': '0',
+        'sys/kernel/mm/transparent_hugepage/enabled': 'always [madvise] never',
+        'sys/kernel/mm/transparent_hugepage/defrag': 'always defer [madvise] never',
+        'proc/sys/vm/swappiness': '60',
+        'proc/sys/vm/vfs_cache_pressure': '100',
+    }
+    for cpu in range(cpus):
+        files[f'sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_governor'] = 'powersave'
+
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content + '\n')
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+# Child process roles
+
+def run_fake_systemd(address, delay_ms):
+    """Serve a minimal org.freedesktop.systemd1 whose jobs take delay_ms
+
+    With a delay of 0 a job finishes within its call, so JobRemoved goes
+    out before the reply, as it does for jobs systemd has nothing to do
+    for. Units whose name starts with "missing" do not exist.
+    """
+    import dbus
+    import dbus.mainloop.glib
+    import dbus.service
+    from gi.repository import GLib
+
+    class FakeUnit(dbus.service.Object):
+        def __init__(self, bus, name):
+            escaped = ''.join(c if c.isalnum() else f'_{ord(c):02x}' for c in name)
+            self.path = f'{SYSTEMD_PATH}/unit/{escaped}'
+            self.state = 'inactive'
+            super().__init__(bus, self.path)
+
+        @dbus.service.method(PROPERTIES_IFACE, in_signature='s', out_signature='a{sv}')
+        def GetAll(self, interface):
+            return {'ActiveState': self.state}
+
+        @dbus.service.signal(PROPERTIES_IFACE, signature='sa{sv}as')
+        def PropertiesChanged(self, interface, changed, invalidated):
+            pass
+
+        def set_state(self, state):
+            self.state = state
+            self.PropertiesChanged(UNIT_IFACE, {'ActiveState': state}, dbus.Array([], signature='s'))
+
+    class FakeManager(dbus.service.Object):
+        def __init__(self, bus):
+            super().__init__(bus, SYSTEMD_PATH)
+            self.bus = bus
+            self.job_ids = count(1)
+            self.units = {}
+
+        def unit(self, name):
+            if name not in self.units:
+                self.units[name] = FakeUnit(self.bus, name)
+            return self.units[name]
+
+        @dbus.service.method(MANAGER_IFACE)
+        def Subscribe(self):
+            pass
+
+        @dbus.service.method(MANAGER_IFACE, in_signature='s', out_signature='o')
+        def LoadUnit(self, name):
+            return dbus.ObjectPath(self.unit(str(name)).path)
+
+        @dbus.service.method(MANAGER_IFACE, in_signature='ss', out_signature='o')
+        def StartUnit(self, name, mode):
+            return self.queue(str(name), 'active')
+
+        @dbus.service.method(MANAGER_IFACE, in_signature='ss', out_signature='o')
+        def StopUnit(self, name, mode):
+            return self.queue(str(name), 'inactive')
+
+        @dbus.service.signal(MANAGER_IFACE, signature='uoss')
+        def JobRemoved(self, job_id, job, unit, result):
+            pass
+
+        def queue(self, name, state):
+            if name.startswith('missing'):
+                raise dbus.exceptions.DBusException(
+                    f"Unit {name} not found.", name='org.freedesktop.systemd1.NoSuchUnit')
+            job_id = next(self.job_ids)
+            job = dbus.ObjectPath(f'{SYSTEMD_PATH}/job/{job_id}')
+            if delay_ms:
+                GLib.timeout_add(delay_ms, self.finish, job_id, job, name, state)
+            else:
+                self.finish(job_id, job, name, state)
+            return job
+
+        def finish(self, job_id, job, name, state):
+            self.unit(name).set_state(state)
+            self.JobRemoved(job_id, job, name, 'done')
+            return False
+
+    dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+    bus = dbus.bus.BusConnection(address)
+    name = dbus.service.BusName(SYSTEMD_NAME, bus)  # noqa: F841
+    FakeManager(bus)
+    GLib.MainLoop().run()
+
+
+def run_daemon(address, work_dir):
+    """Run DingoDaemon with its files redirected into work_dir
+
+    Without an address the daemon was started by bus activation and uses
+    the starter bus.
+    """
+    import dbus
+    import dbus.mainloop.glib
+    import dbus.service
+    from gi.repository import GLib
+
+    import audit
+    import dingod
+
+    work_dir = Path(work_dir)
+    dingod.PROFILES_DIR = REPO / 'configs' / 'dingo' / 'profiles'
+    dingod.STATE_FILE = work_dir / 'state.json'
+    audit.AUTH_LOG = str(work_dir / 'auth.log')
+    config = {
+        'state': {'debounce_ms': 500, 'journal': True},
+        'tuning': {'sysfs_root': str(work_dir / 'sys'), 'procfs_root': str(work_dir / 'proc')},
+        'stats': {'textfile': str(work_dir / 'dingod.prom')},
+        'daemon': {'idle_timeout': 0},
+    }
+
+    dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+    bus = dbus.bus.BusConnection(address or os.environ['DBUS_STARTER_ADDRESS'])
+    daemon = dingod.DingoDaemon(bus, OBJECT_PATH, config)
+    name = dbus.service.BusName(BUS_NAME, bus)  # noqa: F841
+
+    loop = GLib.MainLoop()
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, lambda: loop.quit() or False)
+    loop.run()
+    daemon.shutdown()
+
+
+def run_client(address, method, duration):
+    """Call method back to back for duration seconds, print latencies as JSON"""
+    import dbus
+
+    bus = dbus.bus.BusConnection(address)
+    daemon = dbus.Interface(bus.get_object(BUS_NAME, OBJECT_PATH), BUS_NAME)
+    call = getattr(daemon, method)
+    profiles = ('gaming', 'developer')
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    for i in count():
+        start = time.perf_counter()
+        if start >= deadline:
+            break
+        try:
+            if method == 'SetProfile':
+                call(profiles[i % 2], timeout=120)
+            else:
+                call(timeout=120)
+        except dbus.exceptions.DBusException:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    print(json.dumps({'latencies': latencies, 'errors': errors}))
+
+
+# Harness
+
+def wait_for_names(address, names, timeout=15):
+    """Block until every bus name has an owner"""
+    import dbus
+
+    bus = dbus.bus.BusConnection(address)
+    deadline = time.monotonic() + timeout
+    while not all(bus.name_has_owner(n) for n in names):
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Services did not appear on the bus: {names}")
+        time.sleep(0.05)
+    return bus
+
+
+def bench_method(address, method, clients, duration):
+    """Run one method from N client processes at once"""
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, '--role', 'client', '--address', address,
+             '--method', method, '--duration', str(duration)],
+            stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(clients)
+    ]
+    outputs = [json.loads(p.communicate()[0]) for p in procs]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for out in outputs for l in out['latencies'])
+    return {
+        'calls': len(latencies),
+        'errors': sum(out['errors'] for out in outputs),
+        'calls_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def daemon_stats(bus):
+    """Server-side time per call from GetStats, to separate bus overhead"""
+    daemon = bus.get_object(BUS_NAME, OBJECT_PATH)
+    buckets, methods = daemon.GetStats(dbus_interface=BUS_NAME)
+    return {
+        str(name): {
+            'daemon_mean_ms': round(float(s['seconds']) / int(s['calls']) * 1000, 3),
+            'daemon_child_mean_ms': round(float(s['child_seconds']) / int(s['calls']) * 1000, 3),
+        }
+        for name, s in methods.items() if int(s['calls'])
+    }
+
+
+def git_revision():
+    """Commit the numbers belong to"""
+    try:
+        return subprocess.run(
+            ['git', '-C', str(REPO), 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def run_benchmark(args):
+    """Set up the private bus and services, then measure each method"""
+    if not shutil.which('dbus-daemon'):
+        sys.exit("dbus-daemon is required")
+
+    processes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        write_stubs(work_dir / 'bin', args.tool_delay, args.apt_delay)
+        write_kernel_tree(work_dir)
+        (work_dir / 'auth.log').write_text('')
+        env = dict(os.environ, PATH=f"{work_dir / 'bin'}:{os.environ['PATH']}")
+
+        try:
+            bus_proc = subprocess.Popen(
+                ['dbus-daemon', '--session', '--nofork', '--print-address=1'],
+                stdout=subprocess.PIPE, text=True
+            )
+            processes.append(bus_proc)
+            address = bus_proc.stdout.readline().strip()
+
+            for role in ('systemd', 'daemon'):
+                processes.append(subprocess.Popen(
+                    [sys.executable, __file__, '--role', role, '--address', address,
+                     '--work-dir', tmp, '--systemd-delay', str(args.systemd_delay)],
+                    env=env
+                ))
+            bus = wait_for_names(address, (SYSTEMD_NAME, BUS_NAME))
+
+            methods = {
+                method: bench_method(address, method, args.clients, args.duration)
+                for method in args.methods.split(',')
+            }
+            for name, values in daemon_stats(bus).items():
+                if name in methods:
+                    methods[name].update(values)
+        finally:
+            for proc in reversed(processes):
+                proc.terminate()
+                proc.wait()
+
+    return {
+        'revision': git_revision(),
+        'clients': args.clients,
+        'duration': args.duration,
+        'delays_ms': {'tool': args.tool_delay, 'apt': args.apt_delay, 'systemd': args.systemd_delay},
+        'methods': methods,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[1])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per method')
+    parser.add_argument('--methods', default=','.join(METHODS))
+    parser.add_argument('--tool-delay', type=int, default=20, help='Stub systemctl/audit tool delay (ms)')
+    parser.add_argument('--apt-delay', type=int, default=200, help='Stub apt-get/apt-cache delay (ms)')
+    parser.add_argument('--systemd-delay', type=int, default=10, help='Fake systemd job time (ms)')
+    parser.add_argument('--json', action='store_true', help='Print JSON only')
+    parser.add_argument('--role', choices=('bench', 'systemd', 'daemon', 'client'), default='bench',
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--address', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--method', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == 'systemd':
+        return run_fake_systemd(args.address, args.systemd_delay)
+    if args.role == 'daemon':
+        return run_daemon(args.address, args.work_dir)
+    if args.role == 'client':
+        return run_client(args.address, args.method, args.duration)
+
+    results = run_benchmark(args)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"revision {results['revision']}, {args.clients} clients, {args.duration:g}s per method")
+    for name, values in results['methods'].items():
+        print(f"{name}:")
+        for key, value in values.items():
+            print(f"  {key:22} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark - dpkg status index
+Times a full parse of a synthetic dpkg status database and per-name lookups
+as served by QueryPackages.
+
+Usage: python3 benchmarks/bench_dpkg_index.py [--packages N] [--json]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'services'))
+
+from dpkg_index import parse_file  # noqa: E402
+
+STANZA = """Package: {name}
+Status: install ok {state}
+Priority: optional
+Section: libs
+Installed-Size: {size}
+Maintainer: Dingo OS Team <team@dingoos.io>
+Architecture: amd64
+Multi-Arch: same
+Source: {name}-src
+Version: {version}
+Depends: libc6 (>= 2.34), libgcc-s1 (>= 3.0), zlib1g (>= 1:1.2.0)
+Description: synthetic package {name}
+ This is a long description line that dpkg keeps verbatim in the status
+ database, included so stanzas have a realistic size.
+ .
+ Another paragraph of description text.
+
+"""
+
+
+def write_status(path, count):
+    """Write a synthetic status file with count packages"""
+    with open(path, 'w') as f:
+        for i in range(count):
+            f.write(STANZA.format(
+                name=f"pkg{i:06d}",
+                state='installed' if i % 10 else 'config-files',
+                size=100 + i % 5000,
+                version=f"1.{i % 97}.{i % 13}-{i % 5}ubuntu1",
+            ))
+
+
+def timed(func, repeat):
+    """Best-of timing in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[1])
+    parser.add_argument('--packages', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='Print JSON only')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / 'status'
+        write_status(path, args.packages)
+        size = path.stat().st_size
+        parse_time, index = timed(lambda: parse_file(path), args.repeat)
+
+    names = [f"pkg{i:06d}" for i in range(0, args.packages, max(1, args.packages // args.queries))]
+    names = names[:args.queries]
+    query_time, _ = timed(lambda: {n: index.get(n) for n in names}, args.repeat)
+
+    results = {
+        'packages': len(index),
+        'status_bytes': size,
+        'parse_ms': round(parse_time * 1000, 2),
+        'parse_mb_per_sec': round(size / parse_time / 1e6, 1),
+        'query_names': len(names),
+        'query_us': round(query_time * 1e6, 1),
+    }
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    for key, value in results.items():
+        print(f"{key:18} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Control Center first paint
+Starts the Control Center repeatedly and reads the time from process start
+to its first frame, which the window reports and then quits when
+DINGO_REPORT_FIRST_PAINT is set. Exits non-zero when a run is over budget.
+Needs a display (or GDK_BACKEND=broadway with broadwayd running).
+
+Usage: python3 benchmarks/bench_first_paint.py [--runs N] [--budget MS] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from bench_dbus import percentile
+
+REPO = Path(__file__).resolve().parent.parent
+DASHBOARD_SRC = REPO / 'dashboard' / 'src'
+
+
+def first_paint(timeout):
+    """First paint of one run, in ms"""
+    env = dict(os.environ, DINGO_REPORT_FIRST_PAINT='1', PYTHONPATH=str(REPO / 'common'))
+    result = subprocess.run(
+        [sys.executable, '-m', 'dingo_control_center'],
+        cwd=DASHBOARD_SRC, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith('first_paint_ms='):
+            return float(line.split('=', 1)[1])
+    raise RuntimeError(f"No first paint reported: {result.stderr.strip()[-500:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget', type=float, default=300, help='Process start to first frame (ms)')
+    parser.add_argument('--timeout', type=float, default=30, help='Per run (s)')
+    parser.add_argument('--json', action='store_true', help='Print JSON only')
+    args = parser.parse_args()
+
+    times = sorted(first_paint(args.timeout) for _ in range(args.runs))
+    results = {
+        'budget_ms': args.budget,
+        'p50_ms': round(percentile(times, 0.50), 1),
+        'max_ms': round(times[-1], 1),
+        'within_budget': times[-1] <= args.budget,
+    }
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:14} {value}")
+
+    if not results['within_budget']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
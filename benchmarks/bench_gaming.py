@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark - gaming mode switch latency
+Switches gaming mode on and off with the transition engine against a fake
+sysfs/procfs tree and stub systemctl, pw-metadata and busctl commands that
+take a configurable time, and reports the wall-clock switch time next to
+the time the same steps would take one after the other.
+
+Usage: python3 benchmarks/bench_gaming.py [--runs N] [--session-delay MS] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_dbus import percentile, write_kernel_tree
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / 'services'))
+sys.path.insert(0, str(REPO / 'common'))
+
+from gaming import GamingEngine  # noqa: E402
+from tuning import TuningBackend  # noqa: E402
+
+GAMING_CONF = REPO / 'configs' / 'dingo' / 'profiles' / 'gaming.conf'
+SESSION_COMMANDS = ('systemctl', 'pw-metadata', 'busctl')
+
+
+class MemoryState:
+    """Stand-in for the daemon state"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+def write_session_stubs(bin_dir, delay_ms):
+    """Session commands that just take delay_ms"""
+    bin_dir.mkdir()
+    for name in SESSION_COMMANDS:
+        path = bin_dir / name
+        path.write_text(f"#!/bin/sh\nsleep {delay_ms / 1000:.3f}\n")
+        path.chmod(0o755)
+
+
+def bench_switch(runs, root):
+    """Time enable and disable; serial time is the sum of every step"""
+    engine = GamingEngine(
+        MemoryState(),
+        TuningBackend(sysfs_root=str(root / 'sys'), procfs_root=str(root / 'proc'))
+    )
+    uid = os.getuid()
+    results = {'enable': [], 'disable': [], 'enable_serial': [], 'disable_serial': []}
+
+    for _ in range(runs):
+        for phase in ('enable', 'disable'):
+            start = time.perf_counter()
+            if phase == 'enable':
+                ok, report = engine.enable(GAMING_CONF, uid)
+            else:
+                ok, report = engine.disable()
+            results[phase].append(time.perf_counter() - start)
+            if not ok:
+                failed = {k: r['error'] for k, r in report.items() if r['status'] == 'failed'}
+                raise RuntimeError(f"{phase} failed: {failed}")
+
+            # Kernel settings share one batch, count that batch once
+            steps = {r['value'] if r['value'].startswith(SESSION_COMMANDS) else 'kernel': r['duration']
+                     for r in report.values()}
+            results[f'{phase}_serial'].append(sum(steps.values()))
+
+    summary = {}
+    for phase in ('enable', 'disable'):
+        times = sorted(results[phase])
+        summary[phase] = {
+            'p50_ms': round(percentile(times, 0.50) * 1000, 2),
+            'max_ms': round(times[-1] * 1000, 2),
+            'serial_p50_ms': round(percentile(sorted(results[f'{phase}_serial']), 0.50) * 1000, 2),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[1])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--session-delay', type=int, default=30, help='Stub session command time (ms)')
+    parser.add_argument('--json', action='store_true', help='Print JSON only')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_kernel_tree(root)
+        write_session_stubs(root / 'bin', args.session_delay)
+        os.environ['PATH'] = f"{root / 'bin'}:{os.environ['PATH']}"
+        results = bench_switch(args.runs, root)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    for name, values in results.items():
+        print(f"{name}:")
+        for key, value in values.items():
+            print(f"  {key:14} {value}")
+
+
+if __name__ == '__main__':
+    main()
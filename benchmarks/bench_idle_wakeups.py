@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark - idle Control Center wakeups
+Leaves the Control Center untouched for a while and reads how often its
+refresh scheduler woke up, which the window reports and then quits when
+DINGO_REPORT_WAKEUPS is set, along with the CPU time the process used.
+The dashboard's GetMetrics calls and, while dingod cannot be reached, the
+samples its local fallback took on its own 1 s timer are reported too.
+Needs a display (or GDK_BACKEND=broadway with broadwayd running).
+
+Usage: python3 benchmarks/bench_idle_wakeups.py [--seconds N] [--json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+DASHBOARD_SRC = REPO / 'dashboard' / 'src'
+
+
+def idle_run(seconds):
+    """Wakeups and CPU use of one untouched run"""
+    env = dict(os.environ, DINGO_REPORT_WAKEUPS=str(seconds), PYTHONPATH=str(REPO / 'common'))
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, '-m', 'dingo_control_center'],
+        cwd=DASHBOARD_SRC, env=env, capture_output=True, text=True, timeout=seconds + 60
+    )
+    elapsed = time.monotonic() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    report = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+    if 'wakeups' not in report:
+        raise RuntimeError(f"No wakeups reported: {result.stderr.strip()[-500:]}")
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return {
+        'seconds': round(elapsed, 1),
+        'wakeups': int(report['wakeups']),
+        'wakeups_per_minute': float(report['wakeups_per_minute']),
+        'metrics_calls': int(report.get('metrics_calls', 0)),
+        'local_samples': int(report.get('local_samples', 0)),
+        'cpu_seconds': round(cpu, 3),  # Includes start-up
+        'cpu_percent': round(100 * cpu / elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[1])
+    parser.add_argument('--seconds', type=int, default=120, help='How long to leave it idle')
+    parser.add_argument('--json', action='store_true', help='Print JSON only')
+    args = parser.parse_args()
+
+    results = idle_run(args.seconds)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    for key, value in results.items():
+        print(f"{key:20} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark - process table scan cost
+Scans a synthetic proc tree of N processes with the incremental scanner
+and with a full re-read of stat, status and cmdline per process (what a
+psutil.process_iter() loop does), and times top-N selection.
+
+Usage: python3 benchmarks/bench_procscan.py [--processes N] [--churn N] [--ticks N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_dbus import percentile
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / 'services'))
+sys.path.insert(0, str(REPO / 'common'))
+
+from dingo_common.procscan import ProcessTable  # noqa: E402
+
+STATUS = "Name:\t{name}\nState:\tS (sleeping)\nPPid:\t1\nUid:\t1000\t1000\t1000\t1000\nVmRSS:\t{rss} kB\n"
+
+
+def write_process(proc, pid, ticks):
+    """One /proc/<pid> with stat, status, cmdline and exe"""
+    path = proc / str(pid)
+    path.mkdir(exist_ok=True)
+    name = f"worker-{pid % 97}"
+    fields = ['S', '1'] + ['0'] * 9 + [str(ticks), str(ticks // 2)] + ['0'] * 6 + [str(pid), '0', str(pid * 3)]
+    (path / 'stat').write_text(f"{pid} ({name}) {' '.join(fields)} 0 0 0\n")
+    (path / 'status').write_text(STATUS.format(name=name, rss=pid * 12))
+    (path / 'cmdline').write_bytes(f"/usr/bin/{name}\0--id\0{pid}\0".encode())
+    if not (path / 'exe').is_symlink():
+        (path / 'exe').symlink_to(f"/usr/bin/{name}")
+
+
+def naive_scan(proc_root):
+    """Re-read everything per process every tick"""
+    table = []
+    for name in os.listdir(proc_root):
+        if not name.isdigit():
+            continue
+        path = f'{proc_root}/{name}'
+        with open(f'{path}/stat', 'rb') as f:
+            stat = f.read()
+        with open(f'{path}/status') as f:
+            status = f.read()
+        with open(f'{path}/cmdline', 'rb') as f:
+            cmdline = f.read()
+        fields = stat[stat.rfind(b')') + 2:].split()
+        table.append((int(name), int(fields[11]) + int(fields[12]), len(status), cmdline))
+    return table
+
+
+def bench(proc, processes, churn, ticks, top_n):
+    """Per-tick times of both scanners, with churn processes replaced per tick"""
+    for pid in range(1, processes + 1):
+        write_process(proc, pid, pid)
+
+    table = ProcessTable(str(proc))
+    start = time.perf_counter()
+    table.scan()
+    first = time.perf_counter() - start
+
+    results = {'incremental': [], 'naive': [], 'top_heap': [], 'top_sort': []}
+    next_pid = processes + 1
+    for tick in range(ticks):
+        for i in range(churn):
+            old = proc / str(next_pid - processes)
+            for child in old.iterdir():
+                child.unlink()
+            old.rmdir()
+            write_process(proc, next_pid, 0)
+            next_pid += 1
+        # Everything ran a little
+        for pid in range(next_pid - processes, next_pid, 50):
+            write_process(proc, pid, pid + tick)
+
+        start = time.perf_counter()
+        table.scan()
+        results['incremental'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        naive_scan(str(proc))
+        results['naive'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        table.top(top_n, 'cpu')
+        results['top_heap'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        sorted(table.records.values(), key=lambda r: r.cpu, reverse=True)[:top_n]
+        results['top_sort'].append(time.perf_counter() - start)
+
+    summary = {'first_scan_ms': round(first * 1000, 2), 'records': len(table.records)}
+    for name, times in results.items():
+        times.sort()
+        summary[f'{name}_p50_ms'] = round(percentile(times, 0.50) * 1000, 3)
+        summary[f'{name}_max_ms'] = round(times[-1] * 1000, 3)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[1])
+    parser.add_argument('--processes', type=int, default=5000)
+    parser.add_argument('--churn', type=int, default=25, help='Processes replaced per tick')
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help='Print JSON only')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = bench(Path(tmp), args.processes, args.churn, args.ticks, args.top)
+
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    for key, value in results.items():
+        print(f"{key:22} {value}")
+
+
+if __name__ == '__main__':
+    main()
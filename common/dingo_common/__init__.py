@@ -0,0 +1,3 @@
+"""
+Dingo OS - Modules shared by dingod, the Control Centers and the dingo CLI
+"""
@@ -0,0 +1,197 @@
+"""
+Dingo OS - Hardware inventory
+PCI devices from sysfs with names from pci.ids, cached until the next boot
+and shared by dingod and both Control Centers
+"""
+
+import json
+import os
+from pathlib import Path
+
+from dingo_common.files import atomic_write
+
+SYS_ROOT = '/sys'
+PROC_ROOT = '/proc'
+PCI_IDS_PATHS = ('/usr/share/misc/pci.ids', '/usr/share/hwdata/pci.ids')
+
+# dingod's copy is readable by everyone; the frontends fall back to their own
+SYSTEM_CACHE = Path('/var/lib/dingo/hardware.json')
+USER_CACHE = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'dingo' / 'hardware.json'
+CACHE_VERSION = 1
+
+DISPLAY_CLASS = 0x03
+
+# Bound driver -> how it is shown when the module has no version
+DRIVER_NAMES = {
+    'nvidia': 'NVIDIA',
+    'nouveau': 'Nouveau (Open Source)',
+    'amdgpu': 'AMDGPU (Open Source)',
+    'radeon': 'Radeon (Open Source)',
+    'i915': 'Intel i915 (Open Source)',
+    'xe': 'Intel Xe (Open Source)',
+}
+
+
+def read_attr(path):
+    """Stripped contents of a sysfs attribute, or None"""
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class PciIds:
+    """Vendor and device names from pci.ids
+
+    The file is indexed once by vendor (id -> byte offset of its line);
+    a lookup reads only that vendor's device lines.
+    """
+
+    def __init__(self, paths=PCI_IDS_PATHS):
+        self.data = b''
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    self.data = f.read()
+                break
+            except OSError:
+                continue
+        self.vendors = self.index()
+
+    def index(self):
+        """{vendor id: offset of its line}"""
+        vendors = {}
+        data = self.data
+        offset = 0
+        while offset < len(data):
+            end = data.find(b'\n', offset)
+            if end < 0:
+                end = len(data)
+            first = data[offset:offset + 1]
+            if first == b'C':
+                break  # Device classes follow the vendor list
+            if first not in (b'\t', b'#', b'\n', b''):
+                vendors[data[offset:offset + 4].decode()] = offset
+            offset = end + 1
+        return vendors
+
+    def lines(self, offset):
+        """Lines from offset on, without copying the rest of the file"""
+        data = self.data
+        while offset < len(data):
+            end = data.find(b'\n', offset)
+            if end < 0:
+                end = len(data)
+            yield data[offset:end]
+            offset = end + 1
+
+    def name(self, vendor, device=None):
+        """Vendor name, or device name when device is given; None if unknown"""
+        offset = self.vendors.get(vendor)
+        if offset is None:
+            return None
+        lines = self.lines(offset)
+        vendor_line = next(lines)
+        if device is None:
+            return vendor_line[4:].strip().decode('utf-8', 'replace')
+
+        prefix = b'\t' + device.encode()
+        for line in lines:
+            if line[:1] not in (b'\t', b'#'):
+                break  # Next vendor
+            if line.startswith(prefix):
+                return line[len(prefix):].strip().decode('utf-8', 'replace')
+        return None
+
+
+def scan_pci(sys_root=SYS_ROOT, pci_ids=None):
+    """Every PCI device as {slot, class, vendor_id, device_id, vendor, device, driver, driver_version}"""
+    devices_dir = os.path.join(sys_root, 'bus/pci/devices')
+    try:
+        slots = sorted(os.listdir(devices_dir))
+    except OSError:
+        return []
+
+    devices = []
+    for slot in slots:
+        path = os.path.join(devices_dir, slot)
+        pci_class = read_attr(os.path.join(path, 'class'))
+        vendor = read_attr(os.path.join(path, 'vendor'))
+        device = read_attr(os.path.join(path, 'device'))
+        if not (pci_class and vendor and device):
+            continue
+        vendor, device = vendor[2:].lower(), device[2:].lower()
+
+        try:
+            driver = os.path.basename(os.readlink(os.path.join(path, 'driver')))
+        except OSError:
+            driver = ''
+        driver_version = ''
+        if driver:
+            driver_version = read_attr(os.path.join(sys_root, 'module', driver, 'version')) or ''
+
+        if pci_ids is None:
+            pci_ids = PciIds()
+        devices.append({
+            'slot': slot,
+            'class': pci_class,
+            'vendor_id': vendor,
+            'device_id': device,
+            'vendor': pci_ids.name(vendor) or vendor,
+            'device': pci_ids.name(vendor, device) or device,
+            'driver': driver,
+            'driver_version': driver_version,
+        })
+    return devices
+
+
+def boot_id(proc_root=PROC_ROOT):
+    """Identifier of the current boot"""
+    return read_attr(os.path.join(proc_root, 'sys/kernel/random/boot_id')) or ''
+
+
+def inventory(sys_root=SYS_ROOT, proc_root=PROC_ROOT, cache_files=(SYSTEM_CACHE, USER_CACHE)):
+    """PCI devices, from the first cache written during this boot if any
+
+    A scan is saved to the first cache file that can be written.
+    """
+    current = boot_id(proc_root)
+    for path in cache_files:
+        try:
+            cached = json.loads(Path(path).read_bytes())
+        except (OSError, ValueError):
+            continue
+        if cached.get('version') == CACHE_VERSION and cached.get('boot_id') == current:
+            return cached['devices']
+
+    devices = scan_pci(sys_root)
+    data = json.dumps({'version': CACHE_VERSION, 'boot_id': current, 'devices': devices}).encode()
+    for path in cache_files:
+        try:
+            atomic_write(path, data)
+            break
+        except OSError:
+            continue
+    return devices
+
+
+def gpus(devices):
+    """Display controllers (PCI class 0x03xxxx)"""
+    return [d for d in devices if int(d['class'], 16) >> 16 == DISPLAY_CLASS]
+
+
+def gpu_name(device):
+    """'NVIDIA Corporation AD102 [GeForce RTX 4090]'"""
+    return f"{device['vendor']} {device['device']}"
+
+
+def driver_description(device):
+    """'NVIDIA 550.54.14', 'AMDGPU (Open Source)', ..."""
+    driver = device['driver']
+    if not driver:
+        return "No driver"
+    name = DRIVER_NAMES.get(driver, driver)
+    if device['driver_version']:
+        return f"{name.split(' (')[0]} {device['driver_version']}"
+    return name
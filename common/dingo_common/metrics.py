@@ -0,0 +1,200 @@
+"""
+Dingo OS - Metrics collector
+Samples CPU, memory, disk and network counters from /proc into fixed-size
+ring buffers that clients read incrementally
+"""
+
+import logging
+import os
+import time
+from array import array
+
+from gi.repository import GLib
+
+logger = logging.getLogger('dingod')
+
+PROC_ROOT = '/proc'
+SYS_ROOT = '/sys'
+
+# Order of the series returned by GetMetrics
+SERIES = ('cpu', 'memory', 'disk_read', 'disk_write', 'net_rx', 'net_tx')
+
+SECTOR_SIZE = 512
+VIRTUAL_DISKS = ('loop', 'ram', 'zram', 'dm-')
+
+# Samples further apart than this many intervals start the rates over
+MAX_GAP_INTERVALS = 3
+
+
+class RingBuffer:
+    """Fixed-size, array-backed history of doubles with sequence numbers"""
+
+    __slots__ = ('data', 'size', 'seq')
+
+    def __init__(self, size):
+        self.data = array('d', bytes(8 * size))
+        self.size = size
+        self.seq = 0  # Sequence number of the last sample
+
+    def append(self, value):
+        """Store a sample, overwriting the oldest"""
+        self.data[self.seq % self.size] = value
+        self.seq += 1
+
+    def since(self, seq):
+        """Samples newer than seq, oldest first"""
+        first = max(seq, self.seq - self.size, 0)
+        start, end = first % self.size, self.seq % self.size
+        if first >= self.seq:
+            return array('d')
+        if start < end:
+            return self.data[start:end]
+        return self.data[start:] + self.data[:end]
+
+
+class MetricsCollector:
+    """Demand-driven system sampler
+
+    Sampling starts when a client asks for metrics and stops once nobody
+    has asked for linger seconds, so an idle system costs nothing. Rates
+    (disk, network) are bytes per second between consecutive samples;
+    after a pause in sampling they start over instead of averaging over
+    the gap.
+    """
+
+    def __init__(self, interval_ms=1000, history=300, linger=60,
+                 proc_root=PROC_ROOT, sys_root=SYS_ROOT):
+        self.interval_ms = interval_ms
+        self.linger = linger
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+
+        self.timestamps = RingBuffer(history)
+        self.series = {name: RingBuffer(history) for name in SERIES}
+
+        self.timer_id = None
+        self.last_request = 0.0
+        self.previous = None
+        self.disks = None
+
+    def get(self, since_seq):
+        """Return (last_seq, timestamps, {series: values}) after since_seq"""
+        self.last_request = time.monotonic()
+        if self.timer_id is None:
+            self.start()
+
+        return (
+            self.timestamps.seq,
+            self.timestamps.since(since_seq),
+            {name: ring.since(since_seq) for name, ring in self.series.items()},
+        )
+
+    def start(self):
+        """Begin sampling"""
+        logger.info("Metrics sampling started")
+        self.previous = None
+        self.sample()
+        self.timer_id = GLib.timeout_add(self.interval_ms, self.on_tick)
+
+    def stop(self):
+        """Stop sampling"""
+        if self.timer_id is not None:
+            GLib.source_remove(self.timer_id)
+            self.timer_id = None
+            logger.info("Metrics sampling stopped")
+
+    def on_tick(self):
+        """Timer callback"""
+        if time.monotonic() - self.last_request > self.linger:
+            self.timer_id = None
+            logger.info("Metrics sampling stopped, no clients")
+            return False
+
+        self.sample()
+        return True
+
+    def sample(self):
+        """Read counters and append one sample to every series"""
+        now = time.monotonic()
+        try:
+            counters = self.read_counters()
+        except OSError as e:
+            logger.error("Metrics sample failed: %s", e)
+            return
+
+        if self.previous is not None and now - self.previous[0] > MAX_GAP_INTERVALS * self.interval_ms / 1000:
+            self.previous = None
+        if self.previous is not None:
+            then, prev = self.previous
+            elapsed = now - then or 1e-9
+
+            busy = counters['cpu_busy'] - prev['cpu_busy']
+            total = counters['cpu_total'] - prev['cpu_total']
+
+            self.timestamps.append(time.time())
+            self.series['cpu'].append(100.0 * busy / total if total else 0.0)
+            self.series['memory'].append(counters['memory'])
+            for name in ('disk_read', 'disk_write', 'net_rx', 'net_tx'):
+                self.series[name].append(max(0, counters[name] - prev[name]) / elapsed)
+
+        self.previous = (now, counters)
+
+    def read_counters(self):
+        """Parse the raw counters from /proc"""
+        counters = {}
+
+        # /proc/stat: cpu user nice system idle iowait irq softirq steal
+        with open(os.path.join(self.proc_root, 'stat'), 'rb') as f:
+            fields = f.readline().split()[1:9]
+        values = [int(v) for v in fields]
+        idle = values[3] + values[4]
+        counters['cpu_total'] = sum(values)
+        counters['cpu_busy'] = counters['cpu_total'] - idle
+
+        # /proc/meminfo: used percentage from MemTotal and MemAvailable
+        meminfo = {}
+        with open(os.path.join(self.proc_root, 'meminfo'), 'rb') as f:
+            for line in f:
+                key, _, rest = line.partition(b':')
+                if key in (b'MemTotal', b'MemAvailable'):
+                    meminfo[key] = int(rest.split()[0])
+                    if len(meminfo) == 2:
+                        break
+        total = meminfo.get(b'MemTotal', 0)
+        counters['memory'] = 100.0 * (total - meminfo.get(b'MemAvailable', 0)) / total if total else 0.0
+
+        # /proc/diskstats: sectors read (field 6) and written (field 10)
+        if self.disks is None:
+            self.disks = self.whole_disks()
+        read = written = 0
+        with open(os.path.join(self.proc_root, 'diskstats'), 'rb') as f:
+            for line in f:
+                fields = line.split()
+                if fields[2] in self.disks:
+                    read += int(fields[5])
+                    written += int(fields[9])
+        counters['disk_read'] = read * SECTOR_SIZE
+        counters['disk_write'] = written * SECTOR_SIZE
+
+        # /proc/net/dev: rx bytes (field 1) and tx bytes (field 9), without lo
+        rx = tx = 0
+        with open(os.path.join(self.proc_root, 'net/dev'), 'rb') as f:
+            for line in f.readlines()[2:]:
+                name, _, rest = line.partition(b':')
+                if name.strip() == b'lo':
+                    continue
+                fields = rest.split()
+                rx += int(fields[0])
+                tx += int(fields[8])
+        counters['net_rx'] = rx
+        counters['net_tx'] = tx
+
+        return counters
+
+    def whole_disks(self):
+        """Block devices that are disks, not partitions or virtual devices"""
+        try:
+            names = os.listdir(os.path.join(self.sys_root, 'block'))
+        except OSError:
+            names = []
+        return {n.encode() for n in names if not n.startswith(VIRTUAL_DISKS)}
@@ -0,0 +1,174 @@
+"""
+Dingo OS - Process table
+Incremental /proc scanner: one stat read per process per scan, command
+line and executable only for processes it has not seen before
+"""
+
+import heapq
+import os
+import time
+from operator import attrgetter
+
+PROC_ROOT = '/proc'
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+# Fields of /proc/<pid>/stat after "pid (comm) ", from 0
+STAT_STATE = 0
+STAT_PPID = 1
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_STARTTIME = 19
+STAT_RSS = 21
+
+
+def list_pids(proc_root=PROC_ROOT):
+    """Every pid in the proc root"""
+    return {int(name) for name in os.listdir(proc_root) if name.isdigit()}
+
+
+def read_cmdline(proc_root, pid):
+    """Raw NUL-separated command line; empty for kernel threads and zombies
+
+    Raises OSError when the process is gone.
+    """
+    with open(os.path.join(proc_root, str(pid), 'cmdline'), 'rb') as f:
+        return f.read()
+
+
+def process_age():
+    """Seconds since this process was started (exec, not module import)"""
+    try:
+        with open('/proc/self/stat', 'rb') as f:
+            start_ticks = int(f.read().rsplit(b')', 1)[1].split()[STAT_STARTTIME])
+    except (OSError, IndexError, ValueError):
+        return None
+    return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / CLOCK_TICKS
+
+
+class ProcessRecord:
+    """What the scanner keeps per process"""
+
+    __slots__ = ('pid', 'ppid', 'uid', 'name', 'state', 'cmdline', 'exe',
+                 'starttime', 'ticks', 'cpu', 'rss', 'io_bytes', 'io_rate', 'seen')
+
+    def __init__(self, pid, starttime):
+        self.pid = pid
+        self.starttime = starttime  # Tells a reused pid from the old process
+        self.ppid = 0
+        self.uid = -1
+        self.name = ''
+        self.state = ''
+        self.cmdline = ''
+        self.exe = ''
+        self.ticks = 0      # utime + stime, clock ticks
+        self.cpu = 0.0      # % of one CPU since the previous scan
+        self.rss = 0        # bytes
+        self.io_bytes = 0   # Storage bytes read + written, with io=True
+        self.io_rate = 0.0  # bytes per second since the previous scan
+        self.seen = 0
+
+    def __repr__(self):
+        return f"ProcessRecord(pid={self.pid}, name={self.name!r}, cpu={self.cpu:.1f}, rss={self.rss})"
+
+
+class ProcessTable:
+    """Process records kept up to date by scan()
+
+    Each scan reads /proc/<pid>/stat once per process. The command line,
+    executable and owner are read only when a pid is new (or was reused,
+    which the start time shows). CPU usage is the tick delta since the
+    previous scan, as a percentage of one CPU, computed for every record
+    in one pass after the reads.
+
+    With io=True /proc/<pid>/io is read as well, for storage I/O rates;
+    only processes the caller may ptrace have one.
+    """
+
+    def __init__(self, proc_root=PROC_ROOT, io=False):
+        self.proc_root = proc_root
+        self.io = io
+        self.records = {}   # pid -> ProcessRecord
+        self.generation = 0
+        self.scanned_at = None
+
+    def scan(self):
+        """Refresh every record; returns (new records, exited records)"""
+        now = time.monotonic()
+        self.generation += 1
+        generation = self.generation
+        records = self.records
+        previous = []   # (record, ticks and I/O bytes before this scan)
+        new = []
+
+        for name in os.listdir(self.proc_root):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f'{self.proc_root}/{name}/stat', 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue  # Exited since the listing
+
+            close = data.rfind(b')')
+            fields = data[close + 2:].split()
+            pid = int(name)
+            starttime = int(fields[STAT_STARTTIME])
+            record = records.get(pid)
+            if record is None or record.starttime != starttime:
+                record = records[pid] = ProcessRecord(pid, starttime)
+                record.name = data[data.find(b'(') + 1:close].decode('utf-8', 'replace')
+                self.read_details(record)
+                new.append(record)
+            else:
+                previous.append((record, record.ticks, record.io_bytes))
+
+            record.state = chr(fields[STAT_STATE][0])
+            record.ppid = int(fields[STAT_PPID])
+            record.ticks = int(fields[STAT_UTIME]) + int(fields[STAT_STIME])
+            record.rss = int(fields[STAT_RSS]) * PAGE_SIZE
+            record.seen = generation
+            if self.io:
+                record.io_bytes = self.read_io(name)
+
+        if self.scanned_at is not None and now > self.scanned_at:
+            elapsed = now - self.scanned_at
+            scale = 100.0 / (CLOCK_TICKS * elapsed)
+            for record, ticks, io_bytes in previous:
+                record.cpu = (record.ticks - ticks) * scale
+                record.io_rate = (record.io_bytes - io_bytes) / elapsed
+        self.scanned_at = now
+
+        exited = [record for record in records.values() if record.seen != generation]
+        for record in exited:
+            del records[record.pid]
+        return new, exited
+
+    def read_details(self, record):
+        """Command line, executable and owner of a new process"""
+        path = f'{self.proc_root}/{record.pid}'
+        try:
+            record.cmdline = read_cmdline(self.proc_root, record.pid).rstrip(b'\0').replace(
+                b'\0', b' ').decode('utf-8', 'replace')
+            record.uid = os.stat(path).st_uid
+        except OSError:
+            return
+        try:
+            record.exe = os.readlink(f'{path}/exe')
+        except OSError:
+            pass  # Kernel thread, or another user's process without privileges
+
+    def read_io(self, pid):
+        """Storage bytes read and written by a process, 0 if not readable"""
+        try:
+            with open(f'{self.proc_root}/{pid}/io', 'rb') as f:
+                lines = f.read().split(b'\n')
+        except OSError:
+            return 0
+        # rchar, wchar, syscr, syscw, read_bytes, write_bytes, ...
+        return int(lines[4].split()[1]) + int(lines[5].split()[1])
+
+    def top(self, n, key='cpu'):
+        """The n records with the highest key ('cpu', 'rss' or 'io_rate'), highest first"""
+        return heapq.nlargest(n, self.records.values(), key=attrgetter(key))
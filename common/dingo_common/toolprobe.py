@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Dingo OS - Toolchain probing
+Runs developer toolchain version probes concurrently and caches the
+results on disk per binary, for the Control Center and `dingo dev tools`
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dingo_common.files import atomic_write
+
+CACHE_FILE = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'dingo' / 'toolchains.json'
+PROBE_TIMEOUT = 2
+
+# Toolchain -> command that prints its version
+TOOLCHAINS = {
+    'Python': ['python3', '--version'],
+    'Node.js': ['node', '--version'],
+    'Go': ['go', 'version'],
+    'Rust': ['rustc', '--version'],
+    'Java': ['java', '--version'],
+    'Docker': ['docker', '--version'],
+    'Git': ['git', '--version'],
+}
+
+# What `dingo dev tools` lists
+CLI_TOOLCHAINS = ('Python', 'Node.js', 'Go', 'Rust', 'Docker', 'Git')
+
+VERSION_NUMBER = re.compile(r'\d+(?:\.\d+)+')
+
+
+def short_version(output):
+    """'go version go1.22.1 linux/amd64' -> '1.22.1'"""
+    match = VERSION_NUMBER.search(output)
+    return match.group(0) if match else output
+
+
+class ToolProbe:
+    """Version probes that run each binary at most once
+
+    A result is cached under the resolved path of the binary and the
+    probe's arguments, and is reused while that file keeps its inode and
+    mtime, so an unchanged toolchain is never executed again. Version
+    manager shims (rustup, pyenv) are cached as the shim.
+    """
+
+    def __init__(self, cache_file=CACHE_FILE, max_workers=8):
+        self.cache_file = Path(cache_file)
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.cache = self.load()
+
+    def load(self):
+        """Cached results, empty if there are none yet"""
+        try:
+            return json.loads(self.cache_file.read_bytes())
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write new results back"""
+        with self.lock:
+            if not self.dirty:
+                return
+            data = json.dumps(self.cache, indent=2).encode()
+            self.dirty = False
+        try:
+            atomic_write(self.cache_file, data)
+        except OSError:
+            pass  # Read-only home; probes just run again next time
+
+    def probe(self, cmd):
+        """First line of a command's version output, None if it is not installed"""
+        binary = shutil.which(cmd[0])
+        if binary is None:
+            return None
+        path = os.path.realpath(binary)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        key = ' '.join([path] + cmd[1:])
+        with self.lock:
+            entry = self.cache.get(key)
+        if entry and entry['inode'] == st.st_ino and entry['mtime'] == st.st_mtime_ns:
+            return entry['version']
+
+        # Run through the name it was found under; argv[0] matters to some tools
+        version, complete = self.run([binary] + cmd[1:])
+        if complete:
+            with self.lock:
+                self.cache[key] = {'inode': st.st_ino, 'mtime': st.st_mtime_ns, 'version': version}
+                self.dirty = True
+        return version
+
+    @staticmethod
+    def run(cmd):
+        """(version line, whether it may be cached)"""
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            return "Installed", False
+        except OSError:
+            return "Installed", False
+        for line in (result.stdout + result.stderr).splitlines():
+            if line.strip():
+                return line.strip()[:50], True
+        return "Installed", True
+
+    def probe_all(self, toolchains, on_result=None):
+        """Probe {name: cmd} concurrently; returns {name: version or None}
+
+        on_result(name, version) is called from the pool threads as each
+        probe finishes.
+        """
+        def probe_one(name):
+            version = self.probe(toolchains[name])
+            if on_result:
+                on_result(name, version)
+            return version
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='dingo-probe') as executor:
+            results = dict(zip(toolchains, executor.map(probe_one, toolchains)))
+        self.save()
+        return results
+
+
+def main():
+    """`dingo dev tools`"""
+    parser = argparse.ArgumentParser(description="List installed developer toolchains")
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached versions')
+    args = parser.parse_args()
+
+    probe = ToolProbe()
+    if args.refresh:
+        probe.cache = {}
+    results = probe.probe_all({name: TOOLCHAINS[name] for name in CLI_TOOLCHAINS})
+    for name in CLI_TOOLCHAINS:
+        if results[name] is not None:
+            print(f"  {name + ':':10}{short_version(results[name])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,17 +4,51 @@ Dingo Control Center
 Made By: Muhammad Ali (Github: Baymax005)
 """
 
+import os
 import sys
 import subprocess
-import psutil
+import time
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QFrame, QScrollArea, QGridLayout,
     QStackedWidget, QListWidget, QListWidgetItem, QProgressBar,
     QGroupBox, QSplitter
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QEvent, QMetaType, pyqtSlot
 from PyQt6.QtGui import QFont, QIcon
+from PyQt6.QtDBus import QDBusConnection, QDBusMessage, QDBusArgument, QDBusError
+
+from dingo_common import hwinfo
+from dingo_common.metrics import MetricsCollector
+
+BUS_NAME = 'org.dingoos.Daemon'
+OBJECT_PATH = '/org/dingoos/Daemon'
+PROPERTIES_IFACE = 'org.freedesktop.DBus.Properties'
+CALL_TIMEOUT_MS = 5000
+
+# Usage cards: read while the dashboard is shown in the active window
+METRICS_INTERVAL_MS = 2000
+# After GetMetrics fails, sample /proc here for this long before asking dingod again
+DAEMON_RETRY_SECONDS = 30
+
+
+def disk_percent(path='/'):
+    """Used space of a filesystem, in percent of what is usable"""
+    st = os.statvfs(path)
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    total = used + st.f_bavail * st.f_frsize
+    return 100.0 * used / total if total else 0.0
+
+
+def format_uptime():
+    """Time since boot, from /proc/uptime"""
+    with open('/proc/uptime') as f:
+        minutes = int(float(f.read().split()[0])) // 60
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    parts = [(days, "day"), (hours, "hour"), (minutes, "minute")]
+    return ", ".join(f"{n} {unit}{'s' if n != 1 else ''}" for n, unit in parts if n) or "0 minutes"
 
 
 class DingoControlCenter(QMainWindow):
@@ -171,9 +205,13 @@ class DingoControlCenter(QMainWindow):
         layout.addStretch()
         
         # Status
-        self.status_label = QLabel("System: ✓ Healthy")
-        self.status_label.setStyleSheet("color: #27ae60; padding: 12px;")
+        self.status_label = QLabel("System: Connecting...")
+        self.status_label.setStyleSheet("color: #27ae60; padding: 12px 12px 0px 12px;")
         layout.addWidget(self.status_label)
+
+        self.profile_label = QLabel("Profile: -")
+        self.profile_label.setStyleSheet("color: #7f8c8d; padding: 0px 12px 12px 12px;")
+        layout.addWidget(self.profile_label)
         
         author_label = QLabel("Made By: Muhammad Ali\nGithub: Baymax005")
         author_label.setStyleSheet("color: #7f8c8d; font-size: 11px; padding: 12px;")
@@ -297,12 +335,13 @@ class DingoControlCenter(QMainWindow):
         # GPU info
         gpu_group = QGroupBox("GPU Information")
         gpu_layout = QVBoxLayout()
+        devices = hwinfo.inventory()
         
-        gpu_name = QLabel(f"GPU: {self.get_gpu_name()}")
+        gpu_name = QLabel(f"GPU: {self.get_gpu_name(devices)}")
         gpu_name.setStyleSheet("font-size: 16px; padding: 8px;")
         gpu_layout.addWidget(gpu_name)
         
-        driver_info = QLabel(f"Driver: {self.get_driver_info()}")
+        driver_info = QLabel(f"Driver: {self.get_driver_info(devices)}")
         driver_info.setStyleSheet("padding: 8px;")
         gpu_layout.addWidget(driver_info)
         
@@ -431,34 +470,131 @@ class DingoControlCenter(QMainWindow):
         if current:
             index = current.data(Qt.ItemDataRole.UserRole)
             self.content_stack.setCurrentIndex(index)
+        self.update_timer()
+    
+    def changeEvent(self, event):
+        """Activated, deactivated or minimized: start or stop the usage cards"""
+        super().changeEvent(event)
+        if event.type() in (QEvent.Type.ActivationChange, QEvent.Type.WindowStateChange):
+            self.update_timer()
     
     def start_monitoring(self):
         """Start system monitoring"""
+        # Daemon status follows dingod's PropertiesChanged; GetAll starts it
+        self.bus = QDBusConnection.systemBus()
+        self.bus.connect(BUS_NAME, OBJECT_PATH, PROPERTIES_IFACE, 'PropertiesChanged',
+                         self.on_properties_changed)
+        get_all = QDBusMessage.createMethodCall(BUS_NAME, OBJECT_PATH, PROPERTIES_IFACE, 'GetAll')
+        get_all.setArguments([BUS_NAME])
+        if not self.bus.callWithCallback(get_all, self.on_properties, self.on_daemon_error,
+                                         CALL_TIMEOUT_MS):
+            self.on_daemon_error(self.bus.lastError())
+
+        # Usage cards: one sample per tick, only while they are on screen
+        self.metrics_seq = 0        # Last sequence number returned by GetMetrics
+        self.metrics_pending = False
+        self.daemon_retry = 0.0     # Monotonic time to ask dingod again after a failure
+        self.local_metrics = None   # Fallback sampler while dingod cannot be reached
+        self.local_seq = 0
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_stats)
-        self.timer.start(2000)  # Update every 2 seconds
-        self.update_stats()
+        self.update_timer()
+    
+    def update_timer(self):
+        """Run the usage cards' timer only while the dashboard is visible"""
+        if not hasattr(self, 'timer'):
+            return
+        shown = (self.isActiveWindow() and not self.isMinimized()
+                 and self.content_stack.currentIndex() == 0)
+        if shown and not self.timer.isActive():
+            self.timer.start(METRICS_INTERVAL_MS)
+            self.update_stats()
+        elif not shown:
+            self.timer.stop()
+    
+    @pyqtSlot(QDBusMessage)
+    def on_properties(self, reply):
+        """Every property, after dingod answered GetAll"""
+        self.update_status(reply.arguments()[0])
+    
+    @pyqtSlot(QDBusMessage)
+    def on_properties_changed(self, message):
+        """dingod pushed new values"""
+        interface, changed, invalidated = message.arguments()
+        if interface == BUS_NAME and changed:
+            self.update_status(changed)
+    
+    @pyqtSlot(QDBusError)
+    def on_daemon_error(self, error):
+        """dingod could not be started"""
+        print(f"Cannot connect to dingod: {error.message()}")
+        self.status_label.setText("System: daemon not available")
+    
+    def update_status(self, changed):
+        """Update system status from changed daemon properties"""
+        self.status_label.setText("System: ✓ Healthy")
+        if 'Profile' in changed:
+            self.profile_label.setText(f"Profile: {changed['Profile'].title()}")
     
     def update_stats(self):
         """Update system stats"""
-        # CPU
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        self.cpu_label.setText(f"{cpu_percent:.1f}%")
-        self.cpu_bar.setValue(int(cpu_percent))
-        
-        # Memory
-        mem = psutil.virtual_memory()
-        self.mem_label.setText(f"{mem.percent:.1f}%")
-        self.mem_bar.setValue(int(mem.percent))
-        
-        # Disk
-        disk = psutil.disk_usage('/')
-        self.disk_label.setText(f"{disk.percent:.1f}%")
-        self.disk_bar.setValue(int(disk.percent))
-        
-        # Uptime
-        uptime = subprocess.run(['uptime', '-p'], capture_output=True, text=True)
-        self.uptime_label.setText(f"Uptime: {uptime.stdout.strip()}")
+        # Disk and uptime are single reads; CPU and memory come from dingod's sampler
+        disk = disk_percent()
+        self.disk_label.setText(f"{disk:.1f}%")
+        self.disk_bar.setValue(int(disk))
+        self.uptime_label.setText(f"Uptime: {format_uptime()}")
+        
+        if time.monotonic() < self.daemon_retry:
+            self.sample_locally()
+            return
+        if self.metrics_pending:
+            return
+        message = QDBusMessage.createMethodCall(BUS_NAME, OBJECT_PATH, BUS_NAME, 'GetMetrics')
+        message.setArguments([QDBusArgument(self.metrics_seq, QMetaType.Type.ULongLong.value)])
+        self.metrics_pending = self.bus.callWithCallback(
+            message, self.on_metrics, self.on_metrics_error, CALL_TIMEOUT_MS)
+        if not self.metrics_pending:
+            self.on_metrics_error(self.bus.lastError())
+    
+    @pyqtSlot(QDBusMessage)
+    def on_metrics(self, reply):
+        """Samples from dingod; the cards show the newest"""
+        self.metrics_pending = False
+        self.local_metrics = None
+        seq, timestamps, series = reply.arguments()
+        if seq < self.metrics_seq:
+            # A new dingod instance counts from zero
+            self.metrics_seq = 0
+            return
+        self.metrics_seq = seq
+        self.show_usage(series)
+    
+    @pyqtSlot(QDBusError)
+    def on_metrics_error(self, error):
+        """dingod cannot be reached: sample here for a while"""
+        print(f"GetMetrics failed: {error.message()}")
+        self.metrics_pending = False
+        self.daemon_retry = time.monotonic() + DAEMON_RETRY_SECONDS
+        self.sample_locally()
+    
+    def sample_locally(self):
+        """Take one sample from /proc in this process"""
+        if self.local_metrics is None:
+            self.local_metrics = MetricsCollector(interval_ms=METRICS_INTERVAL_MS, history=2)
+            self.local_seq = 0
+        local = self.local_metrics
+        local.sample()
+        self.show_usage({name: ring.since(self.local_seq) for name, ring in local.series.items()})
+        self.local_seq = local.timestamps.seq
+    
+    def show_usage(self, series):
+        """Show the newest CPU and memory sample"""
+        for name, label, bar in (('cpu', self.cpu_label, self.cpu_bar),
+                                 ('memory', self.mem_label, self.mem_bar)):
+            values = series.get(name)
+            if values:
+                label.setText(f"{values[-1]:.1f}%")
+                bar.setValue(int(values[-1]))
     
     def get_kernel_version(self):
         """Get kernel version"""
@@ -468,27 +604,15 @@ class DingoControlCenter(QMainWindow):
         except:
             return "Unknown"
     
-    def get_gpu_name(self):
+    def get_gpu_name(self, devices):
         """Get GPU name"""
-        try:
-            result = subprocess.run(['lspci'], capture_output=True, text=True)
-            for line in result.stdout.split('\n'):
-                if 'VGA' in line or '3D' in line:
-                    return line.split(': ')[1] if ': ' in line else "Unknown GPU"
-            return "GPU not detected"
-        except:
-            return "Unknown GPU"
+        gpus = hwinfo.gpus(devices)
+        return hwinfo.gpu_name(gpus[0]) if gpus else "GPU not detected"
     
-    def get_driver_info(self):
+    def get_driver_info(self, devices):
         """Get driver info"""
-        try:
-            if subprocess.run(['which', 'nvidia-smi'], capture_output=True).returncode == 0:
-                result = subprocess.run(['nvidia-smi', '--query-gpu=driver_version', '--format=csv,noheader'],
-                                      capture_output=True, text=True)
-                return f"NVIDIA {result.stdout.strip()}"
-            return "Open Source Driver"
-        except:
-            return "Unknown"
+        gpus = hwinfo.gpus(devices)
+        return hwinfo.driver_description(gpus[0]) if gpus else "Unknown"
     
     def toggle_gaming_mode(self):
         """Toggle gaming mode"""
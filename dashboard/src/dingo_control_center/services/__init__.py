@@ -0,0 +1,16 @@
+"""
+Backend services for Dingo Control Center
+"""
+
+from .dbus_client import DaemonClient
+from .processes import ProcessSampler, ProcessRow
+from .scheduler import RefreshScheduler
+from .toolchains import probe_toolchains
+
+__all__ = [
+    'DaemonClient',
+    'ProcessSampler',
+    'ProcessRow',
+    'RefreshScheduler',
+    'probe_toolchains',
+]
@@ -0,0 +1,116 @@
+"""
+D-Bus client for the Dingo daemon
+"""
+
+from gi.repository import Gio
+
+BUS_NAME = 'org.dingoos.Daemon'
+OBJECT_PATH = '/org/dingoos/Daemon'
+
+# Method calls, including starting dingod for them
+CALL_TIMEOUT_MS = 5000
+
+
+class DaemonClient:
+    """Follows dingod's properties instead of polling
+
+    dingod is bus-activated and exits when idle. Creating the proxy starts
+    it, and the proxy loads every property once it is connected; after
+    that the values follow PropertiesChanged, so reading a property never
+    touches the bus. When dingod exits the last values are kept, and those
+    of the next instance are taken over when something starts it again.
+
+    on_changed(props) is called on the main loop with the full set of
+    properties after connecting and with only the changed ones afterwards;
+    it gets an empty dict if dingod cannot be started.
+
+    Methods are called with call(), which starts dingod again if it exited.
+    """
+
+    def __init__(self, on_changed):
+        self.on_changed = on_changed
+        self.proxy = None
+        self.connected = False  # dingod answered at least once
+        self.values = {}
+
+        Gio.DBusProxy.new_for_bus(
+            Gio.BusType.SYSTEM,
+            Gio.DBusProxyFlags.NONE,
+            None,
+            BUS_NAME,
+            OBJECT_PATH,
+            BUS_NAME,
+            None,
+            self.on_proxy_ready
+        )
+
+    def on_proxy_ready(self, source, result):
+        """Proxy created; dingod was activated if it was not running"""
+        try:
+            self.proxy = Gio.DBusProxy.new_for_bus_finish(result)
+        except Exception as e:
+            print(f"Cannot connect to dingod: {e}")
+            self.on_changed({})
+            return
+
+        self.proxy.connect('g-properties-changed', self.on_properties_changed)
+        self.proxy.connect('notify::g-name-owner', self.on_owner_changed)
+        if self.proxy.get_name_owner() is None:
+            print("dingod could not be started")
+            self.on_changed({})
+            return
+
+        self.connected = True
+        self.values = self.cached()
+        self.on_changed(dict(self.values))
+
+    def on_properties_changed(self, proxy, changed, invalidated):
+        """dingod pushed new values; invalidation on exit is ignored"""
+        changed = changed.unpack()
+        if changed:
+            self.values.update(changed)
+            self.on_changed(changed)
+
+    def on_owner_changed(self, proxy, pspec):
+        """dingod exited when idle, or a new instance took over"""
+        if proxy.get_name_owner() is None:
+            return
+        self.connected = True
+        current = self.cached()
+        changed = {name: value for name, value in current.items() if self.values.get(name) != value}
+        self.values.update(current)
+        if changed:
+            self.on_changed(changed)
+
+    def cached(self):
+        """Properties held by the proxy"""
+        if self.proxy is None:
+            return {}
+        return {
+            name: self.proxy.get_cached_property(name).unpack()
+            for name in self.proxy.get_cached_property_names() or ()
+        }
+
+    def properties(self):
+        """Latest known properties"""
+        return dict(self.values)
+
+    def get(self, name, default=None):
+        """One property"""
+        return self.values.get(name, default)
+
+    def call(self, method, parameters, on_reply, on_error):
+        """Call a method without blocking; on_reply gets the unpacked result tuple"""
+        if self.proxy is None:
+            on_error(RuntimeError("dingod is not available"))
+            return
+
+        def on_finished(proxy, result):
+            try:
+                reply = proxy.call_finish(result)
+            except Exception as e:
+                on_error(e)
+                return
+            on_reply(reply.unpack())
+
+        self.proxy.call(method, parameters, Gio.DBusCallFlags.NONE, CALL_TIMEOUT_MS, None, on_finished)
@@ -0,0 +1,81 @@
+"""
+Top processes sampler for the dashboard
+"""
+
+import threading
+
+from gi.repository import GLib, GObject
+
+from dingo_common.procscan import ProcessTable
+
+
+def format_bytes(value):
+    """1536 -> '1.5 KiB'"""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if value < 1024 or unit == 'GiB':
+            return f"{value:.0f} {unit}" if unit == 'B' else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+class ProcessRow(GObject.Object):
+    """One row of the top processes list, as display strings"""
+
+    __gtype_name__ = 'DingoProcessRow'
+
+    name = GObject.Property(type=str, default='')
+    pid = GObject.Property(type=str, default='')
+    cpu = GObject.Property(type=str, default='')
+    memory = GObject.Property(type=str, default='')
+    io = GObject.Property(type=str, default='')
+
+    def update(self, name, pid, cpu, rss, io_rate):
+        """Show a sampled process, notifying only what changed"""
+        values = {
+            'name': name,
+            'pid': str(pid),
+            'cpu': f"{cpu:.1f}%",
+            'memory': format_bytes(rss),
+            'io': f"{format_bytes(io_rate)}/s",
+        }
+        for key, value in values.items():
+            if self.get_property(key) != value:
+                self.set_property(key, value)
+
+
+class ProcessSampler:
+    """Scan /proc on a background thread and deliver the top count processes
+
+    Each sample() starts one scan, unless the previous one is still
+    running; on_sample(rows) is then called on the main loop with
+    (name, pid, cpu, rss, io_rate) of the busiest processes by CPU. The
+    process table is kept between scans, so a scan only reads what is new.
+    """
+
+    def __init__(self, on_sample, count=10):
+        self.on_sample = on_sample
+        self.count = count
+        self.table = ProcessTable(io=True)
+        self.scanning = False
+
+    def sample(self):
+        """Start a scan"""
+        if self.scanning:
+            return
+        self.scanning = True
+        threading.Thread(target=self.run, daemon=True, name='dingo-processes').start()
+
+    def run(self):
+        """Scanning thread"""
+        top = None
+        try:
+            self.table.scan()
+            top = [(r.name, r.pid, r.cpu, r.rss, r.io_rate) for r in self.table.top(self.count)]
+        finally:
+            GLib.idle_add(self.deliver, top)
+
+    def deliver(self, top):
+        """Hand a sample to the view"""
+        self.scanning = False
+        if top is not None:
+            self.on_sample(top)
+        return False
@@ -0,0 +1,271 @@
+"""
+Refresh scheduler for the Control Center
+"""
+
+import math
+import time
+import traceback
+from collections import deque
+from pathlib import Path
+
+from gi.repository import Gtk, GLib
+
+POWER_SUPPLY_DIR = Path('/sys/class/power_supply')
+
+# Interval multipliers: while the user interacts, after a while without
+# input, and on battery (on top of either)
+INTERACTIVE_FACTOR = 0.5
+IDLE_FACTOR = 2
+BATTERY_FACTOR = 2
+INTERACTIVE_SECONDS = 10
+IDLE_SECONDS = 60
+POWER_CHECK_SECONDS = 60
+
+# A tick runs every task due within this many seconds, so tasks share wakeups
+TOLERANCE = 1.0
+
+WAKEUP_WINDOW = 60
+
+
+def on_battery(power_supply_dir=POWER_SUPPLY_DIR):
+    """Whether the system has a mains supply and none of them is online"""
+    mains = False
+    try:
+        supplies = list(power_supply_dir.iterdir())
+    except OSError:
+        return False
+    for supply in supplies:
+        try:
+            if (supply / 'type').read_text().strip() != 'Mains':
+                continue
+            mains = True
+            if (supply / 'online').read_text().strip() == '1':
+                return False
+        except OSError:
+            continue
+    return mains
+
+
+def align(now, interval):
+    """The first multiple of interval after now"""
+    return (math.floor(now / interval + 1e-6) + 1) * interval
+
+
+class RefreshTask:
+    """A periodic callback registered with the scheduler"""
+
+    __slots__ = ('callback', 'interval', 'widget', 'handlers', 'due', 'runs')
+
+    def __init__(self, callback, interval, widget):
+        self.callback = callback
+        self.interval = interval  # seconds, before adaptation
+        self.widget = widget
+        self.handlers = []
+        self.due = None           # Monotonic time of the next run, None while suspended
+        self.runs = 0
+
+
+class RefreshScheduler:
+    """Periodic refreshes of every view, batched onto shared ticks
+
+    There is one GLib.timeout_add_seconds source, armed for the earliest
+    due task and only while a task can run; a tick runs every task that
+    is due within a second. Each run puts the task's next one on a
+    multiple of its interval, so tasks of 1, 2 and 4 s wake together.
+
+    A task with a widget is suspended while the widget is not mapped (a
+    hidden Gtk.Stack page or window) and while its window is in the
+    background (backdrop, minimized) or suspended, and runs as soon as it
+    is shown again. Intervals are halved while the user interacts with a
+    window, doubled after a minute without input, and doubled again on
+    battery; they never go below one second.
+    """
+
+    _default = None
+
+    def __init__(self, power_supply_dir=POWER_SUPPLY_DIR):
+        self.power_supply_dir = power_supply_dir
+        self.tasks = []
+        self.windows = {}   # Gtk.Window -> whether it has the suspended property
+        self.timer_id = None
+        self.timer_due = None
+        self.last_input = time.monotonic()
+        self.battery = False
+        self.battery_checked = None
+        self.started = time.monotonic()
+        self.wakeups = deque()
+        self.total_wakeups = 0
+
+    @classmethod
+    def get_default(cls):
+        """The application's scheduler"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def add(self, callback, interval, widget=None):
+        """Call callback() every interval seconds while widget is on screen; returns the task"""
+        task = RefreshTask(callback, interval, widget)
+        if widget is not None:
+            task.handlers = [
+                widget.connect("map", self.on_widget_map),
+                widget.connect("unmap", lambda w: self.reschedule()),
+            ]
+            if widget.get_mapped():
+                self.watch_window(widget.get_root())
+        self.tasks.append(task)
+        self.reschedule()
+        return task
+
+    def remove(self, task):
+        """Stop a task"""
+        if task not in self.tasks:
+            return
+        self.tasks.remove(task)
+        task.due = None
+        for handler in task.handlers:
+            task.widget.disconnect(handler)
+        self.reschedule()
+
+    def on_widget_map(self, widget):
+        """Shown: follow its window, run its tasks"""
+        self.watch_window(widget.get_root())
+        self.reschedule()
+
+    def watch_window(self, window):
+        """Follow a window's state and the user's input in it, once"""
+        if not isinstance(window, Gtk.Window) or window in self.windows:
+            return
+        suspendable = window.find_property("suspended") is not None  # GTK 4.12
+        self.windows[window] = suspendable
+        window.connect("notify::is-active", lambda w, p: self.reschedule())
+        if suspendable:
+            window.connect("notify::suspended", lambda w, p: self.reschedule())
+        window.connect("destroy", lambda w: self.windows.pop(w, None))
+
+        # Seen before any widget handles them; never claimed
+        motion = Gtk.EventControllerMotion()
+        motion.connect("motion", lambda c, x, y: self.on_input())
+        key = Gtk.EventControllerKey()
+        key.connect("key-pressed", lambda c, keyval, keycode, state: self.on_input() or False)
+        click = Gtk.GestureClick()
+        click.connect("pressed", lambda g, n, x, y: self.on_input())
+        scroll = Gtk.EventControllerScroll(flags=Gtk.EventControllerScrollFlags.BOTH_AXES)
+        scroll.connect("scroll", lambda c, dx, dy: self.on_input() or False)
+        for controller in (motion, key, click, scroll):
+            controller.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+            window.add_controller(controller)
+
+    def on_input(self):
+        """User input: bring due tasks forward when coming out of idle"""
+        now = time.monotonic()
+        interactive = now - self.last_input < INTERACTIVE_SECONDS
+        self.last_input = now
+        if interactive:
+            return
+        factor = self.factor(now)
+        for task in self.tasks:
+            if task.due is not None:
+                task.due = min(task.due, align(now, self.interval(task, factor)))
+        self.reschedule()
+
+    def visible(self, task):
+        """Whether a task's widget is on screen in a foreground window"""
+        widget = task.widget
+        if widget is None:
+            return True
+        if not widget.get_mapped():
+            return False
+        window = widget.get_root()
+        if not isinstance(window, Gtk.Window):
+            return False
+        if self.windows.get(window) and window.get_property("suspended"):
+            return False
+        return window.is_active()
+
+    def factor(self, now):
+        """Interval multiplier for the user's activity and the power source"""
+        idle = now - self.last_input
+        if idle < INTERACTIVE_SECONDS:
+            factor = INTERACTIVE_FACTOR
+        elif idle >= IDLE_SECONDS:
+            factor = IDLE_FACTOR
+        else:
+            factor = 1
+        if self.battery_checked is None or now - self.battery_checked >= POWER_CHECK_SECONDS:
+            self.battery = on_battery(self.power_supply_dir)
+            self.battery_checked = now
+        if self.battery:
+            factor *= BATTERY_FACTOR
+        return factor
+
+    @staticmethod
+    def interval(task, factor):
+        """A task's adapted interval, in whole seconds"""
+        return max(1, round(task.interval * factor))
+
+    def reschedule(self):
+        """Arm the timer for the earliest due task; leave it off when none can run"""
+        now = time.monotonic()
+        due = None
+        for task in self.tasks:
+            if not self.visible(task):
+                task.due = None
+                continue
+            if task.due is None:
+                task.due = now  # Shown again: refresh right away
+            due = task.due if due is None else min(due, task.due)
+
+        if due == self.timer_due:
+            return
+        if self.timer_id is not None:
+            GLib.source_remove(self.timer_id)
+            self.timer_id = None
+        self.timer_due = due
+        if due is None:
+            return
+        delay = due - now
+        if delay <= 0:
+            self.timer_id = GLib.idle_add(self.on_tick)
+        else:
+            self.timer_id = GLib.timeout_add_seconds(math.ceil(delay), self.on_tick)
+
+    def on_tick(self):
+        """Run every task that is due"""
+        self.timer_id = None
+        self.timer_due = None
+        now = time.monotonic()
+        self.count_wakeup(now)
+
+        factor = self.factor(now)
+        for task in list(self.tasks):
+            if task.due is None or task.due > now + TOLERANCE or not self.visible(task):
+                continue
+            task.due = align(max(task.due, now), self.interval(task, factor))
+            task.runs += 1
+            try:
+                task.callback()
+            except Exception:
+                traceback.print_exc()
+
+        self.reschedule()
+        return False
+
+    def count_wakeup(self, now):
+        """Remember a wakeup for wakeups_per_minute()"""
+        self.total_wakeups += 1
+        self.wakeups.append(now)
+        while self.wakeups[0] <= now - WAKEUP_WINDOW:
+            self.wakeups.popleft()
+
+    def wakeups_per_minute(self):
+        """Ticks in the last minute"""
+        now = time.monotonic()
+        while self.wakeups and self.wakeups[0] <= now - WAKEUP_WINDOW:
+            self.wakeups.popleft()
+        return len(self.wakeups)
+
+    def average_wakeups_per_minute(self):
+        """Ticks per minute since the scheduler was created"""
+        minutes = (time.monotonic() - self.started) / 60
+        return self.total_wakeups / minutes if minutes else 0.0
@@ -0,0 +1,29 @@
+"""
+Toolchain version probing for the Control Center
+"""
+
+import threading
+
+from gi.repository import GLib
+
+from dingo_common.toolprobe import TOOLCHAINS, ToolProbe
+
+
+def probe_toolchains(names, on_result):
+    """Probe toolchains in the background
+
+    All probes run concurrently, answered from the on-disk cache where the
+    binary has not changed. on_result(name, version) is called on the main
+    loop for each, with None for toolchains that are not installed.
+    """
+    def deliver(name, version):
+        on_result(name, version)
+        return False
+
+    def run():
+        ToolProbe().probe_all(
+            {name: TOOLCHAINS[name] for name in names},
+            lambda name, version: GLib.idle_add(deliver, name, version)
+        )
+
+    threading.Thread(target=run, daemon=True, name='dingo-toolchains').start()
@@ -6,9 +6,40 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, Gio, GLib, GObject, Pango
+import os
+import time
 import psutil
-import subprocess
+
+from dingo_common.metrics import MetricsCollector, RingBuffer
+
+from ..services.processes import ProcessSampler, ProcessRow, format_bytes
+from ..services.scheduler import RefreshScheduler
+from ..widgets.sparkline import Sparkline
+
+# Live cards: metrics series, title, fixed maximum (None = autoscale), value format
+LIVE_METRICS = (
+    ('cpu', "CPU", 100, lambda v: f"{v:.0f}%"),
+    ('memory', "Memory", 100, lambda v: f"{v:.0f}%"),
+    ('disk_read', "Disk Read", None, lambda v: f"{format_bytes(v)}/s"),
+    ('disk_write', "Disk Write", None, lambda v: f"{format_bytes(v)}/s"),
+)
+HISTORY_SECONDS = 300
+
+# After GetMetrics fails, sample /proc here for this long before asking dingod again
+DAEMON_RETRY_SECONDS = 30
+# The local sampler stops itself when not read for this long (the metrics
+# task runs at least every 4 s while shown)
+LOCAL_LINGER_SECONDS = 10
+
+# Top processes columns: row property, title, width in characters (None = expand)
+PROCESS_COLUMNS = (
+    ('name', "Process", None),
+    ('pid', "PID", 7),
+    ('cpu', "CPU", 7),
+    ('memory', "Memory", 10),
+    ('io', "I/O", 12),
+)
 
 
 class DashboardView(Gtk.Box):
@@ -70,6 +101,18 @@ class DashboardView(Gtk.Box):
 
         self.append(stats_grid)
 
+        # Live usage with history, taken from dingod's sampler while the
+        # dashboard is shown
+        self.history = {series: RingBuffer(HISTORY_SECONDS) for series, *rest in LIVE_METRICS}
+        self.metrics_seq = 0        # Last sequence number returned by GetMetrics
+        self.metrics_pending = False
+        self.daemon_retry = 0.0     # Monotonic time to ask dingod again after a failure
+        self.local_metrics = None   # Fallback sampler while dingod cannot be reached
+        self.local_seq = 0
+        self.metrics_calls = 0      # GetMetrics calls and local samples, for the benchmarks
+        self.local_samples = 0
+        self.append(self.create_live_cards())
+
         # System info section
         self.append(Gtk.Separator(margin_top=20, margin_bottom=20))
         
@@ -82,6 +125,24 @@ class DashboardView(Gtk.Box):
         info_grid = self.create_system_info()
         self.append(info_grid)
 
+        # Top processes, sampled only while the dashboard is shown
+        self.append(Gtk.Separator(margin_top=20, margin_bottom=20))
+
+        processes_label = Gtk.Label(label="Top Processes")
+        processes_label.add_css_class("title-3")
+        processes_label.set_halign(Gtk.Align.START)
+        self.append(processes_label)
+
+        self.append(self.create_process_list())
+        self.process_sampler = ProcessSampler(self.on_processes)
+
+        # Both run only while the dashboard is on screen. GetMetrics returns
+        # every sample since the last call, so the metrics task can be
+        # stretched like the others and the rings still get one per second.
+        scheduler = RefreshScheduler.get_default()
+        scheduler.add(self.on_metrics_tick, 1, widget=self)
+        scheduler.add(self.process_sampler.sample, 2, widget=self)
+
         # Quick actions
         self.append(Gtk.Separator(margin_top=20, margin_bottom=20))
         
@@ -120,6 +181,97 @@ class DashboardView(Gtk.Box):
 
         return card
 
+    def create_live_cards(self):
+        """Cards with the current value and history of each live metric"""
+        grid = Gtk.Grid()
+        grid.set_column_spacing(24)
+        grid.set_row_spacing(24)
+        grid.set_column_homogeneous(True)
+        grid.set_margin_top(24)
+
+        self.live_values = []
+        for i, (series, title, maximum, fmt) in enumerate(LIVE_METRICS):
+            card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+            card.add_css_class("card")
+
+            title_label = Gtk.Label(label=title)
+            title_label.add_css_class("caption")
+            title_label.add_css_class("dim-label")
+            title_label.set_halign(Gtk.Align.START)
+            card.append(title_label)
+
+            value_label = Gtk.Label(label="–")
+            value_label.add_css_class("title-2")
+            value_label.set_halign(Gtk.Align.START)
+            card.append(value_label)
+
+            ring = self.history[series]
+            sparkline = Sparkline(ring, maximum=maximum)
+            card.append(sparkline)
+
+            self.live_values.append((ring, value_label, sparkline, fmt))
+            grid.attach(card, i % 2, i // 2, 1, 1)
+
+        return grid
+
+    def on_metrics_tick(self):
+        """Fetch the samples dingod took since the last tick"""
+        daemon = getattr(self.get_root(), 'daemon', None)
+        if daemon is None or time.monotonic() < self.daemon_retry:
+            self.sample_locally()
+            return
+        if self.metrics_pending:
+            return
+        self.metrics_pending = True
+        self.metrics_calls += 1
+        daemon.call('GetMetrics', GLib.Variant('(t)', (self.metrics_seq,)),
+                    self.on_metrics, self.on_metrics_error)
+
+    def on_metrics(self, reply):
+        """Samples from dingod"""
+        self.metrics_pending = False
+        self.stop_local_sampler()
+        seq, timestamps, series = reply
+        if seq < self.metrics_seq:
+            # A new dingod instance counts from zero; take all of its samples next
+            self.metrics_seq = 0
+            return
+        self.metrics_seq = seq
+        self.append_samples(series)
+
+    def on_metrics_error(self, error):
+        """dingod cannot be reached: sample here for a while"""
+        print(f"GetMetrics failed: {error}")
+        self.metrics_pending = False
+        self.daemon_retry = time.monotonic() + DAEMON_RETRY_SECONDS
+        self.sample_locally()
+
+    def sample_locally(self):
+        """Samples from /proc in this process, taken every second on its own timer"""
+        if self.local_metrics is None:
+            self.local_metrics = MetricsCollector(history=HISTORY_SECONDS, linger=LOCAL_LINGER_SECONDS)
+            self.local_seq = 0
+        seq, timestamps, series = self.local_metrics.get(self.local_seq)
+        self.local_seq = seq
+        self.local_samples += len(timestamps)
+        self.append_samples(series)
+
+    def stop_local_sampler(self):
+        """dingod answers again"""
+        if self.local_metrics is not None:
+            self.local_metrics.stop()
+            self.local_metrics = None
+
+    def append_samples(self, series):
+        """Append new samples to every ring and redraw the cards"""
+        for name, ring in self.history.items():
+            for value in series.get(name, ()):
+                ring.append(value)
+        for ring, value_label, sparkline, fmt in self.live_values:
+            if ring.seq:
+                value_label.set_text(fmt(ring.data[(ring.seq - 1) % ring.size]))
+            sparkline.queue_draw()
+
     def create_system_info(self):
         """Create system information display"""
         grid = Gtk.Grid()
@@ -127,14 +279,12 @@ class DashboardView(Gtk.Box):
         grid.set_row_spacing(12)
         grid.set_margin_top(12)
 
-        # Get system info
-        cpu_percent = psutil.cpu_percent(interval=0.1)
+        # Get system info; CPU and memory are in the live cards
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
 
         info_items = [
-            ("CPU Usage:", f"{cpu_percent:.1f}%"),
-            ("Memory:", f"{memory.percent:.1f}% ({memory.used // (1024**3)}GB / {memory.total // (1024**3)}GB)"),
+            ("Memory:", f"{memory.total // (1024**3)}GB"),
             ("Disk:", f"{disk.percent:.1f}% ({disk.used // (1024**3)}GB / {disk.total // (1024**3)}GB)"),
             ("Kernel:", self.get_kernel_version()),
         ]
@@ -151,6 +301,71 @@ class DashboardView(Gtk.Box):
 
         return grid
 
+    def create_process_row(self, header=False):
+        """One line of labels in the process column layout"""
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        for prop, title, width in PROCESS_COLUMNS:
+            label = Gtk.Label(label=title if header else "")
+            if width is None:
+                label.set_xalign(0)
+                label.set_hexpand(True)
+                label.set_ellipsize(Pango.EllipsizeMode.END)
+            else:
+                label.set_xalign(1)
+                label.set_width_chars(width)
+            if header:
+                label.add_css_class("dim-label")
+            box.append(label)
+        return box
+
+    def create_process_list(self):
+        """Top processes list; rows are updated in place on every sample"""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_margin_top(12)
+        box.append(self.create_process_row(header=True))
+
+        self.process_store = Gio.ListStore(item_type=ProcessRow)
+        self.process_bindings = {}
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", lambda f, item: item.set_child(self.create_process_row()))
+        factory.connect("bind", self.on_process_bind)
+        factory.connect("unbind", self.on_process_unbind)
+
+        list_view = Gtk.ListView(model=Gtk.NoSelection(model=self.process_store), factory=factory)
+        list_view.add_css_class("card")
+        box.append(list_view)
+        return box
+
+    def on_process_bind(self, factory, list_item):
+        """Follow the row's properties with the item's labels"""
+        row = list_item.get_item()
+        label = list_item.get_child().get_first_child()
+        bindings = []
+        for prop, title, width in PROCESS_COLUMNS:
+            bindings.append(row.bind_property(prop, label, "label", GObject.BindingFlags.SYNC_CREATE))
+            label = label.get_next_sibling()
+        self.process_bindings[list_item] = bindings
+
+    def on_process_unbind(self, factory, list_item):
+        """Stop following a recycled item's row"""
+        for binding in self.process_bindings.pop(list_item, ()):
+            binding.unbind()
+
+    def on_processes(self, rows):
+        """New sample: update the existing rows, add or drop only the difference"""
+        store = self.process_store
+        count = store.get_n_items()
+        for i, values in enumerate(rows):
+            if i < count:
+                store.get_item(i).update(*values)
+            else:
+                row = ProcessRow()
+                row.update(*values)
+                store.append(row)
+        if count > len(rows):
+            store.splice(len(rows), count - len(rows), [])
+
     def create_quick_actions(self):
         """Create quick actions buttons"""
         box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
@@ -180,8 +395,4 @@ class DashboardView(Gtk.Box):
 
     def get_kernel_version(self):
         """Get kernel version"""
-        try:
-            result = subprocess.run(['uname', '-r'], capture_output=True, text=True)
-            return result.stdout.strip()
-        except:
-            return "Unknown"
+        return os.uname().release
@@ -7,9 +7,13 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
 from gi.repository import Gtk, Adw
-import subprocess
 import shutil
 
+from ..services.toolchains import probe_toolchains
+
+# Toolchains listed under Installed Languages (names from toolprobe.TOOLCHAINS)
+LANGUAGES = ("Python", "Node.js", "Go", "Rust", "Java")
+
 
 class DeveloperView(Gtk.Box):
     """Developer tools view"""
@@ -64,21 +68,16 @@ class DeveloperView(Gtk.Box):
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
         box.set_margin_top(12)
 
-        languages = [
-            ("Python", "python3", "--version"),
-            ("Node.js", "node", "--version"),
-            ("Go", "go", "version"),
-            ("Rust", "rustc", "--version"),
-            ("Java", "java", "--version"),
-        ]
-
-        for name, cmd, arg in languages:
-            row = self.create_language_row(name, cmd, arg)
+        # Rows show "Checking…" until their probe answers
+        self.language_rows = {}
+        for name in LANGUAGES:
+            row = self.create_language_row(name)
             box.append(row)
+        probe_toolchains(LANGUAGES, self.on_version)
 
         return box
 
-    def create_language_row(self, name, cmd, arg):
+    def create_language_row(self, name):
         """Create a language row"""
         row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
         row.add_css_class("card")
@@ -92,22 +91,30 @@ class DeveloperView(Gtk.Box):
         row.append(name_label)
 
         # Version
-        version = self.get_version(cmd, arg)
-        version_label = Gtk.Label(label=version)
+        version_label = Gtk.Label(label="Checking…")
         version_label.add_css_class("dim-label")
         version_label.set_halign(Gtk.Align.START)
         version_label.set_hexpand(True)
         row.append(version_label)
 
         # Status
-        status = "✓ Installed" if version != "Not installed" else "✗ Not found"
-        status_label = Gtk.Label(label=status)
-        if version != "Not installed":
-            status_label.add_css_class("success")
+        status_label = Gtk.Label(label="")
         row.append(status_label)
 
+        self.language_rows[name] = (version_label, status_label)
         return row
 
+    def on_version(self, name, version):
+        """A toolchain probe finished"""
+        version_label, status_label = self.language_rows[name]
+        if version is None:
+            version_label.set_text("Not installed")
+            status_label.set_text("✗ Not found")
+        else:
+            version_label.set_text(version)
+            status_label.set_text("✓ Installed")
+            status_label.add_css_class("success")
+
     def create_tools_list(self):
         """Create list of development tools"""
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
@@ -172,21 +179,3 @@ class DeveloperView(Gtk.Box):
             box.append(btn)
 
         return box
-
-    def get_version(self, cmd, arg):
-        """Get version of a command"""
-        try:
-            result = subprocess.run(
-                [cmd, arg],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            output = result.stdout + result.stderr
-            # Extract version number
-            lines = output.split('\n')
-            if lines:
-                return lines[0][:50]  # Truncate long output
-            return "Installed"
-        except:
-            return "Not installed"
@@ -6,9 +6,11 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
-from gi.repository import Gtk, Adw
-import subprocess
+from gi.repository import Gtk, Adw, GLib
 import os
+import threading
+
+from dingo_common import hwinfo
 
 
 class GamingView(Gtk.Box):
@@ -88,23 +90,22 @@ class GamingView(Gtk.Box):
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
         box.set_margin_top(12)
 
-        # Get GPU info
-        gpu_name = self.get_gpu_name()
-        
         info_card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
         info_card.add_css_class("card")
 
-        name_label = Gtk.Label(label=gpu_name)
-        name_label.add_css_class("title-3")
-        name_label.set_halign(Gtk.Align.START)
-        info_card.append(name_label)
+        self.gpu_label = Gtk.Label(label="Detecting GPU...")
+        self.gpu_label.add_css_class("title-3")
+        self.gpu_label.set_halign(Gtk.Align.START)
+        info_card.append(self.gpu_label)
 
         # Driver info
-        driver = self.get_driver_info()
-        driver_label = Gtk.Label(label=f"Driver: {driver}")
-        driver_label.add_css_class("dim-label")
-        driver_label.set_halign(Gtk.Align.START)
-        info_card.append(driver_label)
+        self.driver_label = Gtk.Label(label="Driver: ...")
+        self.driver_label.add_css_class("dim-label")
+        self.driver_label.set_halign(Gtk.Align.START)
+        info_card.append(self.driver_label)
+
+        # The inventory may scan sysfs, so it is read once, off the UI thread
+        threading.Thread(target=self.load_inventory, daemon=True, name='dingo-hwinfo').start()
 
         box.append(info_card)
 
@@ -188,35 +189,22 @@ class GamingView(Gtk.Box):
             # TODO: Disable GameMode
         return False
 
-    def get_gpu_name(self):
+    def load_inventory(self):
+        """Read the PCI inventory and show it on the main loop"""
+        GLib.idle_add(self.on_inventory, hwinfo.inventory())
+
+    def on_inventory(self, devices):
+        """Fill in the GPU card"""
+        self.gpu_label.set_label(self.get_gpu_name(devices))
+        self.driver_label.set_label(f"Driver: {self.get_driver_info(devices)}")
+        return False
+
+    def get_gpu_name(self, devices):
         """Get GPU name"""
-        try:
-            result = subprocess.run(
-                ['lspci'],
-                capture_output=True,
-                text=True
-            )
-            for line in result.stdout.split('\n'):
-                if 'VGA' in line or '3D' in line:
-                    parts = line.split(': ')
-                    if len(parts) > 1:
-                        return parts[1]
-            return "GPU not detected"
-        except:
-            return "Unknown GPU"
-
-    def get_driver_info(self):
+        gpus = hwinfo.gpus(devices)
+        return hwinfo.gpu_name(gpus[0]) if gpus else "GPU not detected"
+
+    def get_driver_info(self, devices):
         """Get driver information"""
-        # Check for NVIDIA
-        if os.path.exists('/proc/driver/nvidia/version'):
-            try:
-                with open('/proc/driver/nvidia/version', 'r') as f:
-                    return f.readline().strip()
-            except:
-                pass
-        
-        # Check for AMD
-        if os.path.exists('/sys/module/amdgpu'):
-            return "AMDGPU (Open Source)"
-        
-        return "Unknown driver"
+        gpus = hwinfo.gpus(devices)
+        return hwinfo.driver_description(gpus[0]) if gpus else "Unknown driver"
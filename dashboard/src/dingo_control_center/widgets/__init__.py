@@ -0,0 +1,9 @@
+"""
+Custom widgets for Dingo Control Center
+"""
+
+from .sparkline import Sparkline
+
+__all__ = [
+    'Sparkline',
+]
@@ -0,0 +1,105 @@
+"""
+Sparkline - scrolling history graph of a ring buffer
+"""
+
+import time
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Gsk', '4.0')
+
+from gi.repository import Gtk, Gdk, Gsk, Graphene
+
+# Samples per cached path
+CHUNK = 32
+
+# Drawing time allowed per frame
+FRAME_BUDGET = 0.001
+
+
+class Sparkline(Gtk.Widget):
+    """Filled history graph of a metrics.RingBuffer, newest sample on the right
+
+    The area under the samples is built as paths in sample/value space,
+    CHUNK samples each. A finished chunk's path is built once and reused
+    every frame, so a frame only builds the path of the newest samples;
+    scrolling, resizing and rescaling are a transform on the snapshot.
+    The widget only reads the ring, which is written in place.
+    """
+
+    __gtype_name__ = 'DingoSparkline'
+
+    def __init__(self, ring, maximum=None, **kwargs):
+        super().__init__(**kwargs)
+        self.ring = ring
+        self.maximum = maximum      # None: scale to the highest value shown
+        self.color = Gdk.RGBA(red=0.21, green=0.52, blue=0.89, alpha=0.6)
+        self.chunks = {}            # chunk number -> (Gsk.Path, highest value)
+        self.first_chunk = 0
+
+        # Drawing cost, for checking against FRAME_BUDGET
+        self.frames = 0
+        self.draw_time = 0.0
+        self.over_budget = 0
+
+        self.set_size_request(-1, 48)
+        self.set_hexpand(True)
+
+    def build_path(self, first, last):
+        """Area under samples first..last (sample numbers); returns (path, highest value)"""
+        data, size = self.ring.data, self.ring.size
+        builder = Gsk.PathBuilder.new()
+        builder.move_to(first, 0)
+        highest = 0.0
+        for sample in range(first, last + 1):
+            value = data[sample % size]
+            builder.line_to(sample, value)
+            if value > highest:
+                highest = value
+        builder.line_to(last, 0)
+        builder.close()
+        return builder.to_path(), highest
+
+    def do_snapshot(self, snapshot):
+        start = time.perf_counter()
+        ring = self.ring
+        newest = ring.seq - 1
+        oldest = max(0, ring.seq - ring.size)
+        if newest - oldest < 1:
+            return
+
+        # Forget chunks that scrolled out, build the ones finished since
+        chunks = self.chunks
+        while self.first_chunk < oldest // CHUNK:
+            chunks.pop(self.first_chunk, None)
+            self.first_chunk += 1
+        for chunk in range(self.first_chunk, newest // CHUNK):
+            if chunk not in chunks:
+                chunks[chunk] = self.build_path(max(chunk * CHUNK, oldest), chunk * CHUNK + CHUNK)
+
+        newest_start = max(newest // CHUNK * CHUNK, oldest)
+        current = self.build_path(newest_start, newest) if newest > newest_start else None
+
+        highest = self.maximum
+        if highest is None:
+            highest = max(max((h for p, h in chunks.values()), default=0.0),
+                          current[1] if current else 0.0) or 1.0
+
+        width, height = self.get_width(), self.get_height()
+        snapshot.push_clip(Graphene.Rect().init(0, 0, width, height))
+        snapshot.save()
+        snapshot.translate(Graphene.Point().init(0, height))
+        snapshot.scale(width / (ring.size - 1), -height / highest)
+        snapshot.translate(Graphene.Point().init(ring.size - 1 - newest, 0))
+        for path, h in chunks.values():
+            snapshot.append_fill(path, Gsk.FillRule.WINDING, self.color)
+        if current:
+            snapshot.append_fill(current[0], Gsk.FillRule.WINDING, self.color)
+        snapshot.restore()
+        snapshot.pop()
+
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        self.draw_time += elapsed
+        if elapsed > FRAME_BUDGET:
+            self.over_budget += 1
@@ -2,19 +2,36 @@
 Dingo Control Center Main Window
 """
 
+import importlib
+import os
+import sys
+
 import gi
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
-from gi.repository import Gtk, Adw, GLib
+from gi.repository import Gtk, Adw, Gio, GLib
+
+from dingo_common.procscan import process_age
+
+from .services.dbus_client import DaemonClient
+from .services.scheduler import RefreshScheduler
+
+# Views: stack page, module, class, and whether it is built in idle time
+# after first paint. The others probe the system while being built, so
+# they are only built when first shown.
+VIEWS = (
+    ("dashboard", ".views.dashboard_view", "DashboardView", True),
+    ("developer", ".views.developer_view", "DeveloperView", True),
+    ("gaming", ".views.gaming_view", "GamingView", True),
+    ("blockchain", ".views.blockchain_view", "BlockchainView", True),
+    ("security", ".views.security_view", "SecurityView", False),
+    ("settings", ".views.settings_view", "SettingsView", True),
+)
 
-from .views.dashboard_view import DashboardView
-from .views.developer_view import DeveloperView
-from .views.gaming_view import GamingView
-from .views.blockchain_view import BlockchainView
-from .views.security_view import SecurityView
-from .views.settings_view import SettingsView
+# Process start to the first frame on screen
+FIRST_PAINT_BUDGET_MS = 300
 
 
 class DingoWindow(Adw.ApplicationWindow):
@@ -26,12 +43,20 @@ class DingoWindow(Adw.ApplicationWindow):
         self.set_title("Dingo Control Center")
         self.set_default_size(1200, 800)
         
-        # Build UI
+        # Build UI; views are built after first paint or when first shown
+        self.views = {}
+        self.first_paint = None
         self.build_ui()
+        self.connect("realize", self.on_realize)
         
         # Start system monitor
         self.start_monitoring()
 
+        report_after = os.environ.get('DINGO_REPORT_WAKEUPS')
+        if report_after:
+            # benchmarks/bench_idle_wakeups.py
+            GLib.timeout_add_seconds(int(report_after), self.report_wakeups)
+
     def build_ui(self):
         """Build the main UI"""
         # Main layout
@@ -60,28 +85,20 @@ class DingoWindow(Adw.ApplicationWindow):
         self.split_view = Adw.NavigationSplitView()
         self.main_box.append(self.split_view)
         
-        # Sidebar
-        sidebar = self.create_sidebar()
-        self.split_view.set_sidebar(sidebar)
-
-        # Content area
+        # Content area, before the sidebar selects its first page
         self.content_stack = Gtk.Stack()
         self.content_stack.set_transition_type(Gtk.StackTransitionType.CROSSFADE)
         
-        # Add views
-        self.dashboard_view = DashboardView()
-        self.developer_view = DeveloperView()
-        self.gaming_view = GamingView()
-        self.blockchain_view = BlockchainView()
-        self.security_view = SecurityView()
-        self.settings_view = SettingsView()
-
-        self.content_stack.add_named(self.dashboard_view, "dashboard")
-        self.content_stack.add_named(self.developer_view, "developer")
-        self.content_stack.add_named(self.gaming_view, "gaming")
-        self.content_stack.add_named(self.blockchain_view, "blockchain")
-        self.content_stack.add_named(self.security_view, "security")
-        self.content_stack.add_named(self.settings_view, "settings")
+        # A placeholder per view until the view is built
+        for name, module, class_name, prebuild in VIEWS:
+            placeholder = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+            placeholder.set_vexpand(True)
+            placeholder.append(Gtk.Spinner(spinning=True, vexpand=True))
+            self.content_stack.add_named(placeholder, name)
+        
+        # Sidebar
+        sidebar = self.create_sidebar()
+        self.split_view.set_sidebar(sidebar)
 
         content_page = Adw.NavigationPage(
             title="Dashboard",
@@ -204,8 +221,66 @@ class DingoWindow(Adw.ApplicationWindow):
         """Handle navigation selection"""
         if row:
             page_name = row.get_name()
+            if self.first_paint is not None:
+                self.build_view(page_name)
             self.content_stack.set_visible_child_name(page_name)
 
+    def build_view(self, name):
+        """Build a view in place of its placeholder, once"""
+        if name in self.views:
+            return
+        module, class_name = next((m, c) for n, m, c, p in VIEWS if n == name)
+        view_class = getattr(importlib.import_module(module, __package__), class_name)
+        view = self.views[name] = view_class()
+
+        placeholder = self.content_stack.get_child_by_name(name)
+        visible = self.content_stack.get_visible_child() is placeholder
+        self.content_stack.remove(placeholder)
+        self.content_stack.add_named(view, name)
+        if visible:
+            self.content_stack.set_visible_child(view)
+
+    def on_realize(self, widget):
+        """Watch for the first frame"""
+        clock = self.get_frame_clock()
+        self.paint_handler = clock.connect("after-paint", self.on_first_paint)
+
+    def on_first_paint(self, clock):
+        """Measure first paint, then build views in idle time"""
+        clock.disconnect(self.paint_handler)
+        self.first_paint = process_age() or 0.0
+        first_paint_ms = self.first_paint * 1000
+        if first_paint_ms > FIRST_PAINT_BUDGET_MS:
+            print(f"First paint after {first_paint_ms:.0f} ms, over the {FIRST_PAINT_BUDGET_MS} ms budget",
+                  file=sys.stderr)
+        if os.environ.get('DINGO_REPORT_FIRST_PAINT'):
+            # benchmarks/bench_first_paint.py
+            print(f"first_paint_ms={first_paint_ms:.1f}", flush=True)
+            self.get_application().quit()
+            return
+
+        # The page on screen first, then the views that are cheap to build
+        visible = self.content_stack.get_visible_child_name()
+        pending = [visible] + [n for n, m, c, prebuild in VIEWS if prebuild and n != visible]
+        GLib.idle_add(self.build_next_view, pending, priority=GLib.PRIORITY_LOW)
+
+    def build_next_view(self, pending):
+        """Build one pending view per idle callback"""
+        self.build_view(pending.pop(0))
+        return bool(pending)
+
+    def report_wakeups(self):
+        """Print the refresh scheduler's wakeups and quit"""
+        scheduler = RefreshScheduler.get_default()
+        print(f"wakeups={scheduler.total_wakeups}", flush=True)
+        print(f"wakeups_per_minute={scheduler.average_wakeups_per_minute():.1f}", flush=True)
+        dashboard = self.views.get('dashboard')
+        if dashboard is not None:
+            print(f"metrics_calls={dashboard.metrics_calls}", flush=True)
+            print(f"local_samples={dashboard.local_samples}", flush=True)
+        self.get_application().quit()
+        return False
+
     def create_menu(self):
         """Create the application menu"""
         menu = Gio.Menu()
@@ -216,12 +291,15 @@ class DingoWindow(Adw.ApplicationWindow):
 
     def start_monitoring(self):
         """Start system monitoring"""
-        # Update status every 5 seconds
-        GLib.timeout_add_seconds(5, self.update_status)
-        self.update_status()
+        # dingod pushes changes, nothing is polled
+        self.daemon = DaemonClient(self.update_status)
+
+    def update_status(self, changed):
+        """Update system status from changed daemon properties"""
+        if not self.daemon.connected:
+            self.status_label.set_text("System: daemon not available")
+            return
 
-    def update_status(self):
-        """Update system status"""
-        # This would be replaced with actual system monitoring
         self.status_label.set_text("System: ✓ Healthy")
-        return True  # Continue timeout
+        if 'Profile' in changed:
+            self.profile_label.set_text(f"Profile: {changed['Profile'].title()}")
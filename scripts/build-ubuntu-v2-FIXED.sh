@@ -488,6 +488,17 @@ else
     log_warning "Dashboard folder not found at $DASHBOARD_DIR"
 fi
 
+# Shared modules of dingod, both Control Centers and the dingo CLI
+COMMON_DIR="$SCRIPT_DIR/common/dingo_common"
+if [ -d "$COMMON_DIR" ]; then
+    log_info "Installing the dingo_common package"
+    sudo mkdir -p "$CHROOT_DIR/usr/lib/python3/dist-packages"
+    sudo cp -r "$COMMON_DIR" "$CHROOT_DIR/usr/lib/python3/dist-packages/"
+    log_success "dingo_common installed"
+else
+    log_warning "Shared package not found at $COMMON_DIR"
+fi
+
 # Run customization inside chroot
 log_info "Running customization inside chroot (20-30 minutes)"
 if sudo chroot "$CHROOT_DIR" /bin/bash -c "/root/customize.sh"; then
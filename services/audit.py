@@ -0,0 +1,106 @@
+"""
+Dingo OS Daemon - Security audit checks
+Registry of independent checks that RunSecurityAudit runs concurrently
+"""
+
+import logging
+import subprocess
+import time
+from collections import namedtuple
+
+from stats import child_process
+
+logger = logging.getLogger('dingod')
+
+AUTH_LOG = '/var/log/auth.log'
+AUTH_LOG_TAIL = 256 * 1024  # Only scan the most recent part of the log
+
+AuditCheck = namedtuple('AuditCheck', ['name', 'func', 'timeout'])
+
+# Registered checks, in report order
+CHECKS = {}
+
+
+def register(name, timeout=5.0):
+    """Decorator adding a check to the registry
+
+    A check takes a timeout in seconds and returns (ok, detail). Raising
+    subprocess.TimeoutExpired marks it as timed out, any other exception
+    as an error.
+    """
+    def decorator(func):
+        CHECKS[name] = AuditCheck(name, func, timeout)
+        return func
+    return decorator
+
+
+def run_tool(cmd, timeout):
+    """Run an audit tool, killing it when the timeout expires"""
+    with child_process():
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+
+@register('ufw')
+def check_ufw(timeout):
+    """Firewall is active"""
+    result = run_tool(['ufw', 'status'], timeout)
+    first_line = result.stdout.strip().split('\n')[0]
+    return result.returncode == 0 and 'inactive' not in first_line, first_line
+
+
+@register('fail2ban')
+def check_fail2ban(timeout):
+    """fail2ban server is running"""
+    result = run_tool(['fail2ban-client', 'status'], timeout)
+    jails = [l for l in result.stdout.split('\n') if 'Jail list' in l]
+    return result.returncode == 0, jails[0].strip() if jails else result.stderr.strip()
+
+
+@register('apparmor')
+def check_apparmor(timeout):
+    """AppArmor is loaded"""
+    result = run_tool(['aa-status'], timeout)
+    lines = result.stdout.strip().split('\n')
+    return result.returncode == 0, lines[1].strip() if len(lines) > 1 else ''
+
+
+@register('open_ports')
+def check_open_ports(timeout):
+    """Report listening TCP sockets"""
+    result = run_tool(['ss', '-Htln'], timeout)
+    ports = sorted({l.split()[3].rsplit(':', 1)[-1] for l in result.stdout.split('\n') if l.strip()})
+    return result.returncode == 0, f"{len(ports)} listening: {', '.join(ports)}"
+
+
+@register('auth_log', timeout=2.0)
+def check_auth_log(timeout):
+    """Count recent failed password attempts"""
+    try:
+        with open(AUTH_LOG, 'rb') as f:
+            f.seek(0, 2)
+            f.seek(max(0, f.tell() - AUTH_LOG_TAIL))
+            failures = f.read().count(b'Failed password')
+    except FileNotFoundError:
+        return True, "No auth log"
+    return failures == 0, f"{failures} failed password attempts"
+
+
+def run_check(check):
+    """Run one check and describe the outcome"""
+    start = time.monotonic()
+    try:
+        ok, detail = check.func(check.timeout)
+        status = 'pass' if ok else 'fail'
+    except subprocess.TimeoutExpired:
+        ok, status, detail = False, 'timeout', f"No answer after {check.timeout:g}s"
+    except FileNotFoundError as e:
+        ok, status, detail = False, 'missing', f"{e.filename} not installed"
+    except Exception as e:
+        ok, status, detail = False, 'error', str(e)
+
+    return {
+        'ok': ok,
+        'status': status,
+        'detail': detail,
+        'duration': time.monotonic() - start,
+    }
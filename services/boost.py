@@ -0,0 +1,214 @@
+"""
+Dingo OS Daemon - Per-process boost
+Raises the CPU and I/O priority of a process tree and pins it to the
+fastest cores
+"""
+
+import errno
+import logging
+import os
+import subprocess
+
+from stats import child_process
+
+logger = logging.getLogger('dingod')
+
+PROC_ROOT = '/proc'
+SYS_ROOT = '/sys'
+
+# Not in mainline; only kernels with the MuQSS/-ck patches know it
+SCHED_ISO = 4
+
+
+def read_text(path):
+    """Contents of a small /proc or /sys file, or None"""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class ProcessBooster:
+    """Apply nice, ioprio, affinity and scheduling policy to a process tree
+
+    Every thread of the process and its descendants is boosted, since
+    these attributes are per thread. SCHED_ISO is used where the kernel
+    has it; SCHED_RR only when realtime is allowed, and then only for the
+    main thread.
+    """
+
+    def __init__(self, nice=-5, ioprio=0, pin=True, realtime=False,
+                 proc_root=PROC_ROOT, sys_root=SYS_ROOT):
+        self.nice = nice
+        self.ioprio = ioprio
+        self.pin = pin
+        self.realtime = realtime
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+        self.cpus = None
+
+    def uids(self, pid):
+        """Real, effective, saved and filesystem uids of a process"""
+        status = read_text(os.path.join(self.proc_root, str(pid), 'status'))
+        if status is None:
+            raise ProcessLookupError(f"No process {pid}")
+        for line in status.splitlines():
+            if line.startswith('Uid:'):
+                return {int(u) for u in line.split()[1:]}
+        raise ProcessLookupError(f"No owner for process {pid}")
+
+    def owned(self, pid, uid):
+        """Whether a process runs as uid only; setuid processes do not"""
+        try:
+            return self.uids(pid) == {uid}
+        except ProcessLookupError:
+            return False
+
+    def children(self, pid):
+        """Direct children of a process"""
+        task_dir = os.path.join(self.proc_root, str(pid), 'task')
+        try:
+            tids = os.listdir(task_dir)
+        except OSError:
+            return []
+
+        children = []
+        for tid in tids:
+            text = read_text(os.path.join(task_dir, tid, 'children'))
+            if text is None:
+                return self.children_by_scan(pid)
+            children.extend(int(c) for c in text.split())
+        return children
+
+    def children_by_scan(self, pid):
+        """Children from every process's ppid, for kernels without .../children"""
+        children = []
+        for name in os.listdir(self.proc_root):
+            if not name.isdigit():
+                continue
+            stat = read_text(os.path.join(self.proc_root, name, 'stat'))
+            if stat and int(stat.rsplit(')', 1)[1].split()[1]) == pid:
+                children.append(int(name))
+        return children
+
+    def tree(self, pid):
+        """The process and all its descendants"""
+        pids, todo = [], [pid]
+        while todo:
+            current = todo.pop()
+            pids.append(current)
+            todo.extend(self.children(current))
+        return pids
+
+    def threads(self, pid):
+        """Thread ids of a process"""
+        try:
+            return [int(t) for t in os.listdir(os.path.join(self.proc_root, str(pid), 'task'))]
+        except OSError:
+            return []
+
+    def fastest_cpus(self):
+        """CPUs with the highest capacity or maximum frequency
+
+        On hybrid (P/E core) and big.LITTLE systems that is the big cores;
+        when every CPU is the same, no pinning is done.
+        """
+        if self.cpus is not None:
+            return self.cpus
+
+        speeds = {}
+        cpu_dir = os.path.join(self.sys_root, 'devices/system/cpu')
+        try:
+            names = os.listdir(cpu_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if not (name.startswith('cpu') and name[3:].isdigit()):
+                continue
+            value = (read_text(os.path.join(cpu_dir, name, 'cpu_capacity'))
+                     or read_text(os.path.join(cpu_dir, name, 'cpufreq/cpuinfo_max_freq')))
+            if value:
+                speeds[int(name[3:])] = int(value)
+
+        if speeds and len(set(speeds.values())) > 1:
+            fastest = max(speeds.values())
+            self.cpus = {cpu for cpu, speed in speeds.items() if speed == fastest}
+        else:
+            self.cpus = set()
+        return self.cpus
+
+    def boost(self, pid, uid=None):
+        """Boost a process tree; uid, when given, must own the process
+
+        Descendants that uid does not own, such as setuid helpers, are
+        skipped. Returns a report with the boosted and skipped pids, thread
+        count, pinned CPUs, scheduling policy and any errors.
+        """
+        pids = self.tree(pid)
+        skipped = []
+        if uid not in (None, 0):
+            if self.uids(pid) != {uid}:
+                raise PermissionError(f"Process {pid} belongs to another user")
+            skipped = [p for p in pids[1:] if not self.owned(p, uid)]
+            pids = [p for p in pids if p not in skipped]
+
+        tids = [tid for p in pids for tid in self.threads(p)]
+        if not tids:
+            raise ProcessLookupError(f"No process {pid}")
+        cpus = self.fastest_cpus() if self.pin else set()
+        errors = []
+
+        for tid in tids:
+            try:
+                os.setpriority(os.PRIO_PROCESS, tid, self.nice)
+                if cpus:
+                    os.sched_setaffinity(tid, cpus)
+            except ProcessLookupError:
+                continue  # Thread exited meanwhile
+            except OSError as e:
+                errors.append(f"{tid}: {e.strerror}")
+
+        errors.extend(self.set_ioprio(tids))
+        policy = self.set_policy(pid, errors)
+
+        logger.info("Boosted %d threads of %d processes under %d (%s)", len(tids), len(pids), pid, policy)
+        return {
+            'pids': pids,
+            'skipped': skipped,
+            'threads': len(tids),
+            'cpus': sorted(cpus),
+            'nice': self.nice,
+            'policy': policy,
+            'errors': errors,
+        }
+
+    def set_ioprio(self, tids):
+        """Best-effort I/O class at self.ioprio for every thread, in one ionice call"""
+        if not tids:
+            return []
+        cmd = ['ionice', '-c', '2', '-n', str(self.ioprio), '-p'] + [str(t) for t in tids]
+        try:
+            with child_process():
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return [f"ionice: {e}"]
+        # Threads that exited in the meantime are not an error
+        return [l for l in result.stderr.splitlines() if 'No such process' not in l]
+
+    def set_policy(self, pid, errors):
+        """SCHED_ISO, or SCHED_RR if allowed, for the main thread"""
+        try:
+            os.sched_setscheduler(pid, SCHED_ISO, os.sched_param(0))
+            return 'iso'
+        except OSError as e:
+            if e.errno != errno.EINVAL:
+                errors.append(f"SCHED_ISO: {e.strerror}")
+
+        if self.realtime:
+            try:
+                os.sched_setscheduler(pid, os.SCHED_RR, os.sched_param(1))
+                return 'rr'
+            except OSError as e:
+                errors.append(f"SCHED_RR: {e.strerror}")
+        return 'normal'
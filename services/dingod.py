@@ -8,267 +8,772 @@ import dbus
 import dbus.service
 import dbus.mainloop.glib
 from gi.repository import GLib
-import subprocess
-import json
 import logging
 import sys
+import threading
+import time
+import tomllib
+from functools import cached_property
 from pathlib import Path
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Only what the first reply needs is imported here; audit, boost,
+# dpkg_index, gaming, gamewatch, hwinfo, metrics, packages, profiles and
+# systemd load on first use
+from executor import WorkerPool
+from logsink import level_number, setup_logging
+from notify import ChangeNotifier
+from singleflight import shared, single_flight
+from stats import BUCKETS, StatsRegistry, instrument
+from tuning import TuningBackend
+from statestore import StateStore
+from updates import UpdateCache, DEFAULT_TTL
+
+# Handlers are installed by logsink.setup_logging() in main()
 logger = logging.getLogger('dingod')
 
 # D-Bus constants
 BUS_NAME = 'org.dingoos.Daemon'
 OBJECT_PATH = '/org/dingoos/Daemon'
 
+# Exported properties and their D-Bus types
+PROPERTIES_IFACE = 'org.freedesktop.DBus.Properties'
+PROPERTY_TYPES = {
+    'Profile': dbus.String,
+    'GamingMode': dbus.Boolean,
+    'UpdatesAvailable': dbus.Int32,
+    'Services': lambda units: dbus.Dictionary(units, signature='ss'),
+}
+STATUS_COMPONENTS = {
+    'Profile': 'profile',
+    'GamingMode': 'gaming_mode',
+    'UpdatesAvailable': 'updates',
+}
+
 # Config paths
 CONFIG_DIR = Path('/etc/dingo')
 PROFILES_DIR = CONFIG_DIR / 'profiles'
+DAEMON_CONFIG = CONFIG_DIR / 'dingod.conf'
 STATE_FILE = Path('/var/lib/dingo/state.json')
+STATS_FILE = Path('/var/lib/dingo/dingod.prom')
+
+# Exit after this many idle seconds (0 = never) when bus-activated
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_FIRST_REPLY_BUDGET_MS = 300
+
+
+def load_config():
+    """Load daemon configuration"""
+    if DAEMON_CONFIG.exists():
+        try:
+            with open(DAEMON_CONFIG, 'rb') as f:
+                return tomllib.load(f)
+        except Exception as e:
+            logger.error("Failed to load config: %s", e)
+    return {}
 
 
 class DingoState:
-    """Manages Dingo OS state"""
+    """Manages Dingo OS state
+
+    Writes are coalesced and persisted in the background by StateStore;
+    call close() on shutdown to flush.
+    """
     
-    def __init__(self):
-        self.state = self.load_state()
+    def __init__(self, options=None, on_change=None):
+        options = options or {}
+        self.on_change = on_change
+        self.store = StateStore(
+            STATE_FILE,
+            debounce=options.get('debounce_ms', 500) / 1000,
+            journal=options.get('journal', False),
+            compact_bytes=options.get('compact_bytes', 64 * 1024),
+        )
+        self.load_state()
+        self.store.start()
     
     def load_state(self):
         """Load state from disk"""
-        if STATE_FILE.exists():
-            try:
-                with open(STATE_FILE, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load state: {e}")
-        
-        # Default state
-        return {
+        return self.store.load({
             'profile': 'standard',
             'gaming_mode': False,
             'services': {},
             'last_update': None,
-        }
-    
-    def save_state(self):
-        """Save state to disk"""
-        try:
-            STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(STATE_FILE, 'w') as f:
-                json.dump(self.state, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save state: {e}")
+        })
     
     def get(self, key, default=None):
         """Get state value"""
-        return self.state.get(key, default)
+        return self.store.get(key, default)
     
     def set(self, key, value):
         """Set state value"""
-        self.state[key] = value
-        self.save_state()
+        changed = self.store.get(key) != value
+        self.store.set(key, value)
+        if changed and self.on_change:
+            self.on_change(key, value)
+    
+    def close(self):
+        """Flush pending writes"""
+        self.store.close()
 
 
+@instrument
+@single_flight
 class DingoDaemon(dbus.service.Object):
-    """Main Dingo OS daemon"""
+    """Main Dingo OS daemon
+
+    Methods that touch apt, systemd or other tools are asynchronous: the
+    blocking part runs on the worker pool and the D-Bus reply is sent from
+    the main loop when it finishes, so other clients are never blocked.
     
-    def __init__(self, bus, object_path):
+    Startup only loads state and the update cache; the other components
+    are cached properties created on first use, from the main loop.
+    """
+    
+    def __init__(self, bus, object_path, config=None, log_ring=None):
         super().__init__(bus, object_path)
-        self.state = DingoState()
+        self.bus = bus
+        self.config = config if config is not None else {}
+        self.log_ring = log_ring
+        self.stats = StatsRegistry()
+        self.flights = {}
+        self.notifier = ChangeNotifier(self.emit_changes)
+        self.state = DingoState(self.config.get('state'), on_change=self.on_state_changed)
+        self.tuning = TuningBackend(**self.config.get('tuning', {}))
+        self.workers = WorkerPool(self.config.get('workers'))
+        self.audit_serial = 0
+        # Profile and gaming switches write the same tunables
+        self.switch_lock = threading.Lock()
+        self.install_waiters = {}
+        self.updates = UpdateCache(
+            self.workers,
+            ttl=self.config.get('updates', {}).get('check_interval', DEFAULT_TTL),
+            on_change=lambda count: self.notifier.changed('UpdatesAvailable', count)
+        )
+        self.updates.start(self.state.get('updates_cache'))
+        
+        self.notifier.seed('Profile', self.state.get('profile'))
+        self.notifier.seed('GamingMode', self.state.get('gaming_mode'))
+        self.notifier.seed('UpdatesAvailable', self.updates.count)
+        self.notifier.seed('Services', {})
+        self.emitted_services = {}
+        
+        stats_options = self.config.get('stats', {})
+        self.stats_file = stats_options.get('textfile', STATS_FILE)
+        self.stats.start_export(self.stats_file, stats_options.get('export_interval', 60))
+        
+        daemon_options = self.config.get('daemon', {})
+        self.stats.first_reply_budget = daemon_options.get(
+            'first_reply_budget_ms', DEFAULT_FIRST_REPLY_BUDGET_MS) / 1000
+        self.idle_timeout = daemon_options.get('idle_timeout', DEFAULT_IDLE_TIMEOUT)
+        self.idle_timer_id = None
+        self.on_idle = None
+        
+        # Set while gaming mode is on because a game was detected
+        self.auto_gaming = False
+        if self.config.get('gaming', {}).get('auto_gamemode', False):
+            # After the calls that activated us have been answered
+            GLib.idle_add(self.start_game_watch)
         logger.info("Dingo daemon initialized")
     
+    @cached_property
+    def systemd(self):
+        """systemd client"""
+        from systemd import SystemdManager
+        return SystemdManager(self.bus, on_state_changed=self.on_unit_changed)
+    
+    @cached_property
+    def profiles(self):
+        """Profile engine"""
+        from profiles import ProfileEngine
+        return ProfileEngine(self.state, self.tuning, self.systemd, lock=self.switch_lock)
+    
+    @cached_property
+    def gaming(self):
+        """Gaming mode transition engine"""
+        from gaming import GamingEngine
+        return GamingEngine(self.state, self.tuning, lock=self.switch_lock)
+    
+    @cached_property
+    def booster(self):
+        """Per-process boost"""
+        from boost import ProcessBooster
+        options = self.config.get('gaming', {})
+        return ProcessBooster(
+            nice=options.get('boost_nice', -5),
+            ioprio=options.get('boost_ioprio', 0),
+            pin=options.get('boost_pin_cores', True),
+            realtime=options.get('boost_realtime', False),
+        )
+    
+    @cached_property
+    def game_watcher(self):
+        """Game detection"""
+        from gamewatch import GameWatcher
+        options = self.config.get('gaming', {})
+        return GameWatcher(
+            self.on_game_started,
+            self.on_games_stopped,
+            names=options.get('detect_names', []),
+            interval=options.get('detect_interval', 2),
+            exit_grace=options.get('detect_exit_grace', 10),
+            max_overhead=options.get('detect_max_cpu_percent', 0.5) / 100,
+        )
+    
+    @cached_property
+    def packages(self):
+        """Install queue"""
+        from packages import PackageQueue
+        return PackageQueue(
+            self.workers,
+            on_progress=self.JobProgress,
+            on_finished=self.on_install_finished
+        )
+    
+    @cached_property
+    def metrics(self):
+        """System sampler"""
+        from dingo_common.metrics import MetricsCollector
+        return MetricsCollector(**self.config.get('metrics', {}))
+    
+    @cached_property
+    def dpkg(self):
+        """Installed package index"""
+        from dpkg_index import DpkgIndex
+        index = DpkgIndex(self.workers)
+        index.start()
+        return index
+    
+    def loaded(self, name):
+        """Whether a lazy component has been created"""
+        return name in self.__dict__
+    
     @dbus.service.method(BUS_NAME, out_signature='a{sv}')
     def GetStatus(self):
         """Get system status"""
-        logger.info("GetStatus called")
+        logger.debug("GetStatus called")
         
+        updates, updates_age = self.updates.get()
         status = {
             'profile': self.state.get('profile'),
             'gaming_mode': self.state.get('gaming_mode'),
             'health': 'healthy',
-            'updates_available': self.check_updates(),
+            'updates_available': dbus.Int32(updates),
+            'updates_age': dbus.Double(updates_age),
         }
+        if self.loaded('game_watcher'):
+            status['game'] = self.game_watcher.active or ''
+            status['game_watch_cpu'] = dbus.Double(self.game_watcher.overhead)
         
         return status
     
-    @dbus.service.method(BUS_NAME, in_signature='s', out_signature='b')
-    def SetProfile(self, profile_name):
+    @dbus.service.method(BUS_NAME, out_signature='ada{sa{sv}}')
+    def GetStats(self):
+        """Get per-method call statistics
+        
+        Returns the histogram bucket upper bounds in seconds and, per
+        method, calls, errors, calls that shared another call's execution
+        (saved), total and child-process seconds, p50/p95/p99
+        latency estimates and the total and child-process histograms (one
+        count per bucket plus one for larger values).
+        """
+        methods = {}
+        for name, stats in self.stats.snapshot().items():
+            methods[name] = {
+                'calls': dbus.UInt64(stats['calls']),
+                'errors': dbus.UInt64(stats['errors']),
+                'saved': dbus.UInt64(stats['saved']),
+                'seconds': dbus.Double(stats['seconds']),
+                'child_seconds': dbus.Double(stats['child_seconds']),
+                'p50': dbus.Double(stats['p50']),
+                'p95': dbus.Double(stats['p95']),
+                'p99': dbus.Double(stats['p99']),
+                'histogram': dbus.Array(stats['histogram'], signature='t'),
+                'child_histogram': dbus.Array(stats['child_histogram'], signature='t'),
+            }
+        return dbus.Array(BUCKETS, signature='d'), methods
+    
+    @dbus.service.method(BUS_NAME, in_signature='su', out_signature='a(dss)')
+    def GetRecentLogs(self, level, limit):
+        """Get the newest daemon log records at or above level
+        
+        Returns up to limit (timestamp, level, message) entries, oldest
+        first, from the in-memory log ring.
+        """
+        if self.log_ring is None:
+            return dbus.Array([], signature='(dss)')
+        return dbus.Array([
+            (created, logging.getLevelName(levelno).lower(), message)
+            for created, levelno, message in self.log_ring.recent(level_number(level), int(limit))
+        ], signature='(dss)')
+    
+    @dbus.service.method(BUS_NAME, in_signature='t', out_signature='tada{sad}')
+    def GetMetrics(self, since_seq):
+        """Get system metric samples newer than since_seq
+        
+        Returns the newest sequence number (pass it back on the next call),
+        the sample timestamps and one array per series: cpu and memory in
+        percent, disk_read, disk_write, net_rx and net_tx in bytes/s.
+        """
+        seq, timestamps, series = self.metrics.get(int(since_seq))
+        return (
+            dbus.UInt64(seq),
+            dbus.Array(timestamps, signature='d'),
+            {name: dbus.Array(values, signature='d') for name, values in series.items()},
+        )
+    
+    @dbus.service.method(BUS_NAME, in_signature='s', out_signature='b',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def SetProfile(self, profile_name, reply_handler, error_handler):
         """Set active profile"""
-        logger.info(f"SetProfile called: {profile_name}")
+        logger.info("SetProfile called: %s", profile_name)
+        
+        # Create the engine here on the main loop, not in the worker
+        engine = self.profiles
+        self.workers.submit(
+            'service', self.set_profile, engine, str(profile_name),
+            reply_handler=reply_handler, error_handler=error_handler
+        )
+    
+    @dbus.service.method(BUS_NAME, out_signature='sda{sa{sv}}')
+    def GetProfileReport(self):
+        """Get per-knob timing of the last profile switch
         
+        Returns the profile name, total switch time in seconds and, per
+        knob, its value, status (applied, unchanged, failed, skipped),
+        duration and error.
+        """
+        return self.profiles.last_report
+    
+    @dbus.service.method(BUS_NAME, in_signature='as', out_signature='b',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def InstallPackages(self, packages, reply_handler, error_handler):
+        """Install packages and reply when the job completes"""
+        logger.info("InstallPackages called: %s", packages)
+        
+        try:
+            job_id = self.submit_install(packages)
+        except dbus.exceptions.DBusException as e:
+            error_handler(e)
+            return
+        self.install_waiters[job_id] = reply_handler
+    
+    @dbus.service.method(BUS_NAME, in_signature='as', out_signature='u')
+    def SubmitInstall(self, packages):
+        """Queue packages for installation and return the job id
+        
+        Progress is reported through JobProgress and completion through
+        JobFinished.
+        """
+        logger.info("SubmitInstall called: %s", packages)
+        
+        return self.submit_install(packages)
+    
+    @dbus.service.signal(BUS_NAME, signature='uds')
+    def JobProgress(self, job_id, percent, message):
+        """Signal install progress for a job"""
+        pass
+    
+    @dbus.service.signal(BUS_NAME, signature='ubs')
+    def JobFinished(self, job_id, success, message):
+        """Signal when an install job completes"""
+        pass
+    
+    @dbus.service.method(BUS_NAME, in_signature='as', out_signature='a{s(ss)}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def QueryPackages(self, names, reply_handler, error_handler):
+        """Look up installed version and dpkg state for packages
+        
+        The first call after activation is answered once the index has
+        been built.
+        """
+        names = [str(n) for n in names]
+        index = self.dpkg
+        index.when_ready(lambda: reply_handler(index.query(names)))
+    
+    @dbus.service.method(BUS_NAME, in_signature='b', out_signature='b',
+                         sender_keyword='sender',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def SetGamingMode(self, enabled, sender, reply_handler, error_handler):
+        """Enable/disable gaming mode
+        
+        Desktop-session settings (GameMode, audio, compositor) are applied
+        in the caller's session.
+        """
+        logger.info("SetGamingMode called: %s", enabled)
+        
+        # An explicit choice is kept when the detected game exits
+        self.auto_gaming = False
+        # Created here, on the main loop, before the worker uses it
+        engine = self.gaming
+        self.workers.submit(
+            'service', self.set_gaming_mode, engine, bool(enabled), self.session_uid(sender),
+            reply_handler=reply_handler, error_handler=error_handler
+        )
+    
+    @dbus.service.method(BUS_NAME, out_signature='sda{sa{sv}}')
+    def GetGamingReport(self):
+        """Get per-setting timing of the last gaming mode switch
+        
+        Same layout as GetProfileReport.
+        """
+        return self.gaming.last_report
+    
+    @dbus.service.method(BUS_NAME, in_signature='u', out_signature='a{sv}',
+                         sender_keyword='sender',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def BoostProcess(self, pid, sender, reply_handler, error_handler):
+        """Raise priority of a process tree and pin it to the fastest cores
+        
+        Applies nice, I/O priority, CPU affinity and SCHED_ISO (or SCHED_RR
+        when [gaming] boost_realtime is set) to every thread. Callers other
+        than root may only boost their own processes, and only the ones in
+        the tree that they own. Returns the boosted and skipped pids,
+        thread count, cpus, nice value, policy and errors.
+        """
+        logger.info("BoostProcess called: %s", pid)
+        
+        booster = self.booster
+        uid = int(self.bus.get_unix_user(sender))
+        
+        def on_boosted(report):
+            reply_handler({
+                'pids': dbus.Array(report['pids'], signature='u'),
+                'skipped': dbus.Array(report['skipped'], signature='u'),
+                'threads': dbus.UInt32(report['threads']),
+                'cpus': dbus.Array(report['cpus'], signature='u'),
+                'nice': dbus.Int32(report['nice']),
+                'policy': report['policy'],
+                'errors': dbus.Array(report['errors'], signature='s'),
+            })
+        
+        self.workers.submit(
+            'service', booster.boost, int(pid), uid,
+            reply_handler=on_boosted, error_handler=error_handler
+        )
+    
+    @dbus.service.method(BUS_NAME, out_signature='aa{ss}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    @shared
+    def GetHardware(self, reply_handler, error_handler):
+        """Get the PCI devices: slot, class, vendor_id, device_id, vendor,
+        device, driver and driver_version
+        
+        Scanned once per boot; the result is cached in
+        /var/lib/dingo/hardware.json, where the Control Centers read it too.
+        """
+        from dingo_common import hwinfo
+        self.workers.submit(
+            'query', hwinfo.inventory,
+            reply_handler=reply_handler, error_handler=error_handler
+        )
+    
+    @dbus.service.method(BUS_NAME, in_signature='s', out_signature='b',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def StartService(self, service_name, reply_handler, error_handler):
+        """Start a service"""
+        logger.info("StartService called: %s", service_name)
+        
+        self.systemd.start_units(
+            [str(service_name)],
+            lambda results: reply_handler(all(r == 'done' for r in results.values()))
+        )
+    
+    @dbus.service.method(BUS_NAME, in_signature='s', out_signature='b',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def StopService(self, service_name, reply_handler, error_handler):
+        """Stop a service"""
+        logger.info("StopService called: %s", service_name)
+        
+        self.systemd.stop_units(
+            [str(service_name)],
+            lambda results: reply_handler(all(r == 'done' for r in results.values()))
+        )
+    
+    @dbus.service.method(BUS_NAME, in_signature='as', out_signature='a{ss}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def StartServices(self, service_names, reply_handler, error_handler):
+        """Start several services, returning the job result per unit"""
+        logger.info("StartServices called: %s", service_names)
+        
+        self.systemd.start_units([str(s) for s in service_names], reply_handler)
+    
+    @dbus.service.method(BUS_NAME, in_signature='as', out_signature='a{ss}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def StopServices(self, service_names, reply_handler, error_handler):
+        """Stop several services, returning the job result per unit"""
+        logger.info("StopServices called: %s", service_names)
+        
+        self.systemd.stop_units([str(s) for s in service_names], reply_handler)
+    
+    @dbus.service.method(BUS_NAME, in_signature='as', out_signature='a{ss}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    @shared
+    def GetServiceStates(self, service_names, reply_handler, error_handler):
+        """Get the ActiveState of services"""
+        self.systemd.unit_states([str(s) for s in service_names], reply_handler)
+    
+    @dbus.service.method(BUS_NAME, out_signature='a{sa{sv}}',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    @shared
+    def RunSecurityAudit(self, reply_handler, error_handler):
+        """Run security audit
+        
+        All registered checks run concurrently with their own timeouts.
+        AuditCheckCompleted is emitted as each one finishes; the reply
+        maps check name to its result once all are done.
+        """
+        logger.info("RunSecurityAudit called")
+        import audit
+        
+        self.audit_serial += 1
+        audit_id = self.audit_serial
+        checks = list(audit.CHECKS.values())
+        results = {}
+        
+        def on_result(name, result):
+            results[name] = result
+            self.AuditCheckCompleted(audit_id, name, result)
+            if len(results) == len(checks):
+                statuses = {n: r['status'] for n, r in results.items()}
+                logger.info("Security audit results: %s", statuses)
+                reply_handler(results)
+        
+        for check in checks:
+            self.workers.submit(
+                'audit', audit.run_check, check,
+                reply_handler=lambda result, name=check.name: on_result(name, result),
+                error_handler=error_handler
+            )
+    
+    @dbus.service.signal(BUS_NAME, signature='usa{sv}')
+    def AuditCheckCompleted(self, audit_id, name, result):
+        """Signal when a single audit check finishes"""
+        pass
+    
+    @dbus.service.method(PROPERTIES_IFACE, in_signature='ss', out_signature='v')
+    def Get(self, interface, name):
+        """Get a daemon property"""
+        props = self.GetAll(interface)
+        if name not in props:
+            raise dbus.exceptions.DBusException(
+                f"No such property: {name}",
+                name='org.freedesktop.DBus.Error.UnknownProperty'
+            )
+        return props[name]
+    
+    @dbus.service.method(PROPERTIES_IFACE, in_signature='s', out_signature='a{sv}')
+    def GetAll(self, interface):
+        """Get all daemon properties"""
+        if interface != BUS_NAME:
+            raise dbus.exceptions.DBusException(
+                f"No such interface: {interface}",
+                name='org.freedesktop.DBus.Error.UnknownInterface'
+            )
+        return {
+            name: PROPERTY_TYPES[name](self.notifier.get(name))
+            for name in PROPERTY_TYPES
+        }
+    
+    @dbus.service.method(PROPERTIES_IFACE, in_signature='ssv')
+    def Set(self, interface, name, value):
+        """Properties are read-only; use the methods to change them"""
+        raise dbus.exceptions.DBusException(
+            f"Property {name} is read-only",
+            name='org.freedesktop.DBus.Error.PropertyReadOnly'
+        )
+    
+    @dbus.service.signal(PROPERTIES_IFACE, signature='sa{sv}as')
+    def PropertiesChanged(self, interface, changed, invalidated):
+        """Standard property change signal"""
+        pass
+    
+    @dbus.service.signal(BUS_NAME, signature='ss')
+    def StatusChanged(self, component, status):
+        """Signal when status changes"""
+        logger.info("Status changed: %s -> %s", component, status)
+    
+    # Worker implementations - these run on the worker pool, never on
+    # the main loop, and may block.
+    
+    def set_profile(self, engine, profile_name):
+        """Validate and apply a profile"""
         valid_profiles = ['standard', 'developer', 'gaming', 'blockchain', 'security']
         if profile_name not in valid_profiles:
-            logger.error(f"Invalid profile: {profile_name}")
+            logger.error("Invalid profile: %s", profile_name)
             return False
         
-        # Apply profile
+        # The standard profile is the system default, it has no file
         profile_file = PROFILES_DIR / f"{profile_name}.conf"
-        if not profile_file.exists():
-            logger.error(f"Profile file not found: {profile_file}")
+        if profile_name == 'standard':
+            profile_file = None
+        elif not profile_file.exists():
+            logger.error("Profile file not found: %s", profile_file)
             return False
         
         try:
-            # Load and apply profile settings
-            self.apply_profile(profile_file)
+            ok, report = engine.switch(profile_name, profile_file)
+            if not ok:
+                failed = [k for k, r in report.items() if r['status'] == 'failed']
+                logger.error("Profile %s partially applied, failed: %s", profile_name, failed)
+                return False
             self.state.set('profile', profile_name)
-            logger.info(f"Profile set to: {profile_name}")
+            logger.info("Profile set to: %s", profile_name)
             return True
         except Exception as e:
-            logger.error(f"Failed to set profile: {e}")
-            return False
-    
-    @dbus.service.method(BUS_NAME, in_signature='as', out_signature='b')
-    def InstallPackages(self, packages):
-        """Install packages"""
-        logger.info(f"InstallPackages called: {packages}")
-        
-        try:
-            cmd = ['apt-get', 'install', '-y'] + list(packages)
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                logger.info("Packages installed successfully")
-                return True
-            else:
-                logger.error(f"Package installation failed: {result.stderr}")
-                return False
-        except Exception as e:
-            logger.error(f"Failed to install packages: {e}")
+            logger.error("Failed to set profile: %s", e)
             return False
     
-    @dbus.service.method(BUS_NAME, in_signature='b', out_signature='b')
-    def SetGamingMode(self, enabled):
-        """Enable/disable gaming mode"""
-        logger.info(f"SetGamingMode called: {enabled}")
-        
+    def set_gaming_mode(self, engine, enabled, uid):
+        """Switch gaming mode on or off"""
         try:
             if enabled:
-                # Enable GameMode
-                self.run_command(['systemctl', '--user', 'start', 'gamemoded'])
-                # Set performance governor
-                self.run_command(['cpupower', 'frequency-set', '-g', 'performance'])
+                ok, report = engine.enable(PROFILES_DIR / 'gaming.conf', uid)
             else:
-                # Disable GameMode
-                self.run_command(['systemctl', '--user', 'stop', 'gamemoded'])
-                # Set powersave governor
-                self.run_command(['cpupower', 'frequency-set', '-g', 'powersave'])
+                ok, report = engine.disable()
             
             self.state.set('gaming_mode', enabled)
-            return True
+            if not ok:
+                failed = [k for k, r in report.items() if r['status'] == 'failed']
+                logger.error("Gaming mode partially switched, failed: %s", failed)
+            return ok
         except Exception as e:
-            logger.error(f"Failed to set gaming mode: {e}")
+            logger.error("Failed to set gaming mode: %s", e)
             return False
     
-    @dbus.service.method(BUS_NAME, in_signature='s', out_signature='b')
-    def StartService(self, service_name):
-        """Start a service"""
-        logger.info(f"StartService called: {service_name}")
-        
+    def start_game_watch(self):
+        """Start game detection ([gaming] auto_gamemode)"""
         try:
-            result = subprocess.run(
-                ['systemctl', 'start', service_name],
-                capture_output=True,
-                text=True
-            )
-            return result.returncode == 0
-        except Exception as e:
-            logger.error(f"Failed to start service: {e}")
-            return False
+            self.game_watcher.start()
+        except OSError as e:
+            logger.error("Cannot watch for games: %s", e)
+        return False
     
-    @dbus.service.method(BUS_NAME, in_signature='s', out_signature='b')
-    def StopService(self, service_name):
-        """Stop a service"""
-        logger.info(f"StopService called: {service_name}")
+    def on_game_started(self, pid, uid, name):
+        """A game started: switch gaming mode on unless it already is"""
+        if self.state.get('gaming_mode'):
+            return
+        self.auto_gaming = True
+        self.workers.submit(
+            'service', self.set_gaming_mode, self.gaming, True, uid if uid != 0 else None
+        )
+    
+    def on_games_stopped(self):
+        """The last game exited: undo what on_game_started switched on"""
+        if self.auto_gaming and self.state.get('gaming_mode'):
+            self.workers.submit('service', self.set_gaming_mode, self.gaming, False, None)
+        self.auto_gaming = False
+    
+    def session_uid(self, sender):
+        """uid whose desktop session a caller runs in, None for root"""
+        uid = int(self.bus.get_unix_user(sender))
+        return uid if uid != 0 else None
+    
+    def on_state_changed(self, key, value):
+        """Forward persisted state changes that are exposed as properties"""
+        if key == 'profile':
+            self.notifier.changed('Profile', value)
+        elif key == 'gaming_mode':
+            self.notifier.changed('GamingMode', value)
+    
+    def on_unit_changed(self, unit, state):
+        """A tracked systemd unit changed state"""
+        self.notifier.changed('Services', dict(self.systemd.states))
+    
+    def emit_changes(self, changes):
+        """Emit one PropertiesChanged and StatusChanged per component"""
+        self.PropertiesChanged(
+            BUS_NAME,
+            {name: PROPERTY_TYPES[name](value) for name, value in changes.items()},
+            dbus.Array([], signature='s')
+        )
         
+        for name, value in changes.items():
+            if name == 'Services':
+                for unit, state in value.items():
+                    if self.emitted_services.get(unit) != state:
+                        self.StatusChanged(unit, state)
+                self.emitted_services = dict(value)
+            else:
+                self.StatusChanged(STATUS_COMPONENTS[name], str(value))
+    
+    def submit_install(self, packages):
+        """Queue an install job; invalid package names are an InvalidArgs error"""
         try:
-            result = subprocess.run(
-                ['systemctl', 'stop', service_name],
-                capture_output=True,
-                text=True
+            return self.packages.submit([str(p) for p in packages])
+        except ValueError as e:
+            raise dbus.exceptions.DBusException(
+                str(e), name='org.freedesktop.DBus.Error.InvalidArgs'
             )
-            return result.returncode == 0
-        except Exception as e:
-            logger.error(f"Failed to stop service: {e}")
-            return False
     
-    @dbus.service.method(BUS_NAME, out_signature='b')
-    def RunSecurityAudit(self):
-        """Run security audit"""
-        logger.info("RunSecurityAudit called")
-        
-        try:
-            # Run security checks
-            checks = [
-                ('ufw', ['ufw', 'status']),
-                ('fail2ban', ['fail2ban-client', 'status']),
-                ('apparmor', ['aa-status']),
-            ]
-            
-            results = {}
-            for name, cmd in checks:
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                results[name] = result.returncode == 0
-            
-            logger.info(f"Security audit results: {results}")
-            return all(results.values())
-        except Exception as e:
-            logger.error(f"Security audit failed: {e}")
-            return False
+    def on_install_finished(self, job_id, success, message):
+        """Emit JobFinished and answer a waiting InstallPackages call"""
+        self.JobFinished(job_id, success, message)
+        reply_handler = self.install_waiters.pop(job_id, None)
+        if reply_handler:
+            reply_handler(success)
     
-    @dbus.service.signal(BUS_NAME, signature='ss')
-    def StatusChanged(self, component, status):
-        """Signal when status changes"""
-        logger.info(f"Status changed: {component} -> {status}")
+    def busy(self):
+        """Whether any call, job or client-driven activity is in progress"""
+        return bool(
+            self.workers.pending
+            or self.flights
+            or self.install_waiters
+            or self.notifier.timer_id
+            or (self.loaded('packages') and (self.packages.running or self.packages.pending))
+            or (self.loaded('systemd') and self.systemd.jobs)
+            or (self.loaded('metrics') and self.metrics.timer_id)
+            # Game detection keeps the daemon resident
+            or (self.loaded('game_watcher') and self.game_watcher.mode)
+        )
     
-    def apply_profile(self, profile_file):
-        """Apply profile configuration"""
-        logger.info(f"Applying profile: {profile_file}")
+    def start_idle_timer(self, on_idle):
+        """Call on_idle once nothing happened for idle_timeout seconds"""
+        self.on_idle = on_idle
+        if self.idle_timeout > 0:
+            self.idle_timer_id = GLib.timeout_add_seconds(int(self.idle_timeout), self.on_idle_check)
+    
+    def on_idle_check(self):
+        """Exit if idle, otherwise check again when the timeout could expire"""
+        idle_for = time.monotonic() - self.stats.last_call
+        if self.busy():
+            remaining = self.idle_timeout
+        else:
+            remaining = self.idle_timeout - idle_for
         
-        # Read profile config
-        with open(profile_file, 'r') as f:
-            config = f.read()
+        if remaining > 0:
+            self.idle_timer_id = GLib.timeout_add_seconds(max(1, int(remaining)), self.on_idle_check)
+            return False
         
-        # Parse and apply settings
-        # TODO: Implement profile application logic
-        pass
+        self.idle_timer_id = None
+        logger.info("Idle for %.0fs, exiting", idle_for)
+        self.on_idle()
+        return False
     
-    def check_updates(self):
-        """Check for available updates"""
-        try:
-            result = subprocess.run(
-                ['apt-get', 'upgrade', '--dry-run'],
-                capture_output=True,
-                text=True
-            )
-            
-            # Count upgradable packages
-            lines = result.stdout.split('\n')
-            upgradable = [l for l in lines if 'upgraded' in l]
-            
-            if upgradable:
-                # Parse number
-                parts = upgradable[0].split()
-                if parts:
-                    return int(parts[0])
-            
-            return 0
-        except:
-            return 0
-    
-    def run_command(self, cmd):
-        """Run a command"""
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Command failed: {result.stderr}")
-        return result.stdout
+    def shutdown(self):
+        """Stop background work and persist caches for the next start"""
+        if self.idle_timer_id:
+            GLib.source_remove(self.idle_timer_id)
+            self.idle_timer_id = None
+        self.updates.stop()
+        for name in ('dpkg', 'metrics', 'game_watcher'):
+            if self.loaded(name):
+                getattr(self, name).stop()
+        self.stats.stop_export(self.stats_file)
+        self.workers.shutdown()
+        self.state.set('updates_cache', self.updates.save())
+        self.state.close()
 
 
 def main():
     """Main entry point"""
+    config = load_config()
+    log_options = config.get('logging', {})
+    listener, log_ring = setup_logging(
+        level=config.get('general', {}).get('log_level', 'info'),
+        ring_size=log_options.get('ring_size', 1000),
+        burst=log_options.get('rate_limit_burst', 10),
+        interval=log_options.get('rate_limit_interval', 5.0),
+    )
     logger.info("Starting Dingo daemon...")
     
     # Setup D-Bus
@@ -276,21 +781,34 @@ def main():
     
     try:
         bus = dbus.SystemBus()
+        daemon = DingoDaemon(bus, OBJECT_PATH, config, log_ring=log_ring)
+        # Claim the name last: with bus activation, calls queue until then
         name = dbus.service.BusName(BUS_NAME, bus)
-        daemon = DingoDaemon(bus, OBJECT_PATH)
         
-        logger.info(f"Daemon registered on {BUS_NAME}")
+        logger.info("Daemon registered on %s", BUS_NAME)
         
-        # Run main loop
         loop = GLib.MainLoop()
+        
+        def on_idle():
+            # Calls after this start a new instance through activation
+            bus.release_name(BUS_NAME)
+            loop.quit()
+        
+        daemon.start_idle_timer(on_idle)
+        
+        # Run main loop
         logger.info("Entering main loop")
         loop.run()
+        daemon.shutdown()
     except KeyboardInterrupt:
         logger.info("Daemon stopped by user")
         sys.exit(0)
     except Exception as e:
-        logger.error(f"Daemon error: {e}")
+        logger.error("Daemon error: %s", e)
         sys.exit(1)
+    finally:
+        # Drain the log queue
+        listener.stop()
 
 
 if __name__ == '__main__':
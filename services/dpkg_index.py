@@ -0,0 +1,185 @@
+"""
+Dingo OS Daemon - dpkg status index
+In-memory view of /var/lib/dpkg/status for instant package queries
+"""
+
+import logging
+import mmap
+import os
+from pathlib import Path
+
+from watch import PathWatcher
+
+logger = logging.getLogger('dingod')
+
+DPKG_STATUS = Path('/var/lib/dpkg/status')
+NOT_INSTALLED = ('', 'not-installed')
+
+# Shared state strings so the index holds one copy of each
+STATES = {s.encode(): s for s in (
+    'installed', 'config-files', 'half-installed', 'half-configured',
+    'unpacked', 'triggers-awaited', 'triggers-pending', 'not-installed',
+)}
+
+
+def get_field(stanza, name):
+    """Return the value of a single-line field in a stanza, or None"""
+    if stanza.startswith(name):
+        start = len(name)
+    else:
+        start = stanza.find(b'\n' + name)
+        if start == -1:
+            return None
+        start += len(name) + 1
+
+    end = stanza.find(b'\n', start)
+    return stanza[start:end if end != -1 else len(stanza)].strip()
+
+
+def parse_stanza(stanza, index):
+    """Add one stanza to index as name -> (version, state)"""
+    name = get_field(stanza, b'Package:')
+    if not name:
+        return
+
+    status = get_field(stanza, b'Status:') or b''
+    version = get_field(stanza, b'Version:') or b''
+    raw_state = status.rsplit(b' ', 1)[-1]
+    state = STATES.get(raw_state) or raw_state.decode() or 'unknown'
+    name = name.decode()
+
+    # Keep the installed entry when several architectures are listed
+    if state != 'installed' and index.get(name, NOT_INSTALLED)[1] == 'installed':
+        return
+    index[name] = (version.decode(), state)
+
+
+def parse_status(data, index=None):
+    """Parse a dpkg status database (bytes or mmap) into a dict"""
+    index = {} if index is None else index
+    pos, end = 0, len(data)
+
+    while pos < end:
+        stop = data.find(b'\n\n', pos)
+        if stop == -1:
+            stop = end
+        if stop > pos:
+            parse_stanza(data[pos:stop], index)
+        pos = stop + 2
+
+    return index
+
+
+def parse_file(path, index=None):
+    """Parse a status file through mmap"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {} if index is None else index
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_status(data, index)
+
+
+class DpkgIndex:
+    """Package name -> (version, state) index kept in sync with dpkg
+
+    dpkg records each change as a small file in updates/ and only folds
+    them into the status file periodically. The status file is re-parsed
+    only when it is replaced; otherwise just the pending update records
+    are applied on top of the last full parse. Queries that arrive before
+    the first parse has finished wait for it through when_ready().
+    """
+
+    def __init__(self, workers, path=DPKG_STATUS):
+        self.workers = workers
+        self.path = Path(path)
+        self.updates_dir = self.path.parent / 'updates'
+        self.base = {}
+        self.packages = {}
+        self.base_key = None
+        self.refreshing = False
+        self.dirty = False
+        self.ready = False
+        self.waiters = []
+        self.watcher = PathWatcher([self.path, self.updates_dir], self.refresh, debounce_ms=500)
+
+    def start(self):
+        """Build the index and watch for changes"""
+        self.watcher.start()
+        self.refresh()
+
+    def stop(self):
+        """Stop watching"""
+        self.watcher.stop()
+
+    def when_ready(self, callback):
+        """Call callback() once the first load has finished (main loop)"""
+        if self.ready:
+            callback()
+        else:
+            self.waiters.append(callback)
+
+    def query(self, names):
+        """Look up packages; unknown names are reported as not installed"""
+        packages = self.packages
+        return {name: packages.get(name, NOT_INSTALLED) for name in names}
+
+    def refresh(self):
+        """Re-sync in the background"""
+        if self.refreshing:
+            self.dirty = True
+            return
+
+        self.refreshing = True
+        self.workers.submit(
+            'query', self.load,
+            reply_handler=self.on_loaded,
+            error_handler=self.on_loaded
+        )
+
+    def on_loaded(self, result=None):
+        """Refresh finished (main loop)"""
+        self.refreshing = False
+        if not self.ready:
+            self.ready = True
+            waiters, self.waiters = self.waiters, []
+            for callback in waiters:
+                callback()
+        if self.dirty:
+            self.dirty = False
+            self.refresh()
+
+    def load(self):
+        """Parse what changed since the last load (worker thread)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            logger.error("dpkg status not found: %s", self.path)
+            return
+
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key != self.base_key:
+            self.base = parse_file(self.path)
+            self.base_key = key
+            logger.info("Indexed %d packages from %s", len(self.base), self.path)
+
+        packages = self.base
+        try:
+            pending = sorted(
+                (e for e in os.scandir(self.updates_dir) if e.name.isdigit()),
+                key=lambda e: e.name
+            )
+        except FileNotFoundError:
+            pending = []
+
+        if pending:
+            packages = dict(self.base)
+            for entry in pending:
+                try:
+                    # Later records override earlier ones
+                    overlay = parse_file(entry.path)
+                except FileNotFoundError:
+                    continue
+                packages.update(overlay)
+
+        # Swap in one assignment so readers never see a partial index
+        self.packages = packages
@@ -0,0 +1,86 @@
+"""
+Dingo OS Daemon - Worker pool
+Runs blocking work off the GLib main loop with per-class concurrency limits
+"""
+
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from gi.repository import GLib
+
+logger = logging.getLogger('dingod')
+
+# Default concurrency per command class
+DEFAULT_LIMITS = {
+    'package': 1,   # apt/dpkg hold a global lock
+    'service': 4,
+    'audit': 8,     # one worker per audit check
+    'query': 2,
+}
+
+
+class WorkerPool:
+    """Bounded thread pools, one per command class
+
+    Each class gets its own executor so a long apt transaction can never
+    starve the workers that answer status queries. Results are handed back
+    to the GLib main loop before the reply/error handlers are called.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS)
+        if limits:
+            self.limits.update({k: int(v) for k, v in limits.items()})
+
+        self.executors = {
+            name: ThreadPoolExecutor(
+                max_workers=max(1, limit),
+                thread_name_prefix=f"dingod-{name}"
+            )
+            for name, limit in self.limits.items()
+        }
+        self.pending = 0
+
+    def submit(self, command_class, func, *args,
+               reply_handler=None, error_handler=None):
+        """Run func(*args) on the pool for command_class
+
+        reply_handler(result) or error_handler(exception) is invoked on the
+        main loop once the call finishes. func runs in a copy of the
+        caller's context, so per-call context variables follow it.
+        """
+        executor = self.executors.get(command_class)
+        if executor is None:
+            raise ValueError(f"Unknown command class: {command_class}")
+
+        self.pending += 1
+        future = executor.submit(contextvars.copy_context().run, func, *args)
+        future.add_done_callback(
+            lambda f: GLib.idle_add(self._dispatch, f, reply_handler, error_handler)
+        )
+        return future
+
+    def _dispatch(self, future, reply_handler, error_handler):
+        """Deliver a finished call on the main loop"""
+        self.pending -= 1
+
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error("Worker call failed: %s", e)
+            if error_handler:
+                error_handler(e)
+            return False
+
+        if reply_handler:
+            if result is None:
+                reply_handler()
+            else:
+                reply_handler(result)
+        return False  # Run once
+
+    def shutdown(self, wait=False):
+        """Stop all executors"""
+        for executor in self.executors.values():
+            executor.shutdown(wait=wait, cancel_futures=not wait)
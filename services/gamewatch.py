@@ -0,0 +1,298 @@
+"""
+Dingo OS Daemon - Game detection
+Watches new processes for games started through Steam, Proton, Lutris or
+under a configured name, and reports when the first starts and the last
+one exits
+"""
+
+import errno
+import logging
+import os
+import socket
+import struct
+import time
+
+from gi.repository import GLib
+
+from dingo_common.procscan import PROC_ROOT, list_pids, read_cmdline
+
+logger = logging.getLogger('dingod')
+
+# Netlink process connector (linux/connector.h, linux/cn_proc.h)
+NETLINK_CONNECTOR = 11
+NLMSG_DONE = 3
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+NLMSG_HEADER = struct.Struct('=IHHII')   # len, type, flags, seq, pid
+CN_MSG = struct.Struct('=IIIIHH')        # idx, val, seq, ack, len, flags
+PROC_EVENT = struct.Struct('=IIQ')       # what, cpu, timestamp_ns
+EVENT_IDS = struct.Struct('=II')         # process_pid, process_tgid
+
+# Command line fragments (lowercase, '/' separators) of launcher-started
+# games. Proton games run as Z:\...\steamapps\common\..., Steam's reaper
+# carries "SteamLaunch AppId=" and Lutris starts games under its wrapper.
+LAUNCHER_MARKERS = (
+    ('steam', '/steamapps/common/'),
+    ('steam', 'steamlaunch appid='),
+    ('lutris', 'lutris-wrapper'),
+)
+
+# Overhead is checked over windows of this many seconds
+OVERHEAD_WINDOW = 60
+MAX_INTERVAL = 60
+
+
+class GameMatcher:
+    """Decide from a /proc/<pid>/cmdline whether a process is a game"""
+
+    def __init__(self, names=()):
+        self.names = {name.lower() for name in names}
+
+    def match(self, cmdline):
+        """Launcher or configured name the command line matches, or None"""
+        if not cmdline:
+            return None  # Kernel thread or zombie
+        text = cmdline.decode('utf-8', 'replace').replace('\\', '/').lower()
+        argv0 = text.split('\0', 1)[0].rsplit('/', 1)[-1]
+        if argv0 in self.names:
+            return argv0
+
+        text = text.replace('\0', ' ')
+        for launcher, marker in LAUNCHER_MARKERS:
+            if marker in text:
+                return launcher
+        return None
+
+
+def open_connector():
+    """Netlink socket subscribed to process events; needs CAP_NET_ADMIN"""
+    sock = socket.socket(socket.AF_NETLINK,
+                         socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+                         NETLINK_CONNECTOR)
+    try:
+        sock.bind((0, CN_IDX_PROC))
+        payload = struct.pack('=I', PROC_CN_MCAST_LISTEN)
+        message = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+        sock.send(NLMSG_HEADER.pack(NLMSG_HEADER.size + len(message), NLMSG_DONE, 0, 0, 0) + message)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def parse_events(data):
+    """(what, pid, tgid) of each process event in a netlink datagram"""
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length = NLMSG_HEADER.unpack_from(data, offset)[0]
+        if length < NLMSG_HEADER.size:
+            break
+        event = offset + NLMSG_HEADER.size + CN_MSG.size
+        if event + PROC_EVENT.size + EVENT_IDS.size <= offset + length:
+            what = PROC_EVENT.unpack_from(data, event)[0]
+            pid, tgid = EVENT_IDS.unpack_from(data, event + PROC_EVENT.size)
+            yield what, pid, tgid
+        offset += (length + 3) & ~3
+
+
+class GameWatcher:
+    """Call on_started(pid, uid, name) when a game starts and on_stopped()
+    once none has run for exit_grace seconds
+
+    New processes come from the netlink process connector where the daemon
+    may open it, otherwise from a /proc listing every interval seconds in
+    which only pids not seen before are looked at. Either way a new process
+    costs one cmdline read, done settle_ms after it appeared so that
+    short-lived processes (compilers, shell pipelines) are gone by then.
+
+    Main-loop CPU time is measured; when a window uses more than
+    max_overhead of one CPU, connector events are dropped for polling and
+    the poll interval is doubled until the cost is back under it.
+    """
+
+    def __init__(self, on_started, on_stopped, names=(), interval=2, exit_grace=10,
+                 settle_ms=250, max_overhead=0.005, proc_root=PROC_ROOT):
+        self.on_started = on_started
+        self.on_stopped = on_stopped
+        self.matcher = GameMatcher(names)
+        self.interval = interval
+        self.delay = interval
+        self.exit_grace = exit_grace
+        self.settle_ms = settle_ms
+        self.max_overhead = max_overhead
+        self.proc_root = proc_root
+
+        self.games = {}         # pid -> (uid, name)
+        self.known = set()      # pids the poller has seen
+        self.pending = set()    # new pids to look at
+        self.active = None      # name of the game that switched gaming mode on
+        self.sock = None
+        self.source_id = None
+        self.inspect_id = None
+        self.grace_id = None
+        self.cpu = 0.0          # Main-loop CPU seconds spent watching
+        self.overhead = 0.0     # Share of one CPU in the last full window
+        self.window = (0.0, 0.0)
+
+    @property
+    def mode(self):
+        """'netlink', 'poll' or None when stopped"""
+        if self.source_id is None:
+            return None
+        return 'netlink' if self.sock else 'poll'
+
+    def start(self):
+        """Pick up running games and start watching"""
+        start = time.thread_time()
+        self.window = (time.monotonic(), self.cpu)
+        try:
+            self.sock = open_connector()
+            self.source_id = GLib.io_add_watch(self.sock.fileno(), GLib.IO_IN, self.on_events)
+            logger.info("Watching for games through the process connector")
+        except OSError as e:
+            logger.info("Process connector unavailable (%s), polling %s every %ss",
+                        e.strerror, self.proc_root, self.interval)
+            self.source_id = GLib.timeout_add(int(self.delay * 1000), self.on_poll)
+
+        self.known = list_pids(self.proc_root)
+        self.pending = set(self.known)
+        self.inspect()
+        self.account(start)
+
+    def stop(self):
+        """Stop watching"""
+        for attr in ('source_id', 'inspect_id', 'grace_id'):
+            if getattr(self, attr) is not None:
+                GLib.source_remove(getattr(self, attr))
+                setattr(self, attr, None)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def on_events(self, fd, condition):
+        """Read every queued connector event"""
+        start = time.thread_time()
+        while True:
+            try:
+                data = self.sock.recv(4096)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    logger.error("Process connector failed: %s", e)
+                    self.switch_to_polling()
+                    break
+                # Events were lost: compare against /proc instead
+                self.resync()
+                continue
+
+            for what, pid, tgid in parse_events(data):
+                if what == PROC_EVENT_EXEC:
+                    self.pending.add(tgid)
+                elif what == PROC_EVENT_EXIT and pid == tgid:
+                    self.pending.discard(pid)
+                    self.remove(pid)
+
+        if self.pending and self.inspect_id is None:
+            self.inspect_id = GLib.timeout_add(self.settle_ms, self.on_inspect)
+        self.account(start)
+        return self.sock is not None
+
+    def on_poll(self):
+        """Diff the pid list against the last one"""
+        start = time.thread_time()
+        pids = list_pids(self.proc_root)
+        for pid in [p for p in self.games if p not in pids]:
+            self.remove(pid)
+        self.pending |= pids - self.known
+        self.known = pids
+        self.inspect()
+
+        self.account(start)
+        self.source_id = GLib.timeout_add(int(self.delay * 1000), self.on_poll)
+        return False
+
+    def resync(self):
+        """Drop games that exited and look at every pid again"""
+        pids = list_pids(self.proc_root)
+        for pid in [p for p in self.games if p not in pids]:
+            self.remove(pid)
+        self.pending = pids - set(self.games)
+
+    def on_inspect(self):
+        """Settle delay elapsed for connector events"""
+        start = time.thread_time()
+        self.inspect_id = None
+        self.inspect()
+        self.account(start)
+        return False
+
+    def inspect(self):
+        """Read the command line of every pending pid"""
+        for pid in self.pending:
+            try:
+                name = self.matcher.match(read_cmdline(self.proc_root, pid))
+                if name is not None:
+                    self.add(pid, os.stat(os.path.join(self.proc_root, str(pid))).st_uid, name)
+            except OSError:
+                continue  # Already exited
+        self.pending.clear()
+
+    def add(self, pid, uid, name):
+        """A game process appeared"""
+        self.games[pid] = (uid, name)
+        if self.grace_id is not None:
+            GLib.source_remove(self.grace_id)
+            self.grace_id = None
+        if self.active is None:
+            self.active = name
+            logger.info("Game started: %s (pid %d, uid %d)", name, pid, uid)
+            self.on_started(pid, uid, name)
+
+    def remove(self, pid):
+        """A process exited; start the grace period after the last game"""
+        if self.games.pop(pid, None) and not self.games and self.grace_id is None:
+            self.grace_id = GLib.timeout_add_seconds(self.exit_grace, self.on_grace)
+
+    def on_grace(self):
+        """No game came back within exit_grace"""
+        self.grace_id = None
+        if not self.games and self.active is not None:
+            logger.info("Game exited: %s", self.active)
+            self.active = None
+            self.on_stopped()
+        return False
+
+    def account(self, start):
+        """Add main-loop CPU time since start and keep it under max_overhead"""
+        self.cpu += time.thread_time() - start
+        now = time.monotonic()
+        window_start, window_cpu = self.window
+        if now - window_start < OVERHEAD_WINDOW:
+            return
+
+        self.overhead = (self.cpu - window_cpu) / (now - window_start)
+        self.window = (now, self.cpu)
+        if self.overhead > self.max_overhead:
+            if self.sock is not None:
+                logger.warning("Game detection used %.2f%% CPU, polling instead of process events",
+                               self.overhead * 100)
+                self.switch_to_polling()
+            elif self.delay < MAX_INTERVAL:
+                self.delay = min(self.delay * 2, MAX_INTERVAL)
+                logger.warning("Game detection used %.2f%% CPU, polling every %ss",
+                               self.overhead * 100, self.delay)
+        elif self.overhead < self.max_overhead / 4 and self.delay > self.interval:
+            self.delay = max(self.interval, self.delay / 2)
+
+    def switch_to_polling(self):
+        """Close the connector and poll /proc from now on"""
+        GLib.source_remove(self.source_id)
+        self.sock.close()
+        self.sock = None
+        self.known = list_pids(self.proc_root)
+        self.source_id = GLib.timeout_add(int(self.delay * 1000), self.on_poll)
@@ -0,0 +1,266 @@
+"""
+Dingo OS Daemon - Gaming mode transitions
+Applies every section of gaming.conf at once: kernel tunables as one
+batch, desktop-session settings in the session of the user who asked
+"""
+
+import contextvars
+import logging
+import os
+import pwd
+import subprocess
+import threading
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+
+from profiles import TUNABLES
+from stats import child_process
+from tuning import TuningError
+
+logger = logging.getLogger('dingod')
+
+# gaming.conf settings that are not in TUNABLES: setting -> (tunable, {value: kernel value})
+GAMING_TUNABLES = {
+    'gpu.performance_mode': ('gpu.dpm_level', {True: 'high', False: 'auto'}),
+}
+
+# Desktop-session sections: section -> (switch key, enable command, disable command).
+# They run as the session's user, with that user's runtime dir and bus.
+SESSION_ACTIONS = {
+    'gamemode': (
+        'enabled',
+        ['systemctl', '--user', 'start', 'gamemoded'],
+        ['systemctl', '--user', 'stop', 'gamemoded'],
+    ),
+    'audio': (
+        'low_latency',
+        ['pw-metadata', '-n', 'settings', '0', 'clock.force-quantum', '128'],
+        ['pw-metadata', '-n', 'settings', '0', 'clock.force-quantum', '0'],
+    ),
+    'compositor': (
+        'disable_during_fullscreen',
+        ['busctl', '--user', 'call', 'org.kde.KWin', '/Compositor', 'org.kde.kwin.Compositing', 'suspend'],
+        ['busctl', '--user', 'call', 'org.kde.KWin', '/Compositor', 'org.kde.kwin.Compositing', 'resume'],
+    ),
+}
+
+
+def run_in_session(uid, cmd, timeout=10):
+    """Run a command in a user's desktop session
+
+    The daemon is a system service, so `systemctl --user` and friends
+    only reach the right session with the user's identity and its
+    XDG_RUNTIME_DIR and session bus.
+    """
+    runtime_dir = f'/run/user/{uid}'
+    env = [f'XDG_RUNTIME_DIR={runtime_dir}', f'DBUS_SESSION_BUS_ADDRESS=unix:path={runtime_dir}/bus']
+    if uid != os.getuid():
+        cmd = ['runuser', '-u', pwd.getpwuid(uid).pw_name, '--', 'env'] + env + cmd
+    else:
+        cmd = ['env'] + env + cmd
+
+    with child_process():
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"{cmd[0]} exited with {result.returncode}")
+
+
+def tunable(setting):
+    """Kernel tunable behind a gaming.conf setting"""
+    if setting in TUNABLES:
+        return TUNABLES[setting]
+    return GAMING_TUNABLES[setting][0]
+
+
+class GamingEngine:
+    """Switches gaming mode on and off with every section in parallel
+
+    Kernel tunables go out as one atomic batch on top of the active
+    profile. The values they replace are recorded in the profile engine's
+    baseline, and the values gaming mode set in gaming_settings, so there
+    is one record of the live tunables; disabling puts back what the
+    profile applied, or the baseline where it applied nothing, also when
+    the profile changed in the meantime. The session sections that were
+    switched on are kept in the daemon state too, so that disabling
+    switches off exactly those, also after a restart. Switches are
+    serialized by the lock, which the daemon shares with the profile
+    engine. The report of the last switch is kept in last_report, in the
+    same shape as the profile engine's.
+    """
+
+    def __init__(self, state, tuning, max_workers=4, lock=None):
+        self.state = state
+        self.tuning = tuning
+        self.lock = lock or threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dingod-gaming')
+        self.last_report = ('', 0.0, {})
+
+    def submit(self, func, *args):
+        """Run on the executor in the caller's context, so child time is accounted"""
+        return self.executor.submit(contextvars.copy_context().run, func, *args)
+
+    @staticmethod
+    def plan(config):
+        """Split gaming.conf into kernel tunables, session sections and skipped settings"""
+        kernel = {}
+        session = []
+        skipped = []
+
+        for section, values in config.items():
+            if section == 'profile' or not isinstance(values, dict):
+                continue
+            action = SESSION_ACTIONS.get(section)
+            for key, value in values.items():
+                setting = f"{section}.{key}"
+                if setting in TUNABLES:
+                    kernel[setting] = (TUNABLES[setting], value)
+                elif setting in GAMING_TUNABLES:
+                    tunable, values_map = GAMING_TUNABLES[setting]
+                    kernel[setting] = (tunable, values_map.get(value, value))
+                elif action and key == action[0]:
+                    if value:
+                        session.append(section)
+                else:
+                    skipped.append(setting)
+
+        return kernel, session, skipped
+
+    def enable(self, path, uid=None):
+        """Switch gaming mode on; returns (ok, report)"""
+        with self.lock:
+            start = time.monotonic()
+            with open(path, 'rb') as f:
+                kernel, session, skipped = self.plan(tomllib.load(f))
+            if uid is None:
+                skipped.extend(f"{section}.{SESSION_ACTIONS[section][0]}" for section in session)
+                session = []
+
+            baseline = dict(self.state.get('baseline') or {})
+            kernel_future = self.submit(self.apply_kernel, kernel, set(baseline))
+            session_futures = [
+                (section, self.submit(self.run_timed, uid, SESSION_ACTIONS[section][1]))
+                for section in session
+            ]
+
+            # Values already in the baseline are kept when enabled twice
+            previous, report = kernel_future.result()
+            baseline.update(previous)
+            gaming = dict(self.state.get('gaming_settings') or {})
+            gaming.update({s: value for s, (t, value) in kernel.items() if report[s]['status'] == 'applied'})
+            self.state.set('baseline', baseline)
+            self.state.set('gaming_settings', gaming)
+
+            enabled = []
+            for section, future in session_futures:
+                setting = f"{section}.{SESSION_ACTIONS[section][0]}"
+                report[setting] = future.result()
+                if report[setting]['status'] == 'applied':
+                    enabled.append(section)
+            if uid is not None:
+                self.state.set('gaming_session', {'uid': uid, 'sections': enabled})
+
+            for setting in skipped:
+                report[setting] = {'value': '', 'status': 'skipped', 'duration': 0.0, 'error': ''}
+            return self.finish('gaming', start, report)
+
+    def disable(self):
+        """Switch gaming mode off, restoring what enable() changed; returns (ok, report)"""
+        with self.lock:
+            start = time.monotonic()
+            gaming = self.state.get('gaming_settings') or {}
+            applied = self.state.get('applied_settings') or {}
+            baseline = self.state.get('baseline') or {}
+            session = self.state.get('gaming_session') or {}
+
+            if gaming:
+                restore = {s: applied.get(s, baseline.get(s)) for s in gaming}
+                restore = {s: value for s, value in restore.items() if value is not None}
+            else:
+                # Nothing recorded: the profile's governor or the power-saving default
+                restore = {'cpu.governor': applied.get('cpu.governor', 'powersave')}
+
+            kernel_future = self.submit(self.restore_kernel, restore)
+            session_futures = [
+                (section, self.submit(self.run_timed, session['uid'], SESSION_ACTIONS[section][2]))
+                for section in session.get('sections', ())
+            ]
+
+            report = kernel_future.result()
+            for section, future in session_futures:
+                report[f"{section}.{SESSION_ACTIONS[section][0]}"] = future.result()
+
+            self.state.set('gaming_settings', None)
+            self.state.set('gaming_session', None)
+            return self.finish('standard', start, report)
+
+    def finish(self, name, start, report):
+        """Record and log the switch"""
+        total = time.monotonic() - start
+        self.last_report = (name, total, report)
+        ok = all(r['status'] != 'failed' for r in report.values())
+        changed = sum(1 for r in report.values() if r['status'] == 'applied')
+        logger.info("Gaming mode %s: %d settings in %.1f ms",
+                    'on' if name == 'gaming' else 'off', changed, total * 1000)
+        return ok, report
+
+    def apply_kernel(self, kernel, known):
+        """Apply the kernel tunables as one batch; returns (previous, report)
+
+        Runs on an executor thread. previous holds the values replaced,
+        for the settings not in known, and is empty if nothing was applied.
+        """
+        start = time.monotonic()
+        previous = {}
+        report = {}
+        batch = {}
+        for setting, (tunable, value) in kernel.items():
+            if self.tuning.available(tunable):
+                batch[setting] = (tunable, value)
+            else:
+                report[setting] = {'value': str(value), 'status': 'unsupported', 'duration': 0.0, 'error': ''}
+
+        current = {s: self.tuning.read(tunable) for s, (tunable, value) in batch.items() if s not in known}
+        error = ''
+        try:
+            self.tuning.apply({tunable: value for tunable, value in batch.values()})
+            previous = current
+        except TuningError as e:
+            logger.error("Failed to apply gaming tunables: %s", e)
+            error = str(e)
+
+        duration = time.monotonic() - start
+        for setting, (tunable, value) in batch.items():
+            report[setting] = {
+                'value': str(value),
+                'status': 'failed' if error else 'applied',
+                'duration': duration,
+                'error': error,
+            }
+        return previous, report
+
+    def restore_kernel(self, settings):
+        """Put the profile's values back as one batch (executor thread)"""
+        start = time.monotonic()
+        batch = {tunable(s): value for s, value in settings.items() if self.tuning.available(tunable(s))}
+        try:
+            self.tuning.apply(batch)
+            status, error = 'applied', ''
+        except TuningError as e:
+            logger.error("Failed to restore tunables: %s", e)
+            status, error = 'failed', str(e)
+        return {'kernel.restore': {
+            'value': '', 'status': status, 'duration': time.monotonic() - start, 'error': error,
+        }}
+
+    @staticmethod
+    def run_timed(uid, cmd):
+        """Run a session command and report it (executor thread)"""
+        start = time.monotonic()
+        try:
+            run_in_session(uid, cmd)
+            status, error = 'applied', ''
+        except (OSError, RuntimeError, subprocess.TimeoutExpired, KeyError) as e:
+            logger.error("%s failed: %s", cmd[0], e)
+            status, error = 'failed', str(e)
+        return {'value': ' '.join(cmd), 'status': status, 'duration': time.monotonic() - start, 'error': error}
@@ -0,0 +1,204 @@
+"""
+Dingo OS Daemon - Logging pipeline
+Hands records to a background writer that sends them to journald's native
+socket and keeps the most recent ones in memory for GetRecentLogs
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+from collections import deque
+
+JOURNAL_SOCKET = '/run/systemd/journal/socket'
+SYSLOG_IDENTIFIER = 'dingod'
+
+# logging level -> syslog priority
+PRIORITIES = {
+    logging.CRITICAL: 2,
+    logging.ERROR: 3,
+    logging.WARNING: 4,
+    logging.INFO: 6,
+    logging.DEBUG: 7,
+}
+
+# Attributes every LogRecord has; anything else came in through extra=
+STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'suppressed'}
+
+
+def format_message(record):
+    """Message text, noting how many copies the rate limiter dropped"""
+    message = record.getMessage()
+    if getattr(record, 'suppressed', 0):
+        message += f" ({record.suppressed} similar messages suppressed)"
+    return message
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them on the calling thread
+
+    The queue never leaves the process, so the record can be passed as is
+    and the %-formatting happens on the writer thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class RateLimiter(logging.Filter):
+    """Let at most burst records per call site through in each interval
+
+    What is dropped is counted and reported on the next record from the
+    same call site that gets through.
+    """
+
+    def __init__(self, burst=10, interval=5.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sites = {}  # (pathname, lineno) -> [window start, passed, suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        now = record.created
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            site = self.sites.get(key)
+            if site is None or now - site[0] >= self.interval:
+                suppressed = site[2] if site else 0
+                self.sites[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+
+            site[2] += 1
+            return False
+
+
+class JournalHandler(logging.Handler):
+    """Send records with structured fields to journald's native protocol
+
+    Extra attributes passed with extra={'job_id': 3} become fields
+    (JOB_ID=3). Falls back to stderr where there is no journal.
+    """
+
+    def __init__(self, path=JOURNAL_SOCKET):
+        super().__init__()
+        self.path = path
+        self.sock = None
+        self.fallback = None
+
+        if os.path.exists(path):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        else:
+            self.fallback = logging.StreamHandler(sys.stderr)
+            self.fallback.setFormatter(logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            ))
+
+    @staticmethod
+    def field(name, value):
+        """One field in the native protocol's text or binary form"""
+        name = name.encode()
+        value = str(value).encode('utf-8', 'replace')
+        if b'\n' in value:
+            return name + b'\n' + struct.pack('<Q', len(value)) + value + b'\n'
+        return name + b'=' + value + b'\n'
+
+    def emit(self, record):
+        if self.sock is None:
+            self.fallback.handle(record)
+            return
+
+        try:
+            message = format_message(record)
+            if record.exc_info:
+                message += '\n' + logging.Formatter().formatException(record.exc_info)
+
+            fields = [
+                ('MESSAGE', message),
+                ('PRIORITY', PRIORITIES.get(record.levelno, 6)),
+                ('SYSLOG_IDENTIFIER', SYSLOG_IDENTIFIER),
+                ('LOGGER', record.name),
+                ('THREAD_NAME', record.threadName),
+                ('CODE_FILE', record.pathname),
+                ('CODE_LINE', record.lineno),
+                ('CODE_FUNC', record.funcName),
+            ]
+            for name, value in vars(record).items():
+                if name not in STANDARD_ATTRS and not name.startswith('_'):
+                    fields.append((name.upper(), value))
+
+            self.sock.sendto(b''.join(self.field(n, v) for n, v in fields), self.path)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+        super().close()
+
+
+class LogRing(logging.Handler):
+    """Bounded in-memory history of recent records"""
+
+    def __init__(self, size=1000):
+        super().__init__()
+        self.records = deque(maxlen=size)
+        self.ring_lock = threading.Lock()
+
+    def emit(self, record):
+        entry = (record.created, record.levelno, format_message(record))
+        with self.ring_lock:
+            self.records.append(entry)
+
+    def recent(self, level=logging.DEBUG, limit=100):
+        """Newest records at or above level, oldest first, as (time, levelno, message)"""
+        with self.ring_lock:
+            records = list(self.records)
+
+        matching = []
+        for entry in reversed(records):
+            if entry[1] >= level:
+                matching.append(entry)
+                if len(matching) >= limit:
+                    break
+        matching.reverse()
+        return matching
+
+
+def setup_logging(level='info', ring_size=1000, burst=10, interval=5.0):
+    """Route the dingod logger through the queue; returns (listener, ring)
+
+    Call listener.stop() on shutdown to drain the queue.
+    """
+    log_queue = queue.SimpleQueue()
+    ring = LogRing(ring_size)
+    listener = logging.handlers.QueueListener(
+        log_queue, JournalHandler(), ring, respect_handler_level=True
+    )
+
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RateLimiter(burst, interval))
+
+    logger = logging.getLogger('dingod')
+    logger.handlers = [handler]
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    logger.propagate = False
+
+    listener.start()
+    return listener, ring
+
+
+def level_number(name):
+    """'warning' -> logging.WARNING; unknown names mean everything"""
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else logging.DEBUG
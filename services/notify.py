@@ -0,0 +1,68 @@
+"""
+Dingo OS Daemon - Change notification
+Coalesces property changes into one PropertiesChanged emission per burst
+"""
+
+import logging
+import threading
+
+from gi.repository import GLib
+
+logger = logging.getLogger('dingod')
+
+
+class ChangeNotifier:
+    """Collect property changes and flush them after a short window
+
+    changed() may be called from any thread and only records real changes.
+    The first change of a burst arms a single timer; when it fires, emit()
+    receives every property whose value differs from what was last
+    emitted. A property that flips and flips back inside the window is
+    not reported. Nothing is scheduled while nothing changes.
+    """
+
+    def __init__(self, emit, window_ms=100):
+        self.emit = emit
+        self.window_ms = window_ms
+        self.values = {}
+        self.emitted = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.timer_id = None
+
+    def seed(self, name, value):
+        """Set the initial value of a property without notifying"""
+        with self.lock:
+            self.values[name] = self.emitted[name] = value
+
+    def get(self, name, default=None):
+        """Latest value of a property"""
+        return self.values.get(name, default)
+
+    def changed(self, name, value):
+        """Record a property value"""
+        with self.lock:
+            if name in self.values and self.values[name] == value:
+                return
+            self.values[name] = value
+            self.pending.add(name)
+            if self.timer_id is None:
+                self.timer_id = GLib.timeout_add(self.window_ms, self.flush)
+
+    def flush(self):
+        """Emit everything that changed in the window"""
+        with self.lock:
+            changes = {
+                name: self.values[name] for name in self.pending
+                if name not in self.emitted or self.emitted[name] != self.values[name]
+            }
+            self.emitted.update(changes)
+            self.pending = set()
+            self.timer_id = None
+
+        if changes:
+            try:
+                self.emit(changes)
+            except Exception as e:
+                logger.error("Failed to emit changes: %s", e)
+        return False
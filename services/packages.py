@@ -0,0 +1,193 @@
+"""
+Dingo OS Daemon - Package transaction queue
+Merges concurrent install requests into single apt transactions
+"""
+
+import logging
+import os
+import re
+import subprocess
+import tempfile
+from itertools import count
+
+from gi.repository import GLib
+
+from stats import child_process
+
+logger = logging.getLogger('dingod')
+
+# dpkg package name, optionally with an architecture qualifier
+PACKAGE_NAME = re.compile(r'[a-z0-9][a-z0-9+.-]+(?::[a-z0-9-]+)?')
+
+
+def invalid_names(packages):
+    """The names in packages that are not valid package names"""
+    return [p for p in packages if not PACKAGE_NAME.fullmatch(p)]
+
+
+class InstallJob:
+    """One caller's install request"""
+
+    def __init__(self, job_id, packages):
+        self.id = job_id
+        self.packages = list(packages)
+        self.merge = True
+
+
+def packages_to_install(packages):
+    """Drop packages that are already installed at the candidate version
+
+    Unknown packages are kept so that apt reports them.
+    """
+    with child_process():
+        result = subprocess.run(
+            ['apt-cache', 'policy', '--'] + packages,
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, LC_ALL='C')
+        )
+
+    current = set()
+    name = installed = None
+    for line in result.stdout.split('\n'):
+        if line and not line[0].isspace() and line.endswith(':'):
+            name, installed = line[:-1], None
+        elif line.strip().startswith('Installed:'):
+            installed = line.split(':', 1)[1].strip()
+        elif line.strip().startswith('Candidate:') and name:
+            candidate = line.split(':', 1)[1].strip()
+            if installed not in (None, '(none)') and installed == candidate:
+                current.add(name)
+
+    return [p for p in packages if p not in current]
+
+
+def parse_status_line(line):
+    """Turn an APT::Status-Fd line into (percent, message)
+
+    Downloads are mapped to 0-50% and dpkg work to 50-100%.
+    """
+    parts = line.rstrip('\n').split(':', 3)
+    if len(parts) != 4:
+        return None
+
+    kind, _, percent, message = parts
+    try:
+        percent = float(percent)
+    except ValueError:
+        return None
+
+    if kind == 'dlstatus':
+        return percent / 2, message
+    if kind in ('pmstatus', 'pmerror', 'pmconffile'):
+        return 50 + percent / 2, message
+    return None
+
+
+class PackageQueue:
+    """Queue of install jobs executed as merged apt transactions
+
+    Jobs submitted while a transaction is running are merged into the next
+    one. If a merged transaction fails, its jobs are retried one by one so
+    a bad package name only fails the caller that asked for it.
+    """
+
+    def __init__(self, workers, on_progress=None, on_finished=None):
+        self.workers = workers
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.ids = count(1)
+        self.pending = []
+        self.running = None
+
+    def submit(self, packages):
+        """Queue packages for installation and return the job id
+
+        Raises ValueError for anything that is not a package name; names
+        end up in apt's argv and in other callers' transactions.
+        """
+        invalid = invalid_names(packages)
+        if invalid:
+            raise ValueError(f"Invalid package names: {', '.join(invalid)}")
+        job = InstallJob(next(self.ids), packages)
+        self.pending.append(job)
+        self.kick()
+        return job.id
+
+    def kick(self):
+        """Start the next transaction if apt is idle"""
+        if self.running or not self.pending:
+            return
+
+        if self.pending[0].merge:
+            batch = [j for j in self.pending if j.merge]
+        else:
+            batch = self.pending[:1]
+        self.pending = [j for j in self.pending if j not in batch]
+        self.running = batch
+
+        self.workers.submit(
+            'package', self.run_transaction, batch,
+            reply_handler=lambda result: self.on_transaction_done(batch, result),
+            error_handler=lambda e: self.on_transaction_done(batch, (False, str(e)))
+        )
+
+    def run_transaction(self, batch):
+        """Install the union of the batch's packages (worker thread)"""
+        names = sorted({p for job in batch for p in job.packages})
+        names = packages_to_install(names)
+        if not names:
+            return True, "Already installed"
+
+        logger.info("Installing %s for jobs %s", names, [j.id for j in batch])
+
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd, 'r') as status, tempfile.TemporaryFile() as stderr, child_process():
+            try:
+                proc = subprocess.Popen(
+                    ['apt-get', 'install', '-y', '-o', f'APT::Status-Fd={write_fd}', '--'] + names,
+                    stdout=subprocess.DEVNULL,
+                    stderr=stderr,
+                    pass_fds=(write_fd,),
+                    env=dict(os.environ, DEBIAN_FRONTEND='noninteractive', LC_ALL='C')
+                )
+            finally:
+                os.close(write_fd)
+
+            for line in status:
+                progress = parse_status_line(line)
+                if progress:
+                    GLib.idle_add(self.report_progress, batch, *progress)
+
+            returncode = proc.wait()
+            stderr.seek(0)
+            errors = stderr.read().decode(errors='replace').strip()
+
+        if returncode == 0:
+            return True, "Installed"
+        return False, errors.split('\n')[-1] if errors else f"apt-get exited with {returncode}"
+
+    def report_progress(self, batch, percent, message):
+        """Forward progress for every job in the batch (main loop)"""
+        if self.on_progress:
+            for job in batch:
+                self.on_progress(job.id, percent, message)
+        return False
+
+    def on_transaction_done(self, batch, result):
+        """Complete or split the batch (main loop)"""
+        ok, message = result
+        self.running = None
+
+        if not ok and len(batch) > 1:
+            logger.warning("Merged transaction failed, retrying %d jobs separately", len(batch))
+            for job in batch:
+                job.merge = False
+            self.pending = batch + self.pending
+        else:
+            for job in batch:
+                logger.info("Package job %d finished: %s", job.id, message)
+                if self.on_finished:
+                    self.on_finished(job.id, ok, message)
+
+        self.kick()
@@ -0,0 +1,234 @@
+"""
+Dingo OS Daemon - Profile engine
+Compiles profile .conf files into knob settings and applies only the
+knobs that differ from what is currently applied
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import tomllib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from systemd import unit_name
+from tuning import TuningError
+
+logger = logging.getLogger('dingod')
+
+ProfilePlan = namedtuple('ProfilePlan', ['name', 'digest', 'settings', 'skipped'])
+
+# Profile settings that are kernel tunables, written together as one
+# batch through the tuning backend. [services] entries are started and
+# stopped as one batch through systemd; anything else is skipped.
+TUNABLES = {
+    'cpu.governor': 'cpu.governor',
+    'cpu.boost': 'cpu.boost',
+    'memory.swappiness': 'vm.swappiness',
+    'memory.cache_pressure': 'vm.cache_pressure',
+    'memory.transparent_hugepages': 'thp.enabled',
+}
+
+
+class ProfileCompiler:
+    """Parse profile files into plans, cached by mtime and content hash"""
+
+    def __init__(self):
+        self.cache = {}
+
+    def compile(self, name, path):
+        """Return the ProfilePlan for a profile file"""
+        st = os.stat(path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+
+        cached = self.cache.get(path)
+        if cached and cached[0] == stat_key:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+
+        if cached and cached[1].digest == digest:
+            # Touched but unchanged
+            self.cache[path] = (stat_key, cached[1])
+            return cached[1]
+
+        plan = self.build_plan(name, digest, tomllib.loads(data.decode()))
+        self.cache[path] = (stat_key, plan)
+        return plan
+
+    def build_plan(self, name, digest, config):
+        """Flatten sections into 'section.key' settings"""
+        settings = {}
+        skipped = []
+
+        for section, values in config.items():
+            if section == 'profile' or not isinstance(values, dict):
+                continue
+            for key, value in values.items():
+                setting = f"{section}.{key}"
+                if setting not in TUNABLES and section != 'services':
+                    skipped.append(setting)
+                elif section == 'services' and not value:
+                    # false means "not managed by this profile"
+                    continue
+                else:
+                    settings[setting] = value
+
+        return ProfilePlan(name, digest, settings, skipped)
+
+
+class ProfileEngine:
+    """Applies the difference between the current and the target profile
+
+    Applied knobs and the values they replaced are kept in the daemon
+    state. Knobs that the target profile no longer sets are restored to
+    the value they had before any profile touched them. While gaming mode
+    is on, the values it set (gaming_settings) are the live ones.
+    """
+
+    def __init__(self, state, tuning, systemd, max_workers=8, lock=None):
+        self.state = state
+        self.tuning = tuning
+        self.systemd = systemd
+        self.lock = lock or threading.Lock()
+        self.compiler = ProfileCompiler()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dingod-profile')
+        self.last_report = ('', 0.0, {})
+
+    def switch(self, name, path=None):
+        """Switch to a profile; returns (ok, report)
+
+        Switches hold the lock from reading the applied settings to
+        recording them, so concurrent ones cannot lose the baseline.
+        """
+        with self.lock:
+            start = time.monotonic()
+            plan = self.compiler.compile(name, path) if path else ProfilePlan(name, '', {}, [])
+
+            applied = dict(self.state.get('applied_settings') or {})
+            baseline = dict(self.state.get('baseline') or {})
+            gaming = self.state.get('gaming_settings') or {}
+
+            # Knobs the target no longer sets go back to their original value
+            target = dict(plan.settings)
+            for setting in list(applied):
+                if setting not in target:
+                    if setting in baseline:
+                        target[setting] = baseline[setting]
+                    else:
+                        applied.pop(setting)
+
+            actions = [
+                (setting, value) for setting, value in target.items()
+                if gaming.get(setting, applied.get(setting, baseline.get(setting, object()))) != value
+            ]
+
+            # Kernel tunables and systemd units each go out as one batch
+            kernel = {s: v for s, v in actions if s in TUNABLES}
+            units = {s: v for s, v in actions if s.startswith('services.')}
+            batches = []
+            if kernel:
+                batches.append((kernel, self.executor.submit(self.apply_kernel, dict(kernel), set(baseline))))
+            if units:
+                batches.append((units, self.executor.submit(self.apply_services, units, set(baseline))))
+
+            results = []
+            for settings, future in batches:
+                results.extend((s, settings[s], r) for s, r in future.result().items())
+
+            report = {}
+            ok = True
+            for setting, value, (status, duration, previous, error) in results:
+                if previous is not None and setting not in baseline:
+                    baseline[setting] = previous
+                if status == 'failed':
+                    ok = False
+                else:
+                    if setting in plan.settings:
+                        applied[setting] = value
+                    else:
+                        applied.pop(setting, None)
+                report[setting] = {
+                    'value': str(value),
+                    'status': status,
+                    'duration': duration,
+                    'error': error,
+                }
+
+            for setting in plan.skipped:
+                report[setting] = {'value': '', 'status': 'skipped', 'duration': 0.0, 'error': ''}
+
+            self.state.set('applied_settings', applied)
+            self.state.set('baseline', baseline)
+
+            total = time.monotonic() - start
+            self.last_report = (name, total, report)
+            changed = sum(1 for r in report.values() if r['status'] == 'applied')
+            logger.info("Profile %s: %d knobs changed in %.1f ms", name, changed, total * 1000)
+            return ok, report
+
+    def apply_kernel(self, settings, known):
+        """Apply all kernel tunables as one batch (executor thread)
+
+        The batch either applies completely or not at all.
+        """
+        start = time.monotonic()
+        results = {}
+        for setting in list(settings):
+            if not self.tuning.available(TUNABLES[setting]):
+                results[setting] = ('unsupported', 0.0, None, '')
+                del settings[setting]
+
+        previous = {s: self.tuning.read(TUNABLES[s]) for s in settings if s not in known}
+
+        try:
+            self.tuning.apply({TUNABLES[s]: v for s, v in settings.items()})
+            error = ''
+        except TuningError as e:
+            logger.error("Failed to apply kernel tunables: %s", e)
+            error = str(e)
+
+        duration = time.monotonic() - start
+        for setting, value in settings.items():
+            if error:
+                status = 'failed'
+            elif previous.get(setting) == value:
+                status = 'unchanged'
+            else:
+                status = 'applied'
+            results[setting] = (status, duration, previous.get(setting), error)
+        return results
+
+    def apply_services(self, settings, known):
+        """Start and stop all profile units in one go (executor thread)"""
+        start = time.monotonic()
+        names = {s: s.split('.', 1)[1] for s in settings}
+        capture = [names[s] for s in settings if s not in known]
+        previous = {}
+        if capture:
+            states = self.systemd.unit_states_sync(capture)
+            previous = {s: states.get(unit_name(n)) == 'active' for s, n in names.items() if n in capture}
+
+        try:
+            jobs = self.systemd.start_units_sync([n for s, n in names.items() if settings[s]])
+            jobs.update(self.systemd.stop_units_sync([n for s, n in names.items() if not settings[s]]))
+            error = ''
+        except TimeoutError as e:
+            jobs, error = {}, str(e)
+
+        duration = time.monotonic() - start
+        results = {}
+        for setting, name in names.items():
+            result = jobs.get(unit_name(name), error or 'no job')
+            if result != 'done':
+                status = 'failed'
+            elif previous.get(setting) == settings[setting]:
+                status = 'unchanged'
+            else:
+                status = 'applied'
+            results[setting] = (status, duration, previous.get(setting), '' if result == 'done' else result)
+        return results
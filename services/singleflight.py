@@ -0,0 +1,83 @@
+"""
+Dingo OS Daemon - Request sharing
+Identical read requests that arrive while one is still running attach to
+it instead of starting another execution
+"""
+
+import functools
+import logging
+
+logger = logging.getLogger('dingod')
+
+
+def shared(func):
+    """Policy marker: calls with equal arguments may share one execution
+
+    Only for asynchronous methods without side effects; anything that
+    changes the system (InstallPackages, SetProfile, ...) must not be
+    marked, every caller has to get its own execution. Put it below
+    @dbus.service.method.
+    """
+    func._dingod_shared = True
+    return func
+
+
+def freeze(value):
+    """Hashable form of D-Bus arguments"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    return value
+
+
+def single_flight_method(func):
+    """Wrap a shared method so concurrent duplicates wait for the first call
+
+    In-flight calls are kept in self.flights, keyed by method name and
+    arguments; every waiter gets the leader's reply or error. Saved
+    executions are counted in self.stats. Everything runs on the main
+    loop, so no locking is needed.
+    """
+    name = func.__name__
+    reply_name, error_name = func._dbus_async_callbacks
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        key = (name, freeze(args))
+        waiter = (kwargs[reply_name], kwargs[error_name])
+
+        waiters = self.flights.get(key)
+        if waiters is not None:
+            waiters.append(waiter)
+            self.stats.record_saved(name)
+            return None
+
+        self.flights[key] = [waiter]
+
+        def on_reply(*result):
+            for reply_handler, _ in self.flights.pop(key, ()):
+                reply_handler(*result)
+
+        def on_error(error):
+            for _, error_handler in self.flights.pop(key, ()):
+                error_handler(error)
+
+        kwargs[reply_name], kwargs[error_name] = on_reply, on_error
+        try:
+            return func(self, *args, **kwargs)
+        except Exception:
+            self.flights.pop(key, None)
+            raise
+
+    return wrapper
+
+
+def single_flight(cls):
+    """Class decorator applying single_flight_method to every @shared method"""
+    for name, attr in list(vars(cls).items()):
+        if getattr(attr, '_dingod_shared', False):
+            if not getattr(attr, '_dbus_async_callbacks', None):
+                raise TypeError(f"{name} must be asynchronous to be shared")
+            setattr(cls, name, single_flight_method(attr))
+    return cls
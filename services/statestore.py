@@ -0,0 +1,164 @@
+"""
+Dingo OS Daemon - State persistence
+Write-behind, crash-safe storage for the daemon state file
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from dingo_common.files import atomic_write
+
+logger = logging.getLogger('dingod')
+
+
+class StateStore:
+    """Coalescing, crash-safe persistence for a flat dict
+
+    Changes are buffered for debounce seconds and written by a background
+    thread. Without a journal every flush atomically replaces the snapshot.
+    With a journal every flush appends one fsync'd line holding only the
+    changed keys, and the journal is folded into the snapshot once it grows
+    past compact_bytes.
+    """
+
+    def __init__(self, path, debounce=0.5, journal=False, compact_bytes=64 * 1024):
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix('.journal') if journal else None
+        self.debounce = debounce
+        self.compact_bytes = compact_bytes
+
+        self.data = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        # Serializes writers, so journal records stay in order; set() never waits on it
+        self.write_lock = threading.Lock()
+        self.closed = False
+        self.writes = 0
+        self.thread = None
+
+    def load(self, defaults=None):
+        """Read snapshot and replay the journal"""
+        data = dict(defaults or {})
+
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    data.update(json.load(f))
+            except Exception as e:
+                logger.error("Failed to load state: %s", e)
+
+        if self.journal_path and self.journal_path.exists():
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        data.update(json.loads(line))
+                    except ValueError:
+                        # Torn write from a crash, everything after it is lost
+                        logger.warning("Ignoring truncated state journal entry")
+                        break
+
+        with self.lock:
+            self.data = data
+        return dict(data)
+
+    def start(self):
+        """Start the background writer"""
+        self.thread = threading.Thread(target=self.run, name='dingod-state', daemon=True)
+        self.thread.start()
+
+    def get(self, key, default=None):
+        """Get value"""
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        """Set value and schedule a write"""
+        with self.lock:
+            self.data[key] = value
+            self.pending[key] = value
+            self.wakeup.notify()
+
+    def flush(self):
+        """Write pending changes now"""
+        self.write_pending()
+
+    def close(self):
+        """Flush and stop the writer"""
+        with self.lock:
+            self.closed = True
+            self.wakeup.notify()
+        if self.thread:
+            self.thread.join()
+        self.flush()
+
+    def run(self):
+        """Writer thread"""
+        while True:
+            with self.lock:
+                while not self.pending and not self.closed:
+                    self.wakeup.wait()
+                if self.closed:
+                    return  # close() flushes
+
+                # Let the burst settle, then write everything at once
+                deadline = time.monotonic() + self.debounce
+                remaining = self.debounce
+                while remaining > 0 and not self.closed:
+                    self.wakeup.wait(remaining)
+                    remaining = deadline - time.monotonic()
+            self.write_pending()
+
+    def write_pending(self):
+        """Persist pending changes
+
+        The changes are taken under the lock and written outside it, so
+        set() never waits for disk I/O.
+        """
+        with self.write_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                changes, self.pending = self.pending, {}
+
+            try:
+                if self.journal_path is None:
+                    self.write_snapshot()
+                else:
+                    self.append_journal(changes)
+                self.writes += 1
+            except Exception as e:
+                logger.error("Failed to save state: %s", e)
+                # Retry with the next flush; newer values win
+                with self.lock:
+                    changes.update(self.pending)
+                    self.pending = changes
+
+    def write_snapshot(self):
+        """Atomically replace the snapshot with the current state"""
+        with self.lock:
+            data = dict(self.data)
+        atomic_write(self.path, json.dumps(data, indent=2).encode())
+
+    def append_journal(self, changes):
+        """Append one change record, compacting when the journal is large"""
+        line = (json.dumps(changes, separators=(',', ':')) + '\n').encode()
+
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+        if size >= self.compact_bytes:
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot"""
+        self.write_snapshot()
+        os.truncate(self.journal_path, 0)
@@ -0,0 +1,318 @@
+"""
+Dingo OS Daemon - Method statistics
+Call counts, error counts and latency histograms for every D-Bus method,
+exported over D-Bus and as a Prometheus textfile
+"""
+
+import contextvars
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from gi.repository import GLib
+
+from dingo_common.files import atomic_write
+from dingo_common.procscan import process_age
+
+logger = logging.getLogger('dingod')
+
+# Upper bounds in seconds: 0.25 ms doubling up to ~65 s, then +Inf
+BUCKETS = tuple(0.00025 * 2 ** i for i in range(19))
+
+# Timing of the D-Bus call the current code runs for. The worker pool runs
+# jobs in a copy of the submitting context, so worker threads see it too.
+current_call = contextvars.ContextVar('dingod_call', default=None)
+
+
+class CallTimer:
+    """Child-process time spent on behalf of one call"""
+
+    __slots__ = ('child',)
+
+    def __init__(self):
+        self.child = 0.0
+
+
+class child_process:
+    """Context manager charging its wall time to the current call
+
+    Wrap every subprocess run so GetStats can tell process time from
+    daemon overhead. A transaction shared by several callers is charged
+    to the call that started it.
+    """
+
+    __slots__ = ('call', 'start')
+
+    def __enter__(self):
+        self.call = current_call.get()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.call is not None:
+            self.call.child += time.perf_counter() - self.start
+        return False
+
+
+class Histogram:
+    """Log-bucketed latency histogram"""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        """Add one observation"""
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Upper bucket bound below which a fraction q of observations fall"""
+        total = sum(self.counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class MethodStats:
+    """Counters for one method"""
+
+    __slots__ = ('calls', 'errors', 'saved', 'total', 'child')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.saved = 0  # Calls answered by another call's execution
+        self.total = Histogram()
+        self.child = Histogram()
+
+
+class StatsRegistry:
+    """Per-method statistics, safe to update from any thread"""
+
+    def __init__(self):
+        self.methods = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.generation = 0
+        self.exported = -1
+        self.export_path = None
+        self.export_interval = 60
+        self.timer_id = None
+        self.last_call = time.monotonic()
+        self.first_reply = None         # Process start to first reply, seconds
+        self.first_reply_budget = None
+
+    def method(self, name):
+        """Counters for a method, created on first use (lock held)"""
+        stats = self.methods.get(name)
+        if stats is None:
+            stats = self.methods[name] = MethodStats()
+        return stats
+
+    def record(self, method, seconds, child, error=False):
+        """Account one finished call"""
+        with self.lock:
+            stats = self.method(method)
+            stats.calls += 1
+            stats.errors += error
+            stats.total.observe(seconds)
+            stats.child.observe(child)
+            self.generation += 1
+            self.schedule_export()
+            self.last_call = time.monotonic()
+            first = self.first_reply is None
+
+        if first:
+            self.check_first_reply(method)
+
+    def check_first_reply(self, method):
+        """Measure activation to first reply against the budget"""
+        self.first_reply = process_age() or 0.0
+        budget = self.first_reply_budget
+        message = f"First reply ({method}) {self.first_reply * 1000:.0f} ms after start"
+        if budget and self.first_reply > budget:
+            logger.warning("%s, over the %.0f ms budget", message, budget * 1000)
+        else:
+            logger.info(message)
+
+    def record_saved(self, method):
+        """Account a call that joined an execution already in flight"""
+        with self.lock:
+            self.method(method).saved += 1
+            self.generation += 1
+            self.schedule_export()
+
+    def snapshot(self):
+        """{method: {calls, errors, saved, seconds, child_seconds, p50, p95, p99, histogram, child_histogram}}"""
+        with self.lock:
+            return {
+                name: {
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'saved': stats.saved,
+                    'seconds': stats.total.sum,
+                    'child_seconds': stats.child.sum,
+                    'p50': stats.total.quantile(0.50),
+                    'p95': stats.total.quantile(0.95),
+                    'p99': stats.total.quantile(0.99),
+                    'histogram': list(stats.total.counts),
+                    'child_histogram': list(stats.child.counts),
+                }
+                for name, stats in self.methods.items()
+            }
+
+    def prometheus(self):
+        """Statistics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP dingod_start_time_seconds Unix time dingod started.',
+            '# TYPE dingod_start_time_seconds gauge',
+            f'dingod_start_time_seconds {self.started:.3f}',
+        ]
+        if self.first_reply is not None:
+            lines += [
+                '# HELP dingod_first_reply_seconds Time from process start to the first reply.',
+                '# TYPE dingod_first_reply_seconds gauge',
+                f'dingod_first_reply_seconds {self.first_reply:.6f}',
+            ]
+
+        with self.lock:
+            methods = sorted(self.methods.items())
+
+            for metric, attr, help_text in (
+                ('dingod_method_calls_total', 'calls', 'D-Bus method calls.'),
+                ('dingod_method_errors_total', 'errors', 'D-Bus method calls that failed.'),
+                ('dingod_method_saved_executions_total', 'saved',
+                 'D-Bus method calls that shared an execution already in flight.'),
+            ):
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} counter')
+                for name, stats in methods:
+                    lines.append(f'{metric}{{method="{name}"}} {getattr(stats, attr)}')
+
+            for metric, attr, help_text in (
+                ('dingod_method_duration_seconds', 'total', 'Time from call to reply.'),
+                ('dingod_method_child_seconds', 'child', 'Part of the call spent in child processes.'),
+            ):
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} histogram')
+                for name, stats in methods:
+                    histogram = getattr(stats, attr)
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{method="{name}",le="{bound:g}"}} {cumulative}')
+                    cumulative += histogram.counts[-1]
+                    lines.append(f'{metric}_bucket{{method="{name}",le="+Inf"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{method="{name}"}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{method="{name}"}} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
+
+    def start_export(self, path, interval):
+        """Write the textfile now and at most every interval seconds after that
+
+        A write is only scheduled by a recorded call, so an idle daemon
+        is never woken up for it.
+        """
+        with self.lock:
+            self.export_path = path
+            self.export_interval = max(1, int(interval))
+        self.export(path)
+
+    def schedule_export(self):
+        """Arm the one-shot export timer unless it is armed (lock held)"""
+        if self.export_path is not None and self.timer_id is None:
+            self.timer_id = GLib.timeout_add_seconds(self.export_interval, self.on_export_timer)
+
+    def on_export_timer(self):
+        """Write what was recorded since the timer was armed"""
+        with self.lock:
+            self.timer_id = None
+            path = self.export_path
+        self.export(path)
+        return False
+
+    def stop_export(self, path):
+        """Cancel the export timer and write the final numbers"""
+        with self.lock:
+            self.export_path = None
+            if self.timer_id:
+                GLib.source_remove(self.timer_id)
+                self.timer_id = None
+        self.export(path)
+
+    def export(self, path):
+        """Rewrite the textfile if anything was recorded since the last write"""
+        if self.generation != self.exported:
+            self.exported = self.generation
+            try:
+                atomic_write(path, self.prometheus().encode())
+            except OSError as e:
+                logger.error("Cannot write %s: %s", path, e)
+
+
+def timed_method(func):
+    """Wrap a D-Bus method so every call is recorded in self.stats
+
+    Asynchronous methods are timed until their reply or error handler
+    runs. The dbus-python attributes are copied along with the name so
+    the wrapper is exported in place of the original.
+    """
+    name = func.__name__
+    callbacks = getattr(func, '_dbus_async_callbacks', None)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        call = CallTimer()
+        start = time.perf_counter()
+
+        def finish(error):
+            self.stats.record(name, time.perf_counter() - start, call.child, error)
+
+        if callbacks:
+            reply_name, error_name = callbacks
+            reply_handler, error_handler = kwargs[reply_name], kwargs[error_name]
+
+            def on_reply(*result):
+                finish(False)
+                reply_handler(*result)
+
+            def on_error(error):
+                finish(True)
+                error_handler(error)
+
+            kwargs[reply_name], kwargs[error_name] = on_reply, on_error
+
+        token = current_call.set(call)
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception:
+            finish(True)
+            raise
+        finally:
+            current_call.reset(token)
+
+        if not callbacks:
+            finish(False)
+        return result
+
+    return wrapper
+
+
+def instrument(cls):
+    """Class decorator applying timed_method to every exported method"""
+    for name, attr in list(vars(cls).items()):
+        if getattr(attr, '_dbus_is_method', False):
+            setattr(cls, name, timed_method(attr))
+    return cls
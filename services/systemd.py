@@ -0,0 +1,222 @@
+"""
+Dingo OS Daemon - systemd client
+Starts and stops units through org.freedesktop.systemd1 on the daemon's
+own bus connection instead of forking systemctl
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import dbus
+from gi.repository import GLib
+
+logger = logging.getLogger('dingod')
+
+SYSTEMD_NAME = 'org.freedesktop.systemd1'
+SYSTEMD_PATH = '/org/freedesktop/systemd1'
+MANAGER_IFACE = 'org.freedesktop.systemd1.Manager'
+UNIT_IFACE = 'org.freedesktop.systemd1.Unit'
+PROPERTIES_IFACE = 'org.freedesktop.DBus.Properties'
+
+# JobRemoved results kept for job replies still on their way
+FINISHED_LIMIT = 256
+
+
+def unit_name(name):
+    """systemctl-style name completion: 'docker' -> 'docker.service'"""
+    return name if '.' in name else f"{name}.service"
+
+
+class JobBatch:
+    """Units started or stopped together, answered once all jobs finish"""
+
+    def __init__(self, units, callback):
+        self.results = {}
+        self.remaining = set(units)
+        self.callback = callback
+
+    def finish(self, unit, result):
+        """Record one unit's result"""
+        self.results[unit] = result
+        self.remaining.discard(unit)
+        if not self.remaining:
+            self.callback(self.results)
+
+
+class SystemdManager:
+    """Asynchronous systemd Manager client
+
+    Job completion is tracked through JobRemoved instead of waiting for
+    each job, and ActiveState of every unit asked about is cached and kept
+    current from PropertiesChanged. All methods must be called on the main
+    loop except the *_sync helpers, which are for worker threads.
+    """
+
+    def __init__(self, bus, on_state_changed=None):
+        self.bus = bus
+        self.on_state_changed = on_state_changed
+        self.manager = dbus.Interface(bus.get_object(SYSTEMD_NAME, SYSTEMD_PATH), MANAGER_IFACE)
+        self.jobs = {}          # job path -> (unit, batch)
+        self.requested = 0      # Job requests not answered yet
+        self.finished = OrderedDict()  # JobRemoved that may have beaten its job reply, oldest first
+        self.states = {}        # unit -> ActiveState
+        self.unit_paths = {}    # object path -> unit
+
+        bus.add_signal_receiver(
+            self.on_job_removed, 'JobRemoved', MANAGER_IFACE, SYSTEMD_NAME, SYSTEMD_PATH
+        )
+        bus.add_signal_receiver(
+            self.on_properties_changed, 'PropertiesChanged', PROPERTIES_IFACE, SYSTEMD_NAME,
+            path_keyword='path', arg0=UNIT_IFACE
+        )
+
+        # Ask systemd to emit job and unit signals to us
+        self.manager.Subscribe(reply_handler=lambda: None, error_handler=self.log_error)
+
+    @staticmethod
+    def log_error(error):
+        """Report a failed asynchronous call"""
+        logger.error("systemd call failed: %s", error)
+
+    def start_units(self, units, callback, mode='replace'):
+        """Start units; callback({unit: result}) once every job finished"""
+        self.queue_jobs('StartUnit', units, callback, mode)
+
+    def stop_units(self, units, callback, mode='replace'):
+        """Stop units; callback({unit: result}) once every job finished"""
+        self.queue_jobs('StopUnit', units, callback, mode)
+
+    def queue_jobs(self, method, units, callback, mode):
+        """Enqueue one job per unit"""
+        units = [unit_name(u) for u in units]
+        batch = JobBatch(units, callback)
+        if not units:
+            callback({})
+            return
+
+        self.requested += len(units)
+        for unit in units:
+            getattr(self.manager, method)(
+                unit, mode,
+                reply_handler=lambda job, unit=unit: self.on_job_queued(job, unit, batch),
+                error_handler=lambda e, unit=unit: self.on_job_refused(e, unit, batch)
+            )
+
+    def on_job_queued(self, job, unit, batch):
+        """systemd accepted a job"""
+        self.requested -= 1
+        self.track_unit(unit)
+        job = str(job)
+        if job in self.finished:
+            batch.finish(unit, self.finished.pop(job))
+        else:
+            self.jobs[job] = (unit, batch)
+        if not self.requested:
+            self.finished.clear()
+
+    def on_job_refused(self, error, unit, batch):
+        """systemd did not queue a job"""
+        self.requested -= 1
+        batch.finish(unit, error.get_dbus_message())
+        if not self.requested:
+            self.finished.clear()
+
+    def on_job_removed(self, job_id, job, unit, result):
+        """A job completed: result is done, failed, canceled, timeout, ...
+
+        Subscribe() reports every job on the system. One that is not ours
+        is only kept while a job reply is outstanding, in case it is that
+        job's, and the oldest is dropped past FINISHED_LIMIT.
+        """
+        job = str(job)
+        entry = self.jobs.pop(job, None)
+        if entry:
+            entry[1].finish(entry[0], str(result))
+        elif self.requested:
+            if len(self.finished) >= FINISHED_LIMIT:
+                self.finished.popitem(last=False)
+            self.finished[job] = str(result)
+
+    def unit_states(self, units, callback):
+        """callback({unit: ActiveState}) using the cache where possible"""
+        units = [unit_name(u) for u in units]
+        missing = [u for u in units if u not in self.states]
+        if not missing:
+            callback({u: self.states[u] for u in units})
+            return
+
+        batch = JobBatch(missing, lambda r: callback({u: self.states.get(u, 'unknown') for u in units}))
+        for unit in missing:
+            self.track_unit(unit, on_ready=lambda unit=unit: batch.finish(unit, None))
+
+    def track_unit(self, unit, on_ready=None):
+        """Load a unit's ActiveState and follow its changes"""
+        if unit in self.states:
+            if on_ready:
+                on_ready()
+            return
+
+        def on_props(props):
+            self.set_state(unit, str(props.get('ActiveState', 'unknown')))
+            if on_ready:
+                on_ready()
+
+        def on_unit(path):
+            self.unit_paths[str(path)] = unit
+            obj = self.bus.get_object(SYSTEMD_NAME, path)
+            obj.GetAll(
+                UNIT_IFACE, dbus_interface=PROPERTIES_IFACE,
+                reply_handler=on_props, error_handler=on_error
+            )
+
+        def on_error(error):
+            self.states.pop(unit, None)
+            if on_ready:
+                on_ready()
+
+        self.manager.LoadUnit(unit, reply_handler=on_unit, error_handler=on_error)
+
+    def on_properties_changed(self, interface, changed, invalidated, path=None):
+        """Keep cached ActiveState current"""
+        unit = self.unit_paths.get(path)
+        if unit and interface == UNIT_IFACE and 'ActiveState' in changed:
+            self.set_state(unit, str(changed['ActiveState']))
+
+    def set_state(self, unit, state):
+        """Update the cache and report real changes"""
+        if self.states.get(unit) == state:
+            return
+        self.states[unit] = state
+        if self.on_state_changed:
+            self.on_state_changed(unit, state)
+
+    def call_sync(self, func, *args, timeout=90):
+        """Run an asynchronous method from a worker thread and wait for it"""
+        done = threading.Event()
+        results = {}
+
+        def callback(value):
+            results.update(value)
+            done.set()
+
+        def run():
+            func(*args, callback)
+            return False
+
+        GLib.idle_add(run)
+        if not done.wait(timeout):
+            raise TimeoutError(f"systemd did not answer within {timeout}s")
+        return results
+
+    def start_units_sync(self, units):
+        """Blocking start_units for worker threads"""
+        return self.call_sync(self.start_units, units)
+
+    def stop_units_sync(self, units):
+        """Blocking stop_units for worker threads"""
+        return self.call_sync(self.stop_units, units)
+
+    def unit_states_sync(self, units):
+        """Blocking unit_states for worker threads"""
+        return self.call_sync(self.unit_states, units)
@@ -0,0 +1,148 @@
+"""
+Dingo OS Daemon - Kernel tuning backend
+Writes cpufreq, vm and transparent hugepage settings straight to sysfs and
+procfs, with snapshot and rollback
+"""
+
+import glob
+import logging
+import os
+
+logger = logging.getLogger('dingod')
+
+# Overridable so the backend can run against a fake tree
+SYSFS_ROOT = '/sys'
+PROCFS_ROOT = '/proc'
+
+VM_SYSCTLS = {
+    'swappiness': 'swappiness',
+    'cache_pressure': 'vfs_cache_pressure',
+    'dirty_ratio': 'dirty_ratio',
+    'dirty_background_ratio': 'dirty_background_ratio',
+}
+
+
+class TuningError(Exception):
+    """A batch could not be applied; everything it changed was rolled back"""
+
+
+class TuningBackend:
+    """Batched writes to kernel tunables
+
+    A batch maps tunable names to values. Every file the batch touches is
+    read first, so if any write fails the earlier ones are reverted and
+    the kernel is left as it was. The snapshot is returned so callers can
+    roll the batch back later as well.
+
+    Tunables:
+        cpu.governor              scaling_governor of every CPU
+        cpu.boost                 cpufreq boost switch
+        vm.<name>                 /proc/sys/vm/<name> (aliases in VM_SYSCTLS)
+        thp.enabled / thp.defrag  transparent hugepage modes
+        gpu.dpm_level             amdgpu power_dpm_force_performance_level
+    """
+
+    def __init__(self, sysfs_root=SYSFS_ROOT, procfs_root=PROCFS_ROOT):
+        self.sysfs_root = sysfs_root
+        self.procfs_root = procfs_root
+
+    def paths(self, tunable):
+        """Files backing a tunable"""
+        kind, _, name = tunable.partition('.')
+        if kind == 'cpu' and name == 'governor':
+            pattern = os.path.join(self.sysfs_root, 'devices/system/cpu/cpu[0-9]*/cpufreq/scaling_governor')
+            return sorted(glob.glob(pattern))
+        if kind == 'cpu' and name == 'boost':
+            return [os.path.join(self.sysfs_root, 'devices/system/cpu/cpufreq/boost')]
+        if kind == 'vm':
+            return [os.path.join(self.procfs_root, 'sys/vm', VM_SYSCTLS.get(name, name))]
+        if kind == 'thp' and name in ('enabled', 'defrag'):
+            return [os.path.join(self.sysfs_root, 'kernel/mm/transparent_hugepage', name)]
+        if kind == 'gpu' and name == 'dpm_level':
+            pattern = os.path.join(self.sysfs_root, 'class/drm/card[0-9]*/device/power_dpm_force_performance_level')
+            return sorted(glob.glob(pattern))
+        raise TuningError(f"Unknown tunable: {tunable}")
+
+    def available(self, tunable):
+        """Whether the kernel exposes a tunable"""
+        try:
+            paths = self.paths(tunable)
+        except TuningError:
+            return False
+        return bool(paths) and all(os.path.exists(p) for p in paths)
+
+    @staticmethod
+    def format_value(value):
+        """Kernel representation of a profile value"""
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        return str(value)
+
+    @staticmethod
+    def parse_value(raw):
+        """Profile representation of a kernel value"""
+        # Selection files show the active mode in brackets
+        if '[' in raw:
+            return raw[raw.find('[') + 1:raw.find(']')]
+        return int(raw) if raw.lstrip('-').isdigit() else raw
+
+    def read(self, tunable):
+        """Current value of a tunable (first CPU for per-CPU ones)"""
+        for path in self.paths(tunable):
+            try:
+                with open(path) as f:
+                    return self.parse_value(f.read().strip())
+            except OSError:
+                continue
+        return None
+
+    def snapshot(self, paths):
+        """Raw contents of files, to be restored by rollback()"""
+        saved = {}
+        for path in paths:
+            with open(path) as f:
+                raw = f.read().strip()
+            saved[path] = self.parse_value(raw) if '[' in raw else raw
+        return saved
+
+    def apply(self, settings):
+        """Apply {tunable: value} as one batch; returns the snapshot"""
+        writes = []
+        for tunable, value in settings.items():
+            paths = self.paths(tunable)
+            if not paths:
+                raise TuningError(f"{tunable} is not available on this system")
+            writes.extend((path, self.format_value(value)) for path in paths)
+
+        try:
+            saved = self.snapshot(path for path, _ in writes)
+        except OSError as e:
+            raise TuningError(f"Cannot read {e.filename}: {e.strerror}")
+
+        done = []
+        try:
+            for path, value in writes:
+                if saved[path] == value:
+                    continue
+                self.write(path, value)
+                done.append(path)
+        except OSError as e:
+            self.rollback({path: saved[path] for path in done})
+            raise TuningError(f"Cannot write {e.filename}: {e.strerror}")
+
+        logger.info("Applied %d tunable writes", len(done))
+        return saved
+
+    def rollback(self, saved):
+        """Restore a snapshot, continuing past individual failures"""
+        for path, value in saved.items():
+            try:
+                self.write(path, value)
+            except OSError as e:
+                logger.error("Rollback of %s failed: %s", path, e.strerror)
+
+    @staticmethod
+    def write(path, value):
+        """Write one value"""
+        with open(path, 'w') as f:
+            f.write(value)
@@ -0,0 +1,166 @@
+"""
+Dingo OS Daemon - Update checker
+Keeps the number of available updates in memory and refreshes it in the
+background instead of running apt on every GetStatus call
+"""
+
+import logging
+import os
+import subprocess
+import time
+
+from gi.repository import GLib
+
+from stats import child_process
+from watch import PathWatcher
+
+logger = logging.getLogger('dingod')
+
+# apt rewrites these when the package lists or installed set change
+APT_LISTS_DIR = '/var/lib/apt/lists'
+DPKG_STATUS = '/var/lib/dpkg/status'
+
+DEFAULT_TTL = 86400
+
+
+def check_updates():
+    """Count upgradable packages with a simulated upgrade"""
+    try:
+        with child_process():
+            result = subprocess.run(
+                ['apt-get', 'upgrade', '--dry-run'],
+                capture_output=True,
+                text=True
+            )
+
+        # Count upgradable packages
+        lines = result.stdout.split('\n')
+        upgradable = [l for l in lines if 'upgraded' in l]
+
+        if upgradable:
+            # Parse number
+            parts = upgradable[0].split()
+            if parts:
+                return int(parts[0])
+
+        return 0
+    except Exception:
+        return 0
+
+
+class UpdateCache:
+    """TTL cache for the update count
+
+    The value is refreshed on the worker pool when it expires or when the
+    apt lists / dpkg status change on disk. Readers never block: they get
+    the last known value and its age.
+    """
+
+    def __init__(self, workers, ttl=DEFAULT_TTL, watch_paths=(APT_LISTS_DIR, DPKG_STATUS),
+                 on_change=None):
+        self.workers = workers
+        self.ttl = ttl
+        self.on_change = on_change
+        self.count = 0
+        self.checked_at = None
+        self.refreshing = False
+        self.dirty = False
+        self.timer_id = None
+        self.watch_paths = watch_paths
+        self.watcher = PathWatcher(watch_paths, self.invalidate, debounce_ms=2000)
+
+    def start(self, saved=None):
+        """Start watching; refresh unless a saved count is still valid"""
+        self.watcher.start()
+        if saved and self.restore(saved['count'], saved['checked_at']):
+            logger.info("Reusing saved update count (%s)", self.count)
+            return
+        self.refresh()
+
+    def stop(self):
+        """Stop watching and cancel the refresh timer"""
+        self.watcher.stop()
+        if self.timer_id:
+            GLib.source_remove(self.timer_id)
+            self.timer_id = None
+
+    def save(self):
+        """Count and wall-clock check time, for restore() in the next run"""
+        if self.checked_at is None:
+            return None
+        return {'count': self.count, 'checked_at': time.time() - (time.monotonic() - self.checked_at)}
+
+    def restore(self, count, checked_at):
+        """Adopt a saved count if it is younger than the TTL and apt has not run since"""
+        age = time.time() - checked_at
+        if not 0 <= age < self.ttl:
+            return False
+        for path in self.watch_paths:
+            try:
+                if os.stat(path).st_mtime > checked_at:
+                    return False
+            except OSError:
+                continue
+
+        self.count = count
+        self.checked_at = time.monotonic() - age
+        self.schedule(self.ttl - age)
+        return True
+
+    def get(self):
+        """Return (count, age in seconds); age is -1 before the first check"""
+        if self.checked_at is None:
+            return self.count, -1.0
+        return self.count, time.monotonic() - self.checked_at
+
+    def invalidate(self):
+        """Package data changed on disk"""
+        logger.info("Package database changed, refreshing update count")
+        self.refresh()
+
+    def refresh(self):
+        """Recount in the background"""
+        if self.refreshing:
+            # Pick up changes that land while apt is still running
+            self.dirty = True
+            return
+
+        self.refreshing = True
+        self.workers.submit(
+            'query', check_updates,
+            reply_handler=self.on_refreshed,
+            error_handler=self.on_refresh_failed
+        )
+
+    def on_refreshed(self, count):
+        """Store a fresh count"""
+        self.refreshing = False
+        changed = count != self.count
+        self.count = count
+        self.checked_at = time.monotonic()
+        if changed and self.on_change:
+            self.on_change(count)
+        self.schedule()
+
+        if self.dirty:
+            self.dirty = False
+            self.refresh()
+
+    def on_refresh_failed(self, error):
+        """Keep the old value and try again later"""
+        self.refreshing = False
+        self.schedule()
+
+    def schedule(self, delay=None):
+        """Arm the TTL timer"""
+        if self.timer_id:
+            GLib.source_remove(self.timer_id)
+        self.timer_id = GLib.timeout_add_seconds(
+            max(1, int(self.ttl if delay is None else delay)), self.on_expired
+        )
+
+    def on_expired(self):
+        """TTL elapsed"""
+        self.timer_id = None
+        self.refresh()
+        return False
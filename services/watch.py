@@ -0,0 +1,76 @@
+"""
+Dingo OS Daemon - File watching
+Coalesced change notifications on top of Gio (inotify) file monitors
+"""
+
+import logging
+from pathlib import Path
+
+from gi.repository import Gio, GLib
+
+logger = logging.getLogger('dingod')
+
+
+class PathWatcher:
+    """Watch files and directories and call back once per burst of changes
+
+    Files are watched through their parent directory so that replace-by-
+    rename (how dpkg and apt write their databases) is still seen. All
+    events inside the debounce window result in a single callback.
+    """
+
+    def __init__(self, paths, callback, debounce_ms=1000):
+        self.paths = [Path(p) for p in paths]
+        self.callback = callback
+        self.debounce_ms = debounce_ms
+        self.monitors = []
+        self.timeout_id = None
+
+    def start(self):
+        """Start monitoring"""
+        for path in self.paths:
+            if path.is_dir():
+                directory, name = path, None
+            else:
+                directory, name = path.parent, path.name
+
+            try:
+                monitor = Gio.File.new_for_path(str(directory)).monitor_directory(
+                    Gio.FileMonitorFlags.WATCH_MOVES, None
+                )
+            except GLib.Error as e:
+                logger.error("Cannot watch %s: %s", directory, e.message)
+                continue
+
+            monitor.connect('changed', self.on_changed, name)
+            self.monitors.append(monitor)
+
+    def stop(self):
+        """Stop monitoring"""
+        for monitor in self.monitors:
+            monitor.cancel()
+        self.monitors = []
+        if self.timeout_id:
+            GLib.source_remove(self.timeout_id)
+            self.timeout_id = None
+
+    def on_changed(self, monitor, file, other_file, event_type, name):
+        """Handle a raw monitor event"""
+        if name is not None:
+            names = {file.get_basename()}
+            if other_file is not None:
+                names.add(other_file.get_basename())
+            if name not in names:
+                return
+
+        if self.timeout_id is None:
+            self.timeout_id = GLib.timeout_add(self.debounce_ms, self.fire)
+
+    def fire(self):
+        """Debounce window elapsed"""
+        self.timeout_id = None
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error("Watch callback failed: %s", e)
+        return False
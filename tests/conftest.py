@@ -0,0 +1,10 @@
+"""
+Shared test setup: dingod's modules are imported from services/, the
+shared dingo_common package from common/
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'services'))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'common'))
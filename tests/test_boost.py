@@ -0,0 +1,67 @@
+"""
+Process boost against a fake /proc, without touching real processes
+"""
+
+import pytest
+
+pytest.importorskip('gi')
+
+import boost  # noqa: E402
+from boost import ProcessBooster  # noqa: E402
+
+USER = 1000
+
+# pid -> (uids, children)
+PROCESSES = {
+    100: ((USER, USER, USER, USER), [101, 102, 103]),
+    101: ((USER, USER, USER, USER), []),
+    102: ((USER, 0, 0, 0), [104]),       # setuid helper
+    103: ((0, 0, 0, 0), []),             # started through sudo or polkit
+    104: ((USER, USER, USER, USER), []),
+}
+
+
+@pytest.fixture
+def booster(tmp_path, monkeypatch):
+    proc = tmp_path / 'proc'
+    for pid, (uids, children) in PROCESSES.items():
+        task = proc / str(pid) / 'task' / str(pid)
+        task.mkdir(parents=True)
+        (task / 'children').write_text(' '.join(map(str, children)))
+        (proc / str(pid) / 'status').write_text(
+            f"Name:\tgame\nUid:\t{' '.join(map(str, uids))}\nGid:\t{USER} {USER} {USER} {USER}\n")
+
+    reniced = []
+    monkeypatch.setattr(boost.os, 'setpriority', lambda which, tid, nice: reniced.append(tid))
+    monkeypatch.setattr(ProcessBooster, 'set_ioprio', lambda self, tids: [])
+    monkeypatch.setattr(ProcessBooster, 'set_policy', lambda self, pid, errors: 'normal')
+    booster = ProcessBooster(pin=False, proc_root=str(proc), sys_root=str(tmp_path / 'sys'))
+    booster.reniced = reniced
+    return booster
+
+
+def test_user_only_boosts_own_processes(booster):
+    report = booster.boost(100, USER)
+
+    assert sorted(report['pids']) == [100, 101, 104]
+    assert sorted(report['skipped']) == [102, 103]
+    assert sorted(booster.reniced) == [100, 101, 104]
+
+
+def test_root_boosts_the_whole_tree(booster):
+    report = booster.boost(100, 0)
+
+    assert sorted(report['pids']) == [100, 101, 102, 103, 104]
+    assert report['skipped'] == []
+
+
+@pytest.mark.parametrize('pid', [102, 103])
+def test_user_cannot_boost_other_processes(booster, pid):
+    with pytest.raises(PermissionError):
+        booster.boost(pid, USER)
+    assert booster.reniced == []
+
+
+def test_missing_process(booster):
+    with pytest.raises(ProcessLookupError):
+        booster.boost(999, USER)
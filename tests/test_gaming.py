@@ -0,0 +1,121 @@
+"""
+Gaming mode on top of profiles, against a fake sysfs/procfs tree
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('gi')
+pytest.importorskip('dbus')
+
+from gaming import GamingEngine  # noqa: E402
+from profiles import ProfileEngine  # noqa: E402
+from tuning import TuningBackend  # noqa: E402
+
+GAMING_CONF = Path(__file__).resolve().parent.parent / 'configs' / 'dingo' / 'profiles' / 'gaming.conf'
+
+KERNEL_FILES = {
+    'sys/devices/system/cpu/cpufreq/boost': '0',
+    'sys/kernel/mm/transparent_hugepage/enabled': 'always [madvise] never',
+    'proc/sys/vm/swappiness': '60',
+    'proc/sys/vm/vfs_cache_pressure': '100',
+    'sys/devices/system/cpu/cpu0/cpufreq/scaling_governor': 'powersave',
+    'sys/devices/system/cpu/cpu1/cpufreq/scaling_governor': 'powersave',
+}
+
+
+class MemoryState:
+    """Stand-in for the daemon state"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+@pytest.fixture
+def tuning(tmp_path):
+    for name, content in KERNEL_FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content + '\n')
+    return TuningBackend(sysfs_root=str(tmp_path / 'sys'), procfs_root=str(tmp_path / 'proc'))
+
+
+@pytest.fixture
+def engines(tmp_path, tuning):
+    state = MemoryState()
+    lock = threading.Lock()
+    return (
+        ProfileEngine(state, tuning, None, lock=lock),
+        GamingEngine(state, tuning, lock=lock),
+        state,
+    )
+
+
+def write_profile(tmp_path, name, text):
+    path = tmp_path / f'{name}.conf'
+    path.write_text(text)
+    return path
+
+
+def test_profile_switch_during_gaming_mode_survives_disable(tmp_path, tuning, engines):
+    profiles, gaming, state = engines
+    gaming_profile = write_profile(tmp_path, 'gaming', '[cpu]\ngovernor = "performance"\n')
+    developer = write_profile(tmp_path, 'developer', '[cpu]\ngovernor = "ondemand"\n')
+
+    profiles.switch('gaming', gaming_profile)
+    gaming.enable(GAMING_CONF)
+    ok, report = profiles.switch('developer', developer)
+    assert report['cpu.governor']['status'] == 'applied'
+    gaming.disable()
+
+    assert tuning.read('cpu.governor') == 'ondemand'
+    assert state.get('applied_settings') == {'cpu.governor': 'ondemand'}
+    # Gaming mode's other tunables are back at their original values
+    assert tuning.read('vm.swappiness') == 60
+    assert tuning.read('cpu.boost') == 0
+
+    ok, report = profiles.switch('developer', developer)
+    assert ok and report == {}
+
+
+def test_disable_restores_the_profile_values(tuning, engines, tmp_path):
+    profiles, gaming, state = engines
+    developer = write_profile(tmp_path, 'developer', '[cpu]\ngovernor = "ondemand"\n[memory]\nswappiness = 10\n')
+
+    profiles.switch('developer', developer)
+    gaming.enable(GAMING_CONF)
+    assert tuning.read('cpu.governor') == 'performance'
+    assert tuning.read('vm.swappiness') == 1
+
+    # Enabling twice keeps the values from before gaming mode
+    gaming.enable(GAMING_CONF)
+    gaming.disable()
+
+    assert tuning.read('cpu.governor') == 'ondemand'
+    assert tuning.read('vm.swappiness') == 10
+    assert tuning.read('vm.cache_pressure') == 100
+    assert state.get('gaming_settings') is None
+
+    # Leaving the profile still restores the values from before any switch
+    profiles.switch('standard')
+    assert tuning.read('cpu.governor') == 'powersave'
+    assert tuning.read('vm.swappiness') == 60
+
+
+def test_profile_switch_compares_against_gaming_values(tuning, engines, tmp_path):
+    profiles, gaming, state = engines
+    standard_swappiness = write_profile(tmp_path, 'developer', '[memory]\nswappiness = 60\n')
+
+    gaming.enable(GAMING_CONF)
+    ok, report = profiles.switch('developer', standard_swappiness)
+
+    assert report['memory.swappiness']['status'] == 'applied'
+    assert tuning.read('vm.swappiness') == 60
@@ -0,0 +1,90 @@
+"""
+Metrics collector against a fake /proc
+"""
+
+import pytest
+
+pytest.importorskip('gi')
+
+from dingo_common import metrics  # noqa: E402
+from dingo_common.metrics import MetricsCollector, RingBuffer  # noqa: E402
+
+MEMINFO = "MemTotal: 1000 kB\nMemFree: 100 kB\nMemAvailable: 250 kB\n"
+NET_DEV = (
+    "Inter-|   Receive\n"
+    " face |bytes packets\n"
+    "    lo: 999 0 0 0 0 0 0 0 999 0 0 0 0 0 0 0\n"
+    "  eth0: {rx} 0 0 0 0 0 0 0 {tx} 0 0 0 0 0 0 0\n"
+)
+
+
+class FakeProc:
+    """Counters that grow by a fixed amount per second of fake time"""
+
+    def __init__(self, tmp_path, monkeypatch):
+        self.proc = tmp_path / 'proc'
+        self.sys = tmp_path / 'sys'
+        (self.proc / 'net').mkdir(parents=True)
+        (self.sys / 'block' / 'sda').mkdir(parents=True)
+        (self.proc / 'meminfo').write_text(MEMINFO)
+        self.now = 100.0
+        self.rx = 0
+        monkeypatch.setattr(metrics.time, 'monotonic', lambda: self.now)
+        self.advance(0)
+
+    def advance(self, seconds, rx_per_second=1000):
+        """Let time pass and write the counters at that time"""
+        self.now += seconds
+        busy, total = int(self.now * 50), int(self.now * 100)
+        (self.proc / 'stat').write_text(f"cpu {busy} 0 0 {total - busy} 0 0 0 0\n")
+        (self.proc / 'diskstats').write_text(f"   8 0 sda 0 0 {int(self.now)} 0 0 0 0 0 0 0 0\n")
+        self.rx += int(seconds * rx_per_second)
+        (self.proc / 'net' / 'dev').write_text(NET_DEV.format(rx=self.rx, tx=self.rx))
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    return FakeProc(tmp_path, monkeypatch)
+
+
+def collector(proc):
+    return MetricsCollector(interval_ms=1000, proc_root=str(proc.proc), sys_root=str(proc.sys))
+
+
+def test_rates_between_samples(proc):
+    m = collector(proc)
+    m.sample()
+    for _ in range(3):
+        proc.advance(1)
+        m.sample()
+
+    assert list(m.series['net_rx'].since(0)) == [1000.0] * 3
+    assert list(m.series['cpu'].since(0)) == [50.0] * 3
+    assert list(m.series['memory'].since(0)) == [75.0] * 3
+    assert list(m.series['disk_read'].since(0)) == [512.0] * 3
+
+
+def test_rates_start_over_after_a_pause(proc):
+    m = collector(proc)
+    m.sample()
+    proc.advance(1)
+    m.sample()
+
+    # Nothing sampled for a minute, during which traffic was much higher
+    proc.advance(60, rx_per_second=100_000)
+    m.sample()
+    assert m.series['net_rx'].seq == 1
+
+    proc.advance(1)
+    m.sample()
+    assert list(m.series['net_rx'].since(0)) == [1000.0, 1000.0]
+
+
+def test_ring_buffer_wraps():
+    ring = RingBuffer(4)
+    for value in range(6):
+        ring.append(value)
+
+    assert list(ring.since(0)) == [2.0, 3.0, 4.0, 5.0]
+    assert list(ring.since(4)) == [4.0, 5.0]
+    assert list(ring.since(6)) == []
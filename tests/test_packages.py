@@ -0,0 +1,165 @@
+"""
+Install queue against stub apt-get and apt-cache executables
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+pytest.importorskip('gi')
+
+import packages  # noqa: E402
+from packages import PackageQueue, invalid_names, parse_status_line  # noqa: E402
+
+# Records its argv, reports progress on the status fd and fails for "broken"
+APT_GET = """#!{python}
+import os
+import sys
+
+with open({log!r}, 'a') as log:
+    log.write(' '.join(sys.argv[1:]) + '\\n')
+if 'broken' in sys.argv:
+    sys.exit("E: Unable to locate package broken")
+fd = next(int(a.split('=', 1)[1]) for a in sys.argv if a.startswith('APT::Status-Fd='))
+os.write(fd, b"dlstatus:1:40:Downloading\\npmstatus:pkg:80:Installing\\n")
+"""
+
+# Every package is installed at the candidate version if it starts with "current"
+APT_CACHE = """#!/bin/sh
+for arg; do
+    case "$arg" in
+        policy|--) ;;
+        current*) printf '%s:\\n  Installed: 1.0\\n  Candidate: 1.0\\n' "$arg" ;;
+        *) printf '%s:\\n  Installed: (none)\\n  Candidate: 1.0\\n' "$arg" ;;
+    esac
+done
+"""
+
+
+class SyncWorkers:
+    """WorkerPool stand-in that runs submitted work when told to"""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, command_class, func, *args, reply_handler=None, error_handler=None):
+        self.calls.append((func, args, reply_handler, error_handler))
+
+    def run_next(self):
+        func, args, reply_handler, error_handler = self.calls.pop(0)
+        try:
+            result = func(*args)
+        except Exception as e:
+            error_handler(e)
+        else:
+            reply_handler(result)
+
+
+def write_script(path, text):
+    path.write_text(text)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+
+@pytest.fixture
+def apt(tmp_path, monkeypatch):
+    """Stub apt tools on PATH; returns the apt-get invocation log"""
+    log = tmp_path / 'apt-get.log'
+    write_script(tmp_path / 'apt-get', APT_GET.format(python=sys.executable, log=str(log)))
+    write_script(tmp_path / 'apt-cache', APT_CACHE)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(packages.GLib, 'idle_add', lambda func, *args: func(*args))
+    return log
+
+
+def invocations(log):
+    return [line.split() for line in log.read_text().splitlines()] if log.exists() else []
+
+
+def test_concurrent_jobs_share_one_transaction(apt):
+    workers = SyncWorkers()
+    finished = []
+    queue = PackageQueue(workers, on_finished=lambda *args: finished.append(args))
+
+    first = queue.submit(['htop'])
+    # Arrive while the first transaction runs
+    second = queue.submit(['git', 'htop'])
+    third = queue.submit(['curl'])
+    workers.run_next()
+    workers.run_next()
+
+    runs = invocations(apt)
+    assert runs[0][-1] == 'htop'
+    assert runs[1][-4:] == ['--', 'curl', 'git', 'htop']
+    assert len(runs) == 2
+    assert [(job, ok) for job, ok, message in finished] == [(first, True), (second, True), (third, True)]
+
+
+def test_failed_merge_only_fails_the_bad_job(apt):
+    workers = SyncWorkers()
+    finished = {}
+    queue = PackageQueue(workers, on_finished=lambda job, ok, message: finished.update({job: (ok, message)}))
+
+    queue.submit(['htop'])
+    good = queue.submit(['git'])
+    bad = queue.submit(['broken'])
+    while workers.calls:
+        workers.run_next()
+
+    assert finished[good] == (True, "Installed")
+    assert finished[bad] == (False, "E: Unable to locate package broken")
+    # htop, the merged git + broken, then each on its own
+    assert len(invocations(apt)) == 4
+
+
+def test_installed_packages_are_skipped(apt):
+    workers = SyncWorkers()
+    finished = []
+    queue = PackageQueue(workers, on_finished=lambda *args: finished.append(args))
+
+    queue.submit(['current-tool'])
+    workers.run_next()
+
+    assert invocations(apt) == []
+    assert finished[0][1:] == (True, "Already installed")
+
+
+def test_progress_is_reported_per_job(apt):
+    workers = SyncWorkers()
+    progress = []
+    queue = PackageQueue(workers, on_progress=lambda *args: progress.append(args))
+
+    job = queue.submit(['htop'])
+    workers.run_next()
+
+    assert progress == [(job, 20.0, "Downloading"), (job, 90.0, "Installing")]
+
+
+@pytest.mark.parametrize('name', [
+    '-oDPkg::Pre-Invoke::=touch /tmp/x',
+    '--allow-unauthenticated',
+    'Htop',
+    'a',
+    'htop; rm -rf /',
+    '',
+])
+def test_option_like_names_are_rejected(apt, name):
+    workers = SyncWorkers()
+    queue = PackageQueue(workers)
+
+    with pytest.raises(ValueError):
+        queue.submit(['htop', name])
+    assert workers.calls == []
+    assert queue.pending == []
+
+
+def test_valid_names():
+    assert invalid_names(['libc6', 'g++', 'libstdc++6:i386', 'python3.11-venv']) == []
+
+
+def test_parse_status_line():
+    assert parse_status_line('dlstatus:1:50:Downloading htop\n') == (25.0, 'Downloading htop')
+    assert parse_status_line('pmstatus:htop:100:Installed htop\n') == (100.0, 'Installed htop')
+    assert parse_status_line('media-change:x:y:z') is None
+    assert parse_status_line('garbage') is None
@@ -0,0 +1,171 @@
+"""
+systemd client against a fake org.freedesktop.systemd1 on a private
+dbus-daemon (the one benchmarks/bench_dbus.py runs)
+"""
+
+import shutil
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('gi')
+pytest.importorskip('dbus')
+if not shutil.which('dbus-daemon'):
+    pytest.skip("dbus-daemon is required", allow_module_level=True)
+
+import dbus  # noqa: E402
+import dbus.mainloop.glib  # noqa: E402
+from gi.repository import GLib  # noqa: E402
+
+from systemd import (  # noqa: E402
+    FINISHED_LIMIT, MANAGER_IFACE, SYSTEMD_NAME, SYSTEMD_PATH, SystemdManager,
+)
+
+BENCH_DBUS = Path(__file__).resolve().parent.parent / 'benchmarks' / 'bench_dbus.py'
+
+dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+
+
+def run_until(condition, timeout=10):
+    """Run the main loop until condition() holds"""
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Condition not reached")
+        if not context.iteration(False):
+            time.sleep(0.001)
+
+
+@pytest.fixture(scope='module')
+def address():
+    """A private bus"""
+    bus = subprocess.Popen(
+        ['dbus-daemon', '--session', '--nofork', '--print-address=1'],
+        stdout=subprocess.PIPE, text=True
+    )
+    yield bus.stdout.readline().strip()
+    bus.terminate()
+    bus.wait()
+
+
+@pytest.fixture(params=[20])
+def systemd(request, address):
+    """The fake systemd on the private bus; the param is its job time in ms"""
+    fake = subprocess.Popen([
+        sys.executable, str(BENCH_DBUS), '--role', 'systemd',
+        '--address', address, '--systemd-delay', str(request.param),
+    ])
+    bus = dbus.bus.BusConnection(address)
+    run_until(lambda: bus.name_has_owner(SYSTEMD_NAME) or fake.poll() is not None)
+    assert fake.poll() is None
+    yield bus
+    fake.terminate()
+    fake.wait()
+    bus.close()
+
+
+@pytest.fixture
+def manager(systemd):
+    return SystemdManager(systemd)
+
+
+def other_client(address):
+    """Another connection, whose jobs the manager sees but does not own"""
+    bus = dbus.bus.BusConnection(address)
+    return dbus.Interface(bus.get_object(SYSTEMD_NAME, SYSTEMD_PATH), MANAGER_IFACE)
+
+
+def job_signals(bus):
+    """JobRemoved signals as they are dispatched"""
+    seen = []
+    bus.add_signal_receiver(lambda *args: seen.append(args), 'JobRemoved', MANAGER_IFACE)
+    return seen
+
+
+class RecordingDict(OrderedDict):
+    """Remembers the most entries it held"""
+
+    most = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.most = max(self.most, len(self))
+
+
+def test_batch_finishes_when_every_job_is_removed(manager):
+    results = []
+    manager.start_units(['docker', 'sshd.service'], results.append)
+    run_until(lambda: results)
+
+    assert results == [{'docker.service': 'done', 'sshd.service': 'done'}]
+    assert manager.jobs == {}
+    # Followed through PropertiesChanged on the unit's path
+    run_until(lambda: manager.states.get('sshd.service') == 'active')
+
+
+@pytest.mark.parametrize('systemd', [0], indirect=True)
+def test_job_removed_before_its_reply(manager):
+    results = []
+    manager.stop_units(['docker'], results.append)
+    run_until(lambda: results)
+
+    assert results == [{'docker.service': 'done'}]
+    assert manager.jobs == {}
+    assert not manager.finished
+    assert manager.requested == 0
+
+
+@pytest.mark.parametrize('systemd', [0], indirect=True)
+def test_unrelated_jobs_are_not_kept(address, systemd, manager):
+    seen = job_signals(systemd)
+    other = other_client(address)
+    for _ in range(100):
+        other.StartUnit('other.service', 'replace')
+    run_until(lambda: len(seen) == 100)
+    assert not manager.finished
+
+    # While a reply is outstanding they are kept, but bounded
+    manager.finished = RecordingDict()
+    for _ in range(FINISHED_LIMIT + 100):
+        other.StartUnit('other.service', 'replace')
+    results = []
+    manager.start_units(['docker'], results.append)
+    run_until(lambda: results)
+
+    assert results == [{'docker.service': 'done'}]
+    assert manager.finished.most == FINISHED_LIMIT
+    assert manager.jobs == {}
+    assert not manager.finished
+
+
+def test_refused_job(manager):
+    results = []
+    manager.start_units(['missing'], results.append)
+    run_until(lambda: results)
+
+    assert results == [{'missing.service': "Unit missing.service not found."}]
+    assert manager.requested == 0
+
+
+def test_unit_states_are_cached_and_followed(manager):
+    changes = []
+    manager.on_state_changed = lambda unit, state: changes.append((unit, state))
+    states = []
+
+    manager.unit_states(['docker'], states.append)
+    run_until(lambda: states)
+    assert states == [{'docker.service': 'inactive'}]
+
+    # Answered from the cache, without a round trip
+    manager.unit_states(['docker'], states.append)
+    assert states[-1] == {'docker.service': 'inactive'}
+
+    results = []
+    manager.start_units(['docker'], results.append)
+    run_until(lambda: results and manager.states['docker.service'] == 'active')
+    assert changes == [('docker.service', 'inactive'), ('docker.service', 'active')]
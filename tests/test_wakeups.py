@@ -0,0 +1,134 @@
+"""
+Idle clients must not wake dingod: GLib sources armed by the daemon's
+change notifier, samplers and statistics export, counted on the real
+main context
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('gi')
+
+from gi.repository import GLib  # noqa: E402
+
+from dingo_common.metrics import MetricsCollector  # noqa: E402
+from notify import ChangeNotifier  # noqa: E402
+from stats import StatsRegistry  # noqa: E402
+
+
+class Sources:
+    """Records every source added through GLib and tells which are still attached"""
+
+    def __init__(self, monkeypatch):
+        self.ids = []
+        for name in ('timeout_add', 'timeout_add_seconds', 'idle_add'):
+            monkeypatch.setattr(GLib, name, self.recorder(getattr(GLib, name)))
+
+    def recorder(self, add):
+        def record(*args, **kwargs):
+            source_id = add(*args, **kwargs)
+            self.ids.append(source_id)
+            return source_id
+        return record
+
+    def live(self):
+        """Sources that can still wake the main loop"""
+        context = GLib.MainContext.default()
+        return [i for i in self.ids if context.find_source_by_id(i) is not None]
+
+    def run_until_idle(self, timeout=5.0):
+        """Run the main loop until no recorded source is left"""
+        context = GLib.MainContext.default()
+        deadline = time.monotonic() + timeout
+        while self.live() and time.monotonic() < deadline:
+            context.iteration(True)
+        return self.live()
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    return Sources(monkeypatch)
+
+
+def test_reading_properties_arms_nothing(sources):
+    notifier = ChangeNotifier(lambda changes: None)
+    notifier.seed('Profile', 'standard')
+    notifier.seed('GamingMode', False)
+
+    for _ in range(1000):
+        notifier.get('Profile')
+        notifier.get('GamingMode')
+
+    assert sources.ids == []
+
+
+def test_unchanged_values_arm_nothing(sources):
+    notifier = ChangeNotifier(lambda changes: None)
+    notifier.seed('Profile', 'standard')
+
+    notifier.changed('Profile', 'standard')
+
+    assert sources.ids == []
+
+
+def test_burst_is_one_wakeup_then_none(sources):
+    emitted = []
+    notifier = ChangeNotifier(emitted.append, window_ms=20)
+    notifier.seed('Profile', 'standard')
+    notifier.seed('UpdatesAvailable', 0)
+
+    for i in range(100):
+        notifier.changed('UpdatesAvailable', i)
+    notifier.changed('Profile', 'gaming')
+
+    assert len(sources.ids) == 1
+    assert sources.run_until_idle() == []
+    assert emitted == [{'UpdatesAvailable': 99, 'Profile': 'gaming'}]
+    assert notifier.timer_id is None
+
+
+def test_flip_back_is_not_emitted(sources):
+    emitted = []
+    notifier = ChangeNotifier(emitted.append, window_ms=20)
+    notifier.seed('GamingMode', False)
+
+    notifier.changed('GamingMode', True)
+    notifier.changed('GamingMode', False)
+
+    assert sources.run_until_idle() == []
+    assert emitted == []
+
+
+def test_metrics_stop_once_clients_stop_asking(sources):
+    metrics = MetricsCollector(interval_ms=20, linger=0.1)
+
+    seq = 0
+    for _ in range(3):
+        seq, timestamps, series = metrics.get(seq)
+    assert len(sources.live()) == 1
+
+    assert sources.run_until_idle() == []
+    assert metrics.timer_id is None
+    assert metrics.timestamps.seq > 0
+
+
+def test_stats_export_only_after_calls(sources, tmp_path):
+    path = tmp_path / 'dingod.prom'
+    stats = StatsRegistry()
+
+    stats.start_export(path, 1)
+    assert path.exists()
+    assert sources.ids == []
+
+    stats.record('GetStatus', 0.001, 0.0)
+    stats.record('GetStatus', 0.002, 0.0)
+    stats.record_saved('GetStatus')
+    assert len(sources.live()) == 1
+
+    assert sources.run_until_idle() == []
+    assert 'dingod_method_calls_total{method="GetStatus"} 2' in path.read_text()
+
+    stats.stop_export(path)
+    stats.record('GetStatus', 0.001, 0.0)
+    assert sources.live() == []